@@ -0,0 +1,305 @@
+import os
+import sys
+import json
+import math
+import logging
+import argparse
+import functools
+from datetime import datetime
+from json.encoder import encode_basestring
+
+logger = logging.getLogger(__name__)
+
+NAV_URL = "https://www.amfiindia.com/spages/NAVAll.txt"
+
+# Columns of a scheme line in NAVAll.txt, in feed order
+FEED_COLUMNS = ["scheme_code", "isin_growth", "isin_reinvestment", "scheme_name", "nav", "date"]
+
+# Fields of an output record; category and fund_house come from the section lines above each scheme
+RECORD_FIELDS = FEED_COLUMNS + ["category", "fund_house"]
+
+@functools.lru_cache(maxsize=1024)
+def json_string(value):
+    """Return value as a JSON string literal, or null (cached: categories and fund houses repeat on every record)"""
+    return "null" if value is None else encode_basestring(value)
+
+def open_feed(source):
+    """Yield the lines of the NAV feed from a URL (streamed) or a local file"""
+    if source.startswith(("http://", "https://")):
+        # Only import requests when downloading
+        import requests
+        with requests.get(source, stream=True, timeout=60) as response:
+            response.raise_for_status()
+            response.encoding = response.encoding or "utf-8"
+            for line in response.iter_lines(decode_unicode=True):
+                yield line
+    else:
+        with open(source, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                yield line
+
+@functools.lru_cache(maxsize=64)
+def parse_date(value):
+    """Turn a feed date such as '16-Oct-2025' into ISO format, or None"""
+    try:
+        return datetime.strptime(value, "%d-%b-%Y").date().isoformat()
+    except ValueError:
+        return None
+
+def parse_nav(value):
+    """Return the NAV as a number, or None for 'N.A.' and other non-numeric or non-finite values"""
+    try:
+        nav = float(value)
+    except ValueError:
+        return None
+    # float() accepts 'nan' and 'inf', which have no JSON representation
+    return nav if math.isfinite(nav) else None
+
+def iter_nav_records(lines):
+    """Parse NAV feed lines into scheme records, one line at a time
+    
+    Scheme lines are 'code;ISIN growth;ISIN reinvestment;name;NAV;date'. The lines in between
+    name the scheme category ('Open Ended Schemes(...)') and the fund house of the schemes below them.
+    """
+    category = None
+    fund_house = None
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("Scheme Code;"):
+            continue
+        
+        fields = line.split(";")
+        if len(fields) < len(FEED_COLUMNS):
+            # Section line
+            if "Schemes" in line:
+                category = line
+            else:
+                fund_house = line
+            continue
+        
+        # A ';' inside a scheme name splits it, so take the name as everything between ISINs and NAV
+        code, isin_growth, isin_reinvestment = [field.strip() for field in fields[:3]]
+        nav, date = [field.strip() for field in fields[-2:]]
+        name = ";".join(fields[3:-2]).strip()
+        if not code.isdigit():
+            continue
+        yield {
+            "scheme_code": int(code),
+            "isin_growth": isin_growth if isin_growth not in ("", "-") else None,
+            "isin_reinvestment": isin_reinvestment if isin_reinvestment not in ("", "-") else None,
+            "scheme_name": name,
+            "nav": parse_nav(nav),
+            "date": parse_date(date),
+            "category": category,
+            "fund_house": fund_house,
+        }
+
+def record_json(record):
+    """Serialize a record as compact JSON, about twice as fast as json.dumps for this fixed shape"""
+    nav = record["nav"]
+    return (f'{{"scheme_code":{record["scheme_code"]},"isin_growth":{json_string(record["isin_growth"])},'
+            f'"isin_reinvestment":{json_string(record["isin_reinvestment"])},'
+            f'"scheme_name":{encode_basestring(record["scheme_name"])},"nav":{"null" if nav is None else repr(nav)},'
+            f'"date":{json_string(record["date"])},"category":{json_string(record["category"])},'
+            f'"fund_house":{json_string(record["fund_house"])}}}')
+
+class JsonWriter:
+    """Write records as a JSON array, one compact object per line, remembering where each scheme starts"""
+    extension = "json"
+    
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self.offsets = {}
+        self.file = open(path, "wb")
+        self.file.write(b"[")
+        self.position = 1
+    
+    def write(self, record):
+        separator = b",\n" if self.count else b"\n"
+        line = record_json(record).encode("utf-8")
+        # Track the position here, calling tell() for every record is slow
+        self.offsets[record["scheme_code"]] = self.position + len(separator)
+        self.file.write(separator + line)
+        self.position += len(separator) + len(line)
+        self.count += 1
+    
+    def close(self):
+        self.file.write(b"\n]\n" if self.count else b"]\n")
+        self.file.close()
+
+class JsonlWriter:
+    """Write records as JSON Lines, remembering where each scheme starts"""
+    extension = "jsonl"
+    
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self.offsets = {}
+        self.file = open(path, "wb")
+        self.position = 0
+    
+    def write(self, record):
+        line = (record_json(record) + "\n").encode("utf-8")
+        self.offsets[record["scheme_code"]] = self.position
+        self.file.write(line)
+        self.position += len(line)
+        self.count += 1
+    
+    def close(self):
+        self.file.close()
+
+class ParquetWriter:
+    """Write records to a Parquet file in row groups of ROW_GROUP_SIZE (needs pyarrow)"""
+    extension = "parquet"
+    ROW_GROUP_SIZE = 50000
+    # Parquet rows are not addressable by byte offset, so this output has no index
+    offsets = None
+    
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet output needs pyarrow (pip install pyarrow)")
+        self._pa = pa
+        self.path = path
+        self.count = 0
+        self.columns = {field: [] for field in RECORD_FIELDS}
+        self.schema = pa.schema([
+            ("scheme_code", pa.int64()),
+            ("isin_growth", pa.string()),
+            ("isin_reinvestment", pa.string()),
+            ("scheme_name", pa.string()),
+            ("nav", pa.float64()),
+            ("date", pa.string()),
+            ("category", pa.string()),
+            ("fund_house", pa.string()),
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+    
+    def write(self, record):
+        for field in RECORD_FIELDS:
+            self.columns[field].append(record[field])
+        self.count += 1
+        if len(self.columns["scheme_code"]) >= self.ROW_GROUP_SIZE:
+            self._write_row_group()
+    
+    def _write_row_group(self):
+        self.writer.write_table(self._pa.table(self.columns, schema=self.schema))
+        self.columns = {field: [] for field in RECORD_FIELDS}
+    
+    def close(self):
+        if self.columns["scheme_code"]:
+            self._write_row_group()
+        self.writer.close()
+
+WRITER_CLASSES = {
+    "json": JsonWriter,
+    "jsonl": JsonlWriter,
+    "parquet": ParquetWriter,
+}
+
+def index_path_for(path):
+    """Return the index file that goes with an output file"""
+    return f"{path}.index.json"
+
+def write_index(writer):
+    """Save the scheme code -> byte offset index of a JSON or JSONL output"""
+    index_path = index_path_for(writer.path)
+    tmp_path = f"{index_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"path": os.path.basename(writer.path), "offsets": writer.offsets}, separators=(",", ":")))
+    os.replace(tmp_path, index_path)
+    return index_path
+
+class NavIndex:
+    """O(1) scheme code lookups in a JSON or JSONL output through its offset index"""
+    def __init__(self, index_path):
+        with open(index_path, encoding="utf-8") as f:
+            index = json.load(f)
+        self.path = os.path.join(os.path.dirname(index_path), index["path"])
+        self.offsets = {int(code): offset for code, offset in index["offsets"].items()}
+        self.file = open(self.path, "rb")
+    
+    def __contains__(self, scheme_code):
+        return int(scheme_code) in self.offsets
+    
+    def get(self, scheme_code):
+        """Return the record of scheme_code, or None if the feed did not have it"""
+        offset = self.offsets.get(int(scheme_code))
+        if offset is None:
+            return None
+        self.file.seek(offset)
+        return json.loads(self.file.readline().rstrip(b",\n"))
+    
+    def close(self):
+        self.file.close()
+
+def ingest(source, output, formats, index=True):
+    """Stream the feed at source into output.<format> files, returning (record count, output paths)"""
+    writers = [WRITER_CLASSES[fmt](f"{output}.{WRITER_CLASSES[fmt].extension}") for fmt in formats]
+    count = 0
+    try:
+        for record in iter_nav_records(open_feed(source)):
+            for writer in writers:
+                writer.write(record)
+            count += 1
+    finally:
+        for writer in writers:
+            writer.close()
+    
+    paths = [writer.path for writer in writers]
+    if index:
+        paths += [write_index(writer) for writer in writers if writer.offsets is not None]
+    return count, paths
+
+def lookup_main(argv):
+    """Print the records of the given scheme codes from an ingested output"""
+    parser = argparse.ArgumentParser(prog="amfi_nav.py lookup", description="Look up schemes by scheme code")
+    parser.add_argument("codes", nargs="+", type=int, help="Scheme codes")
+    parser.add_argument("--index", type=str, default=index_path_for("amfi_nav_data.json"), help="Index file written by ingestion")
+    args = parser.parse_args(argv)
+    
+    nav_index = NavIndex(args.index)
+    try:
+        for code in args.codes:
+            record = nav_index.get(code)
+            print(json.dumps(record, ensure_ascii=False) if record else f"{code}: not found")
+    finally:
+        nav_index.close()
+
+def main():
+    """Download (or read) the AMFI NAV feed and save it as JSON, JSONL or Parquet"""
+    if sys.argv[1:2] == ["lookup"]:
+        lookup_main(sys.argv[2:])
+        return
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="AMFI NAV ingester",
+                                     epilog="Run 'amfi_nav.py lookup --help' to look up schemes in the output.")
+    parser.add_argument("--source", type=str, default=NAV_URL, help="Feed URL or a local copy of NAVAll.txt")
+    parser.add_argument("--output", type=str, default="amfi_nav_data", help="Output file name without extension")
+    parser.add_argument("--formats", type=str, default="json",
+                        help=f"Comma-separated output formats ({', '.join(WRITER_CLASSES)})")
+    parser.add_argument("--no-index", action="store_true", help="Do not write the scheme code index")
+    args = parser.parse_args()
+    
+    formats = [fmt.strip() for fmt in args.formats.split(",") if fmt.strip()]
+    unknown = [fmt for fmt in formats if fmt not in WRITER_CLASSES]
+    if unknown:
+        parser.error(f"unknown output format(s): {', '.join(unknown)}")
+    
+    logger.info(f"Reading AMFI NAV data from {args.source}")
+    try:
+        count, paths = ingest(args.source, args.output, formats, index=not args.no_index)
+    except Exception as e:
+        logger.error(f"Error reading NAV data: {e}")
+        sys.exit(1)
+    if not count:
+        logger.warning("No scheme lines found in the feed")
+    
+    print(f"\n{count} schemes saved to:\n" + "\n".join(f"- {path}" for path in paths))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,582 @@
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import resource
+import tempfile
+import threading
+import subprocess
+import tracemalloc
+import importlib.util
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+from urllib.parse import urlparse, parse_qs
+
+SCRAPER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "olx-scrapper.py")
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "debug")
+
+# Listing container markup for each parse_html selector strategy
+STRATEGY_CONTAINERS = {
+    "itembox": ('<li data-aut-id="itemBox" class="_1DNjI">', "</li>"),
+    "li_regex": ('<li class="_1DNjI itemCard">', "</li>"),
+    "eir5n": ('<div class="EIR5N">', "</div>"),
+    "generic_listing": ('<div class="listing-card">', "</div>"),
+}
+
+# Benchmarks run by the suite, in order
+SUITE = [
+    "parse_fixtures",
+    "parse_synthetic_1k",
+    "parse_synthetic_10k",
+    "strategy_itembox",
+    "strategy_li_regex",
+    "strategy_eir5n",
+    "strategy_generic_listing",
+    "save_results_100k",
+    "crawl_mock_server",
+]
+
+# Milliseconds olx-scrapper.py --help may take on top of starting the interpreter
+STARTUP_BUDGET_MS = 100
+
+# Modules olx-scrapper.py must not import at startup; each strategy loads its own
+DEFERRED_MODULES = ["requests", "urllib3", "bs4", "lxml", "selectolax", "selenium", "sqlite3", "tarfile",
+                    "concurrent.futures.process", "pyarrow", "ijson"]
+
+# Default baseline file for suite --save-baseline/--baseline; machine specific, so record it on the machine that checks it
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark-baseline.json")
+
+AMFI_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "amfi_nav.py")
+AMFI_SAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "amfi_nav_data.json")
+
+# The awk program zsh-script.sh used before amfi_nav.py, kept to benchmark against
+AWK_PROGRAM = r'''BEGIN {
+ FS = ";";
+ count = 0;
+}
+{
+ # Skip header lines and process lines with data
+ if (NF >= 2) {
+ # Try to find a numeric field (NAV)
+ for (i = 1; i <= NF; i++) {
+ if ($i ~ /^[0-9]+(\.[0-9]+)?$/) {
+ # Found a potential NAV value
+ # The scheme name is usually the field before NAV
+ if (i > 1) {
+ scheme_name = $(i-1);
+ nav = $i;
+ gsub(/^[ \t]+|[ \t]+$/, "", scheme_name); # Trim whitespace
+ gsub(/"/, "\\\"", scheme_name); # Escape double quotes
+ # Print as JSON object
+ if (count > 0) {
+ print "," >> "temp_json_content.txt";
+ }
+ print " {" >> "temp_json_content.txt";
+ print " \"scheme_name\": \"" scheme_name "\"," >> "temp_json_content.txt";
+ print " \"nav\": " nav >> "temp_json_content.txt";
+ print " }" >> "temp_json_content.txt";
+ count++;
+ break;
+ }
+ }
+ }
+ }
+}
+END {
+ print "Found " count " entries.";
+}'''
+
+def load_scraper():
+    """Import olx-scrapper.py (its file name is not a valid module name)"""
+    spec = importlib.util.spec_from_file_location("olx_scrapper", SCRAPER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    # Keep benchmark output readable
+    logging.getLogger().setLevel(logging.ERROR)
+    return module
+
+def synthetic_page(listings):
+    """Build a search results page with the given number of itemBox listings"""
+    items = []
+    for i in range(listings):
+        items.append(
+            f'<li data-aut-id="itemBox" class="_1DNjI"><a href="/item/car-cover-iid-{1000000 + i}">'
+            f'<figure><img src="https://apollo.olx.in/v1/files/{i}-IN/image"></figure>'
+            f'<span data-aut-id="itemPrice" class="_2Ks63">₹ {1000 + i:,}</span>'
+            f'<span data-aut-id="itemTitle" class="_2poNJ">Car cover listing {i}</span>'
+            f'<div class="_3rmDx"><span data-aut-id="item-location">Andheri East, Mumbai</span>'
+            f'<span data-aut-id="itemCreationDate"><span>{i % 7} days ago</span></span></div></a></li>'
+        )
+    return f"<html><head><title>OLX</title></head><body><ul data-aut-id='itemsList'>{''.join(items)}</ul></body></html>"
+
+def strategy_page(strategy, listings):
+    """Build a page that only the given listing selector strategy matches, with class-based fields"""
+    start, end = STRATEGY_CONTAINERS[strategy]
+    items = []
+    for i in range(listings):
+        items.append(
+            f'{start}<a href="/item/car-cover-iid-{1000000 + i}">'
+            f'<span class="card-price">₹ {1000 + i:,}</span>'
+            f'<span class="card-title">Car cover listing {i}</span>'
+            f'<span class="card-location">Andheri East, Mumbai</span>'
+            f'<span class="card-date">{i % 7} days ago</span></a>{end}'
+        )
+    return f"<html><head><title>OLX</title></head><body><section>{''.join(items)}</section></body></html>"
+
+def mixed_page(listings):
+    """Build a page whose cards mix itemBox fields, class-based fields and "Promoted" headings, so each
+    field's selector cascade stops at different selectors from card to card"""
+    cards = [
+        '<span data-aut-id="itemPrice">₹ {price:,}</span><span data-aut-id="itemTitle">Car cover listing {i}</span>'
+        '<h2>Promoted</h2><span data-aut-id="item-location">Andheri East, Mumbai</span>',
+        '<h2>Car cover listing {i}</h2><span class="card-price">₹ {price:,}</span><div class="location">Pune</div>'
+        '<span class="post-time">Today</span>',
+        '<h2>Promoted</h2><span class="card-title">Car cover listing {i}</span><div class="price">₹ {price:,}</div>'
+        '<span data-aut-id="itemCreationDate"><span>{days} days ago</span></span>',
+    ]
+    items = [
+        f'<li data-aut-id="itemBox"><a href="/item/car-cover-iid-{1000000 + i}">'
+        + cards[i % len(cards)].format(i=i, price=1000 + i, days=i % 7) + '</a></li>'
+        for i in range(listings)
+    ]
+    return f"<html><head><title>OLX</title></head><body><ul data-aut-id='itemsList'>{''.join(items)}</ul></body></html>"
+
+def fixture_pages():
+    """Return the saved debug pages as (name, html) pairs"""
+    pages = []
+    if os.path.isdir(FIXTURE_DIR):
+        for name in sorted(os.listdir(FIXTURE_DIR)):
+            if name.endswith(".html"):
+                with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+                    pages.append((name, f.read()))
+    return pages
+
+def available_backends(olx):
+    """Return the names of parser backends that can be constructed here"""
+    names = []
+    for name in olx.PARSER_BACKENDS:
+        try:
+            olx.get_parser_backend(name)
+            names.append(name)
+        except ImportError:
+            pass
+    return names
+
+def time_parse(parser, html, repeat):
+    """Return the best wall time of parsing html repeat times, and the listings found"""
+    best = None
+    listings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        listings = parser.parse(html, 1)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, listings
+
+def bench_parse(args):
+    """Microbenchmark every installed parser backend on fixtures and synthetic pages"""
+    olx = load_scraper()
+    pages = fixture_pages() + [
+        (f"synthetic_{args.listings}", synthetic_page(args.listings)),
+        (f"mixed_{args.listings}", mixed_page(args.listings)),
+    ]
+    reference = olx.ListingParser("https://www.olx.in", "bs4")
+    
+    print(f"{'backend':<12}{'page':<32}{'ms':>10}{'pages/s':>10}{'listings/s':>12}  parity")
+    for backend in available_backends(olx):
+        parser = olx.ListingParser("https://www.olx.in", backend)
+        for name, html in pages:
+            elapsed, listings = time_parse(parser, html, args.repeat)
+            # Every backend must produce exactly what the bs4 reference produces
+            parity = "ok" if listings == reference.parse(html, 1) else "MISMATCH"
+            print(f"{backend:<12}{name:<32}{elapsed * 1000:>10.1f}{1 / elapsed:>10.1f}"
+                  f"{len(listings) / elapsed:>12.0f}  {parity}")
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+def start_mock_server(latency, listings_per_page):
+    """Serve synthetic OLX search pages on a local port, delaying every response by latency seconds"""
+    class MockOlxHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+        
+        def do_GET(self):
+            time.sleep(latency)
+            query = parse_qs(urlparse(self.path).query)
+            page = int(query.get("page", ["1"])[0])
+            body = synthetic_page(listings_per_page).replace("iid-", f"iid-{page}0").encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockOlxHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def run_parse(olx, backend, pages):
+    """Parse pages, returning (pages, listings)"""
+    parser = olx.ListingParser("https://www.olx.in", backend)
+    listings = 0
+    for html in pages:
+        listings += len(parser.parse(html, 1))
+    return len(pages), listings
+
+def prepare_benchmark(name, options):
+    """Build the inputs for a benchmark and return a function that runs it once, returning (pages, listings)"""
+    olx = load_scraper()
+    backend = options.get("parser", "auto")
+    
+    if name == "parse_fixtures":
+        pages = [html for _, html in fixture_pages()]
+        return lambda: run_parse(olx, backend, pages)
+    if name.startswith("parse_synthetic_"):
+        pages = [synthetic_page(int(name.rsplit("_", 1)[1].replace("k", "000")))]
+        return lambda: run_parse(olx, backend, pages)
+    if name.startswith("strategy_"):
+        pages = [strategy_page(name[len("strategy_"):], 1000)]
+        return lambda: run_parse(olx, backend, pages)
+    
+    if name == "save_results_100k":
+        scraper = olx.OlxScraper("benchmark")
+        scraper.results = olx.ListingStore(
+            ({"title": f"Car cover listing {i}", "price": f"₹ {1000 + i:,}", "location": "Andheri East, Mumbai",
+              "date_posted": f"{i % 7} days ago", "url": f"https://www.olx.in/item/car-cover-iid-{i}"}
+             for i in range(100000)),
+            decimal_mark=olx.decimal_mark_for("in")
+        )
+        def run():
+            scraper.save_results()
+            return 0, len(scraper.results)
+        return run
+    
+    if name == "crawl_mock_server":
+        server = start_mock_server(options.get("latency", 0.05), 40)
+        pages = options.get("pages", 20)
+        def run():
+            scraper = olx.OlxScraper(
+                "benchmark", max_pages=pages, concurrency=options.get("concurrency", 4), rate_limit=0,
+                base_url=f"http://127.0.0.1:{server.server_address[1]}", parser_backend=backend, keep_results=False
+            )
+            try:
+                scraper.scrape_with_requests()
+            finally:
+                scraper.close()
+            return scraper.pages_fetched, scraper.found_count
+        return run
+    
+    raise ValueError(f"unknown benchmark: {name}")
+
+def run_one(name, options):
+    """Run one benchmark in this process and return its measurements"""
+    # Benchmarks write debug pages and result files; keep them out of the working tree
+    workdir = tempfile.mkdtemp(prefix="olx-bench-")
+    os.chdir(workdir)
+    try:
+        run = prepare_benchmark(name, options)
+        
+        # Timed passes without tracing overhead; the best one is the least disturbed by noise
+        times = []
+        for _ in range(max(1, options.get("repeat", 1))):
+            start = time.perf_counter()
+            pages, listings = run()
+            times.append(time.perf_counter() - start)
+        times.sort()
+        elapsed = max(times[0], 1e-9)
+        # ru_maxrss is in KiB on Linux; read before tracing, which adds its own memory
+        peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        
+        # Separate pass to measure Python allocations
+        tracemalloc.start()
+        run()
+        _, alloc_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        os.chdir(os.path.dirname(SCRAPER_PATH))
+        shutil.rmtree(workdir, ignore_errors=True)
+    
+    return {
+        "seconds": elapsed,
+        "median_seconds": times[len(times) // 2],
+        "pages": pages,
+        "listings": listings,
+        "pages_per_s": pages / elapsed,
+        "listings_per_s": listings / elapsed,
+        "peak_rss_mb": peak_rss_mb,
+        "alloc_peak_mb": alloc_peak / (1024 * 1024),
+    }
+
+def run_isolated(name, options):
+    """Run one benchmark in a fresh interpreter so its peak RSS is its own"""
+    output = subprocess.check_output(
+        [sys.executable, os.path.abspath(__file__), "one", name, "--options", json.dumps(options)]
+    )
+    return json.loads(output.decode("utf-8").strip().splitlines()[-1])
+
+def find_regressions(results, baseline, tolerance):
+    """Compare results with a baseline, returning a description of every regression beyond tolerance"""
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if not expected:
+            continue
+        # Throughput (from each benchmark's best run) must not drop, memory must not grow
+        for metric in ("pages_per_s", "listings_per_s"):
+            if expected[metric] and result[metric] < expected[metric] * (1 - tolerance):
+                regressions.append(f"{name}: {metric} {result[metric]:.1f} < baseline {expected[metric]:.1f}")
+        for metric in ("peak_rss_mb", "alloc_peak_mb"):
+            if expected[metric] and result[metric] > expected[metric] * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {result[metric]:.1f} > baseline {expected[metric]:.1f}")
+    return regressions
+
+def bench_suite(args):
+    """Run the benchmark suite, optionally saving or checking against a baseline"""
+    options = {"parser": args.parser, "latency": args.latency, "pages": args.pages, "concurrency": args.concurrency,
+               "repeat": args.repeat}
+    names = args.only or SUITE
+    
+    results = {}
+    print(f"{'benchmark':<28}{'best s':>9}{'median s':>10}{'pages/s':>10}{'listings/s':>12}{'peak RSS MB':>13}{'alloc MB':>10}")
+    for name in names:
+        result = results[name] = run_isolated(name, options)
+        print(f"{name:<28}{result['seconds']:>9.3f}{result['median_seconds']:>10.3f}{result['pages_per_s']:>10.1f}"
+              f"{result['listings_per_s']:>12.0f}{result['peak_rss_mb']:>13.1f}{result['alloc_peak_mb']:>10.1f}")
+    
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({"options": options, "results": results}, f, indent=2)
+        print(f"\nBaseline saved to {args.save_baseline}")
+    
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("options") != options:
+            print(f"\nWarning: baseline was recorded with different options {baseline.get('options')}")
+        regressions = find_regressions(results, baseline["results"], args.tolerance)
+        if regressions:
+            print(f"\nPerformance regressions (tolerance {args.tolerance:.0%}):")
+            for regression in regressions:
+                print(f"- {regression}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+def load_amfi():
+    """Import amfi_nav.py"""
+    spec = importlib.util.spec_from_file_location("amfi_nav", AMFI_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def synthetic_nav_feed(path, scale):
+    """Write a NAVAll.txt-style feed built from the scheme names in amfi_nav_data.json, repeated scale times"""
+    with open(AMFI_SAMPLE, encoding="utf-8") as f:
+        names = [entry["scheme_name"] for entry in json.load(f)]
+    
+    code = 100000
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("Scheme Code;ISIN Div Payout/ ISIN Growth;ISIN Div Reinvestment;Scheme Name;Net Asset Value;Date\r\n\r\n")
+        for copy in range(scale):
+            f.write(f"Open Ended Schemes(Debt Scheme - Banking and PSU Fund {copy})\r\n\r\n")
+            fund_house = None
+            for i, name in enumerate(names):
+                house = " ".join(name.split()[:2]) + " Mutual Fund"
+                if house != fund_house:
+                    fund_house = house
+                    f.write(f"\r\n{fund_house}\r\n\r\n")
+                # Roughly one scheme in fifty has no NAV published
+                nav = "N.A." if i % 50 == 0 else f"{10 + (i * 7919) % 90000 / 100:.4f}"
+                f.write(f"{code};INF{code:09d};-;{name};{nav};16-Oct-2025\r\n")
+                code += 1
+    return code - 100000
+
+def run_awk_ingest(feed, output):
+    """Run the old zsh-script.sh awk pipeline on a local feed"""
+    workdir = os.path.dirname(output)
+    subprocess.run(["awk", AWK_PROGRAM, feed], cwd=workdir, check=True, stdout=subprocess.DEVNULL)
+    content = os.path.join(workdir, "temp_json_content.txt")
+    with open(output, "w", encoding="utf-8") as out:
+        out.write("[\n")
+        with open(content, encoding="utf-8") as f:
+            shutil.copyfileobj(f, out)
+        out.write("\n]\n")
+    os.remove(content)
+
+def bench_amfi(args):
+    """Compare amfi_nav.py with the old awk pipeline on a local NAV feed"""
+    amfi = load_amfi()
+    workdir = tempfile.mkdtemp(prefix="amfi-bench-")
+    try:
+        feed = args.feed
+        if not feed:
+            feed = os.path.join(workdir, "NAVAll.txt")
+            schemes = synthetic_nav_feed(feed, args.scale)
+            print(f"Synthetic feed: {schemes} schemes, {os.path.getsize(feed) / 1e6:.1f} MB")
+        
+        print(f"{'ingester':<22}{'seconds':>9}{'schemes':>9}{'output MB':>11}")
+        if shutil.which("awk"):
+            output = os.path.join(workdir, "awk.json")
+            start = time.perf_counter()
+            run_awk_ingest(feed, output)
+            elapsed = time.perf_counter() - start
+            with open(output, encoding="utf-8") as f:
+                awk_records = json.load(f)
+            print(f"{'awk (zsh-script.sh)':<22}{elapsed:>9.3f}{len(awk_records):>9}{os.path.getsize(output) / 1e6:>11.1f}")
+        else:
+            awk_records = None
+            print("awk is not installed, skipping the awk pipeline")
+        
+        formats = ["json", "jsonl"]
+        if importlib.util.find_spec("pyarrow"):
+            formats.append("parquet")
+        for fmt in formats:
+            output = os.path.join(workdir, f"amfi_{fmt}")
+            start = time.perf_counter()
+            count, paths = amfi.ingest(feed, output, [fmt])
+            elapsed = time.perf_counter() - start
+            size = sum(os.path.getsize(path) for path in paths)
+            print(f"{'amfi_nav.py ' + fmt:<22}{elapsed:>9.3f}{count:>9}{size / 1e6:>11.1f}")
+        
+        # Scheme code lookups through the offset index against loading and scanning the whole JSON
+        nav_index = amfi.NavIndex(amfi.index_path_for(os.path.join(workdir, "amfi_json.json")))
+        codes = list(nav_index.offsets)[::max(1, len(nav_index.offsets) // args.lookups)][:args.lookups]
+        start = time.perf_counter()
+        records = [nav_index.get(code) for code in codes]
+        indexed = time.perf_counter() - start
+        nav_index.close()
+        start = time.perf_counter()
+        with open(os.path.join(workdir, "amfi_json.json"), encoding="utf-8") as f:
+            by_code = {record["scheme_code"]: record for record in json.load(f)}
+        scanned = [by_code[code] for code in codes]
+        loaded = time.perf_counter() - start
+        print(f"\n{len(codes)} lookups: {indexed * 1000:.1f} ms with the index, {loaded * 1000:.1f} ms loading the JSON")
+        if records != scanned:
+            print("Index lookups do not match the JSON output")
+            sys.exit(1)
+        
+        if awk_records is not None:
+            # awk drops schemes without a NAV; everything it kept must match
+            with open(os.path.join(workdir, "amfi_json.json"), encoding="utf-8") as f:
+                ours = [(record["scheme_name"], record["nav"]) for record in json.load(f) if record["nav"] is not None]
+            theirs = [(record["scheme_name"], record["nav"]) for record in awk_records]
+            print(f"Parity with awk: {'ok' if ours == theirs else 'MISMATCH'}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def time_command(command, repeat):
+    """Return the best and median wall time of running command repeat times"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return times[0], times[len(times) // 2]
+
+def bench_startup(args):
+    """Time olx-scrapper.py startup and check it against a budget and the list of deferred modules"""
+    workdir = tempfile.mkdtemp(prefix="olx-startup-")
+    try:
+        bare = time_command([sys.executable, "-c", "pass"], args.repeat)
+        # Run from an empty directory so --help can be checked for stray files (log, debug/)
+        cli = [sys.executable, SCRAPER_PATH, "--help"]
+        subprocess.run(cli, cwd=workdir, stdout=subprocess.DEVNULL, check=True)
+        created = os.listdir(workdir)
+        startup = time_command(cli, args.repeat)
+        
+        # Module import only (an imported module's bytecode is cached, the script run by the CLI is
+        # recompiled every time), and the modules it pulled in
+        probe = (f"import importlib.util, json, sys, time\n"
+                 f"start = time.perf_counter()\n"
+                 f"spec = importlib.util.spec_from_file_location('olx_scrapper', {SCRAPER_PATH!r})\n"
+                 f"spec.loader.exec_module(importlib.util.module_from_spec(spec))\n"
+                 f"print(json.dumps([time.perf_counter() - start, sorted(sys.modules)]))")
+        output = subprocess.run([sys.executable, "-c", probe], cwd=workdir, capture_output=True, text=True, check=True).stdout
+        import_seconds, modules = json.loads(output)
+        with open(SCRAPER_PATH, encoding="utf-8") as f:
+            source = f.read()
+        start = time.perf_counter()
+        compile(source, SCRAPER_PATH, "exec")
+        compile_seconds = time.perf_counter() - start
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    
+    overhead = startup[0] - bare[0]
+    print(f"{'measurement':<36}{'best ms':>9}{'median ms':>11}")
+    print(f"{'python -c pass':<36}{bare[0] * 1000:>9.1f}{bare[1] * 1000:>11.1f}")
+    print(f"{'olx-scrapper.py --help':<36}{startup[0] * 1000:>9.1f}{startup[1] * 1000:>11.1f}")
+    print(f"{'  over the bare interpreter':<36}{overhead * 1000:>9.1f}")
+    print(f"{'  compiling the script':<36}{compile_seconds * 1000:>9.1f}")
+    print(f"{'  importing it (cached bytecode)':<36}{import_seconds * 1000:>9.1f}")
+    
+    problems = []
+    loaded = [name for name in DEFERRED_MODULES if name in modules]
+    if loaded:
+        problems.append(f"imported at startup: {', '.join(loaded)}")
+    if created:
+        problems.append(f"--help created {', '.join(sorted(created))}")
+    if overhead * 1000 > args.budget:
+        problems.append(f"startup overhead {overhead * 1000:.1f} ms is over the {args.budget:.0f} ms budget")
+    if problems:
+        print("\nStartup budget exceeded:")
+        for problem in problems:
+            print(f"- {problem}")
+        sys.exit(1)
+    print(f"\nWithin the {args.budget:.0f} ms startup budget, no deferred modules imported")
+
+def bench_one(args):
+    """Run a single benchmark and print its measurements as JSON (used by the suite)"""
+    print(json.dumps(run_one(args.name, json.loads(args.options))))
+
+def main():
+    """Run the selected benchmark"""
+    parser = argparse.ArgumentParser(description="OLX Scraper benchmarks")
+    subparsers = parser.add_subparsers(dest="benchmark")
+    subparsers.required = True
+    
+    parse_parser = subparsers.add_parser("parse", help="Compare parser backends on fixture and synthetic pages")
+    parse_parser.add_argument("--listings", type=int, default=1000, help="Listings on the synthetic pages")
+    parse_parser.add_argument("--repeat", type=int, default=3, help="Runs per page (best time is reported)")
+    parse_parser.set_defaults(func=bench_parse)
+    
+    suite_parser = subparsers.add_parser("suite", help="Run the hot-path benchmark suite")
+    suite_parser.add_argument("--only", nargs="+", choices=SUITE, help="Run only these benchmarks")
+    suite_parser.add_argument("--parser", type=str, default="auto", help="Parser backend to benchmark")
+    suite_parser.add_argument("--latency", type=float, default=0.05, help="Mock server latency per response in seconds")
+    suite_parser.add_argument("--pages", type=int, default=20, help="Pages to crawl from the mock server")
+    suite_parser.add_argument("--concurrency", type=int, default=4, help="Concurrent fetches for the mock crawl")
+    suite_parser.add_argument("--repeat", type=int, default=5,
+                              help="Timed runs per benchmark (throughput is taken from the best)")
+    suite_parser.add_argument("--baseline", type=str, nargs="?", const=BASELINE_PATH,
+                              help="Fail if results regress against this baseline file (default: benchmark-baseline.json)")
+    suite_parser.add_argument("--save-baseline", type=str, nargs="?", const=BASELINE_PATH,
+                              help="Save results as a baseline file (default: benchmark-baseline.json)")
+    suite_parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression (0.2 = 20%%)")
+    suite_parser.set_defaults(func=bench_suite)
+    
+    one_parser = subparsers.add_parser("one", help="Run a single suite benchmark and print JSON")
+    one_parser.add_argument("name", choices=SUITE)
+    one_parser.add_argument("--options", type=str, default="{}")
+    one_parser.set_defaults(func=bench_one)
+    
+    startup_parser = subparsers.add_parser("startup", help="Time CLI startup and enforce the startup budget")
+    startup_parser.add_argument("--repeat", type=int, default=10, help="Runs per measurement (best and median are reported)")
+    startup_parser.add_argument("--budget", type=float, default=STARTUP_BUDGET_MS,
+                                help="Maximum milliseconds '--help' may take over a bare interpreter")
+    startup_parser.set_defaults(func=bench_startup)
+    
+    amfi_parser = subparsers.add_parser("amfi", help="Compare amfi_nav.py with the old awk pipeline")
+    amfi_parser.add_argument("--feed", type=str, help="Local copy of NAVAll.txt (default: a synthetic feed)")
+    amfi_parser.add_argument("--scale", type=int, default=10, help="Copies of the sample schemes in the synthetic feed")
+    amfi_parser.add_argument("--lookups", type=int, default=1000, help="Scheme code lookups to time")
+    amfi_parser.set_defaults(func=bench_amfi)
+    
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
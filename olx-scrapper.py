@@ -3,501 +3,2957 @@ import csv
 import json
 import random
 import logging
-import requests
 import argparse
-from datetime import datetime
-from bs4 import BeautifulSoup
+from datetime import datetime, timedelta
 import re
 import os
+import sys
+import gzip
+import math
+import functools
+import mmap
+import codecs
+import bisect
+import hashlib
+import threading
 import traceback
+from array import array
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("olx_scraper.log"),
-        logging.StreamHandler()
-    ]
-)
+# Handlers are set up by main(), so importing this module does not open the log file
 logger = logging.getLogger()
 
+# Directory for raw page dumps, created on the first dump
+DEBUG_DIR = "debug"
+
+def debug_dir_for(query, country):
+    """Return the directory under DEBUG_DIR for a query's dumps, so concurrent batch queries never share files"""
+    slug = re.sub(r"[^\w-]+", "_", query.strip().lower()).strip("_") or "query"
+    return os.path.join(DEBUG_DIR, country, slug)
+
+class Metrics:
+    """Thread-safe counters and latency histograms for the hot paths, exportable as Prometheus text or JSON"""
+    # Histogram bucket upper bounds in seconds (the Prometheus client defaults)
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+    
+    def inc(self, name, value=1, **labels):
+        """Add value to a counter"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+    
+    def observe(self, name, seconds, **labels):
+        """Record one duration in a histogram"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._observe(key, seconds)
+    
+    def _observe(self, key, seconds):
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            # Per-bucket counts plus an overflow (+Inf) bucket
+            histogram = self.histograms[key] = {"buckets": [0] * (len(self.BUCKETS) + 1), "count": 0, "sum": 0.0, "max": 0.0}
+        histogram["buckets"][bisect.bisect_left(self.BUCKETS, seconds)] += 1
+        histogram["count"] += 1
+        histogram["sum"] += seconds
+        histogram["max"] = max(histogram["max"], seconds)
+    
+    @contextmanager
+    def timer(self, name, **labels):
+        """Time the body of a with block into a histogram"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+    
+    def drain(self):
+        """Return everything recorded so far and start again from zero (used to ship worker metrics to the parent)"""
+        with self._lock:
+            snapshot = (self.counters, self.histograms)
+            self.counters = {}
+            self.histograms = {}
+        return snapshot
+    
+    def reset(self):
+        """Start again from zero with a new lock, without taking the old one (which a forked child may inherit held)"""
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+    
+    def merge(self, snapshot):
+        """Add a snapshot returned by drain() in another process"""
+        counters, histograms = snapshot
+        with self._lock:
+            for key, value in counters.items():
+                self.counters[key] = self.counters.get(key, 0) + value
+            for key, other in histograms.items():
+                histogram = self.histograms.get(key)
+                if histogram is None:
+                    self.histograms[key] = other
+                    continue
+                histogram["buckets"] = [a + b for a, b in zip(histogram["buckets"], other["buckets"])]
+                histogram["count"] += other["count"]
+                histogram["sum"] += other["sum"]
+                histogram["max"] = max(histogram["max"], other["max"])
+    
+    def total(self, name):
+        """Return the summed seconds of a histogram across all its labels"""
+        with self._lock:
+            return sum(histogram["sum"] for (key, _), histogram in self.histograms.items() if key == name)
+    
+    def summary(self):
+        """Describe where the run's time went, in one line"""
+        stages = [
+            ("network", "http_request_seconds"),
+            ("browser", "selenium_load_seconds"),
+            ("rate limit sleep", "rate_limit_sleep_seconds"),
+            ("parse", "parse_seconds"),
+            ("sink writes", "sink_write_seconds"),
+        ]
+        return ", ".join(f"{label} {self.total(name):.2f}s" for label, name in stages)
+    
+    @staticmethod
+    def _format_labels(labels, extra=()):
+        pairs = []
+        for key, value in list(labels) + list(extra):
+            value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            pairs.append(f'{key}="{value}"')
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+    
+    def to_prometheus(self, prefix="olx_"):
+        """Render every metric in the Prometheus text exposition format"""
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items())
+        
+        lines = []
+        typed = set()
+        for (name, labels), value in counters:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {prefix}{name} counter")
+            lines.append(f"{prefix}{name}{self._format_labels(labels)} {value}")
+        for (name, labels), histogram in histograms:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {prefix}{name} histogram")
+            cumulative = 0
+            for bound, count in zip(self.BUCKETS + ("+Inf",), histogram["buckets"]):
+                cumulative += count
+                lines.append(f"{prefix}{name}_bucket{self._format_labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{prefix}{name}_sum{self._format_labels(labels)} {histogram['sum']}")
+            lines.append(f"{prefix}{name}_count{self._format_labels(labels)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+    
+    def to_dict(self):
+        """Return every metric as plain JSON-serialisable data"""
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items())
+        
+        data = {"counters": {}, "histograms": {}}
+        for (name, labels), value in counters:
+            data["counters"].setdefault(name, []).append({"labels": dict(labels), "value": value})
+        for (name, labels), histogram in histograms:
+            data["histograms"].setdefault(name, []).append({
+                "labels": dict(labels),
+                "count": histogram["count"],
+                "sum": histogram["sum"],
+                "mean": histogram["sum"] / histogram["count"] if histogram["count"] else 0.0,
+                "max": histogram["max"],
+                "buckets": dict(zip([str(bound) for bound in self.BUCKETS] + ["+Inf"], histogram["buckets"])),
+            })
+        return data
+    
+    def write(self, path):
+        """Dump every metric to path, as JSON for .json files and Prometheus text otherwise"""
+        with open(path, "w", encoding="utf-8") as f:
+            if path.endswith(".json"):
+                json.dump(self.to_dict(), f, indent=2)
+            else:
+                f.write(self.to_prometheus())
+
+# Process-wide metrics registry; parse workers ship theirs back with every page
+metrics = Metrics()
+
+class RateLimiter:
+    """Thread-safe per-host rate limiter that spaces out requests instead of sleeping a fixed time"""
+    def __init__(self, rate=0.5, jitter=0.0):
+        # rate is requests per second per host (0 disables limiting)
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.jitter = jitter
+        self._next_slot = {}
+        self._lock = threading.Lock()
+    
+    def acquire(self, host):
+        """Reserve the next free slot for host and wait until it opens, returning the time waited"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval + random.random() * self.jitter
+        
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        metrics.observe("rate_limit_sleep_seconds", max(delay, 0.0), host=host)
+        return delay
+
+@functools.lru_cache(maxsize=None)
+def timed_http_adapter_class():
+    """Return an HTTPAdapter subclass whose pooled connections report their connect time
+    
+    Built on first use so that requests and urllib3 are only imported by runs that fetch over HTTP.
+    """
+    from requests.adapters import HTTPAdapter
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+    
+    class TimedHTTPConnection(HTTPConnection):
+        """urllib3 connection that records how long opening it took (DNS lookup and TCP connect)"""
+        def connect(self):
+            start = time.perf_counter()
+            super().connect()
+            metrics.observe("http_connect_seconds", time.perf_counter() - start, scheme="http")
+    
+    class TimedHTTPSConnection(HTTPSConnection):
+        """urllib3 connection that records how long opening it took (DNS lookup, TCP connect and TLS handshake)"""
+        def connect(self):
+            start = time.perf_counter()
+            super().connect()
+            metrics.observe("http_connect_seconds", time.perf_counter() - start, scheme="https")
+    
+    class TimedHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = TimedHTTPConnection
+    
+    class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = TimedHTTPSConnection
+    
+    timed_pool_classes = {"http": TimedHTTPConnectionPool, "https": TimedHTTPSConnectionPool}
+    
+    class TimedHTTPAdapter(HTTPAdapter):
+        """HTTPAdapter whose pooled connections report their connect time"""
+        def init_poolmanager(self, *args, **kwargs):
+            super().init_poolmanager(*args, **kwargs)
+            self.poolmanager.pool_classes_by_scheme = timed_pool_classes
+        
+        def proxy_manager_for(self, proxy, **proxy_kwargs):
+            manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+            # SOCKS proxies bring their own connection classes
+            if not proxy.lower().startswith("socks"):
+                manager.pool_classes_by_scheme = timed_pool_classes
+            return manager
+    
+    return TimedHTTPAdapter
+
+class SessionPool:
+    """Shared requests sessions with pooled keep-alive connections and retry/backoff, one per proxy"""
+    # Statuses worth retrying; urllib3 honours Retry-After on 429 and 503
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    
+    def __init__(self, pool_size=10, retries=3, backoff=1.0):
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff = backoff
+        self._sessions = {}
+        self._lock = threading.Lock()
+    
+    def get(self, proxy=None):
+        """Return the session for proxy, creating it on first use"""
+        with self._lock:
+            session = self._sessions.get(proxy)
+            if session is None:
+                session = self._create_session(proxy)
+                self._sessions[proxy] = session
+        return session
+    
+    def _create_session(self, proxy):
+        """Build a session whose adapters pool connections and retry transient failures"""
+        import requests
+        from urllib3.util.retry import Retry
+        
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=self.backoff,
+            status_forcelist=self.RETRY_STATUSES,
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = timed_http_adapter_class()(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=retry)
+        
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        if proxy:
+            session.proxies = {
+                "http": proxy,
+                "https": proxy
+            }
+        return session
+    
+    def close(self):
+        """Close every pooled session and its connections"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+class SoupBackend:
+    """BeautifulSoup (html.parser) backend; always available and the reference for the others"""
+    name = "bs4"
+    
+    def __init__(self):
+        import soupsieve
+        from bs4 import BeautifulSoup
+        self._soupsieve = soupsieve
+        self._BeautifulSoup = BeautifulSoup
+    
+    def parse_document(self, html):
+        return self._BeautifulSoup(html, "html.parser")
+    
+    def compile(self, selector):
+        return self._soupsieve.compile(selector)
+    
+    def select(self, node, compiled):
+        return compiled.select(node)
+    
+    def select_one(self, node, compiled):
+        return compiled.select_one(node)
+    
+    def find_by_class(self, node, tag, pattern):
+        return node.find_all(tag, class_=pattern)
+    
+    def text(self, node):
+        return node.get_text(strip=True)
+    
+    def first_link_href(self, node):
+        link_tag = node.find("a")
+        if link_tag and 'href' in link_tag.attrs:
+            return link_tag['href']
+        return None
+
+class LxmlBackend:
+    """lxml backend with selectors compiled to XPath through cssselect"""
+    name = "lxml"
+    # Text inside these tags is not page text (BeautifulSoup skips it too)
+    SKIP_TEXT_TAGS = ("script", "style", "template")
+    
+    def __init__(self):
+        import lxml.html
+        from lxml import etree
+        from cssselect import HTMLTranslator
+        self._html = lxml.html
+        self._etree = etree
+        self._translator = HTMLTranslator()
+    
+    def parse_document(self, html):
+        return self._html.document_fromstring(html or "<html></html>")
+    
+    def compile(self, selector):
+        # Match descendants only, like BeautifulSoup's select
+        return self._etree.XPath(self._translator.css_to_xpath(selector, prefix="descendant::"))
+    
+    def select(self, node, compiled):
+        return compiled(node)
+    
+    def select_one(self, node, compiled):
+        matches = compiled(node)
+        return matches[0] if matches else None
+    
+    def find_by_class(self, node, tag, pattern):
+        return [
+            element for element in node.iterdescendants(tag)
+            if pattern.search(" ".join(element.get("class", "").split()))
+        ]
+    
+    def text(self, node):
+        parts = []
+        for element in node.iter():
+            if isinstance(element.tag, str) and element.tag not in self.SKIP_TEXT_TAGS and element.text:
+                parts.append(element.text)
+            if element is not node and element.tail:
+                parts.append(element.tail)
+        return "".join(part.strip() for part in parts if part.strip())
+    
+    def first_link_href(self, node):
+        for link_tag in node.iterdescendants("a"):
+            return link_tag.get("href")
+        return None
+
+class SelectolaxBackend:
+    """selectolax (lexbor) backend; fastest, with results filtered to match BeautifulSoup's semantics"""
+    name = "selectolax"
+    SKIP_TEXT_TAGS = ("script", "style", "template")
+    
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self._parser = LexborHTMLParser
+    
+    def parse_document(self, html):
+        return self._parser(html).root
+    
+    def compile(self, selector):
+        # lexbor compiles selectors internally; the string is the plan
+        return selector
+    
+    def select(self, node, compiled):
+        # lexbor includes the node itself in matches, BeautifulSoup only searches descendants
+        return [match for match in node.css(compiled) if match.mem_id != node.mem_id]
+    
+    def select_one(self, node, compiled):
+        for match in node.css(compiled):
+            if match.mem_id != node.mem_id:
+                return match
+        return None
+    
+    def find_by_class(self, node, tag, pattern):
+        return [
+            element for element in self.select(node, tag)
+            if pattern.search(" ".join((element.attributes.get("class") or "").split()))
+        ]
+    
+    def text(self, node):
+        parts = []
+        for child in node.traverse(include_text=True):
+            if child.tag == "-text" and child.parent.tag not in self.SKIP_TEXT_TAGS:
+                parts.append(child.text_content)
+        return "".join(part.strip() for part in parts if part and part.strip())
+    
+    def first_link_href(self, node):
+        link_tag = self.select_one(node, "a")
+        if link_tag is not None:
+            return link_tag.attributes.get("href")
+        return None
+
+PARSER_BACKENDS = {
+    "lxml": LxmlBackend,
+    "selectolax": SelectolaxBackend,
+    "bs4": SoupBackend,
+}
+
+def get_parser_backend(name="auto"):
+    """Return a parser backend by name; 'auto' picks the fastest one that is installed"""
+    if name != "auto":
+        return PARSER_BACKENDS[name]()
+    
+    for backend_class in (SelectolaxBackend, LxmlBackend):
+        try:
+            return backend_class()
+        except ImportError:
+            continue
+    return SoupBackend()
+
+class SelectorPlan:
+    """A field's selector cascade compiled once, tried in order for every listing"""
+    def __init__(self, backend, selectors):
+        self.order = [(selector, backend.compile(selector)) for selector in selectors]
+
+# Markers of anti-bot challenge pages: CAPTCHA widgets, forms or frames, Cloudflare challenges and their wording.
+# Bare words such as "robot" or "blocked" are not enough, real pages use the Roboto font and <meta name="robots">
+CAPTCHA_MARKERS = re.compile(
+    r"g-recaptcha|h-captcha|recaptcha/api|hcaptcha\.com|\bcf-chl|challenge-platform|px-captcha|captcha-delivery"
+    r"|<(?:form|iframe|div)\b[^>]*\bcaptcha\b"
+    r"|\bare you a (?:robot|human)\b|\bverify (?:that )?you are (?:a )?human\b|\bsolve the captcha\b",
+    re.IGNORECASE
+)
+# Titles of access denied pages
+BLOCKED_TITLE = re.compile(
+    r"<title[^>]*>[^<]*\b(?:access denied|403 forbidden|forbidden|request blocked|you have been blocked|attention required)\b",
+    re.IGNORECASE
+)
+
+def detect_block(html):
+    """Return "captcha" or "blocked" if a page without listings looks like an anti-bot or access denied page"""
+    if CAPTCHA_MARKERS.search(html):
+        return "captcha"
+    if BLOCKED_TITLE.search(html):
+        return "blocked"
+    return None
+
+class ListingParser:
+    """Extract listings from OLX search result pages using a pluggable HTML backend"""
+    # Selector cascades for each field, most specific first
+    FIELD_SELECTORS = {
+        "title": [
+            "[data-aut-id='itemTitle']",
+            "span[class*='title']",
+            "h2",
+            ".title",
+            "[class*='title']"
+        ],
+        "price": [
+            "[data-aut-id='itemPrice']",
+            "span[class*='price']",
+            ".price",
+            "[class*='price']"
+        ],
+        "location": [
+            "[data-aut-id='item-location']",
+            "span[class*='location']",
+            ".location",
+            "[class*='location']"
+        ],
+        "date_posted": [
+            "[data-aut-id='itemCreationDate']",
+            "span[class*='date']",
+            ".date",
+            "[class*='date']",
+            "[class*='time']"
+        ],
+    }
+    
+    def __init__(self, base_url, backend="auto"):
+        self.base_url = base_url
+        self.backend = get_parser_backend(backend)
+        
+        # Listing container strategies, in the order they are tried
+        self.item_box = self.backend.compile("[data-aut-id='itemBox']")
+        self.item_class_pattern = re.compile(r"_.*item.*")
+        self.card_selector = self.backend.compile(".EIR5N")  # Example class name, adjust based on inspection
+        self.generic_selectors = [
+            self.backend.compile("div[class*='listing']"),
+            self.backend.compile("div[class*='item']")
+        ]
+        
+        self.field_plans = {
+            field: SelectorPlan(self.backend, selectors)
+            for field, selectors in self.FIELD_SELECTORS.items()
+        }
+    
+    def find_listings(self, root):
+        """Find listing containers, trying each selector strategy in turn"""
+        # Strategy 1: Look for itemBox data attribute (common in newer OLX designs)
+        strategy = "item_box"
+        listings = self.backend.select(root, self.item_box)
+        
+        # Strategy 2: Look for list items with specific class patterns
+        if not listings:
+            strategy = "item_class"
+            listings = self.backend.find_by_class(root, "li", self.item_class_pattern)
+        
+        # Strategy 3: Look for cards/divs with listing content
+        if not listings:
+            strategy = "card"
+            listings = self.backend.select(root, self.card_selector)
+        
+        # Strategy 4: Generic listing pattern (fallback)
+        if not listings:
+            strategy = "generic"
+            for selector in self.generic_selectors:
+                listings = self.backend.select(root, selector)
+                if listings:
+                    break
+        
+        metrics.inc("listing_strategy_hits_total", strategy=strategy if listings else "none")
+        return listings
+    
+    def extract(self, listing, plan, hits=None):
+        """Return the text of the first selector in plan that matches, counting the hit in hits (selector -> count) if given
+        
+        Always in cascade order: cards on one page can mix markup, and a later selector may match
+        something else (a "Promoted" <h2>) on a card the first selector also matches.
+        """
+        for selector, compiled in plan.order:
+            tag = self.backend.select_one(listing, compiled)
+            if tag is not None:
+                if hits is not None:
+                    hits[selector] = hits.get(selector, 0) + 1
+                return self.backend.text(tag)
+        return None
+    
+    def parse(self, html, page_num):
+        """Parse HTML to extract listing information"""
+        page_results = []
+        start = time.perf_counter()
+        
+        try:
+            root = self.backend.parse_document(html)
+            listings = self.find_listings(root)
+            
+            if not listings:
+                logger.warning(f"No listings found on page {page_num} using any selector method")
+                # Check for possible API blocking or CAPTCHA
+                block = detect_block(html)
+                if block == "captcha":
+                    logger.warning("Possible CAPTCHA or anti-bot measures detected")
+                elif block == "blocked":
+                    logger.warning("Access appears to be blocked or denied")
+                
+                return page_results
+            
+            logger.info(f"Found {len(listings)} listings on page {page_num}")
+            
+            # Selector hits are tallied locally and recorded once per page
+            hits = {field: {} for field in self.field_plans}
+            
+            # Process each listing
+            for listing in listings:
+                listing_data = {}
+                
+                for field, plan in self.field_plans.items():
+                    value = self.extract(listing, plan, hits[field])
+                    listing_data[field] = value if value else "N/A"
+                
+                # Extract URL
+                url = None
+                href = self.backend.first_link_href(listing)
+                if href is not None:
+                    # Ensure absolute URL
+                    if href.startswith('/'):
+                        url = f"{self.base_url}{href}"
+                    elif href.startswith('http'):
+                        url = href
+                    else:
+                        url = f"{self.base_url}/{href}"
+                
+                listing_data["url"] = url if url else "N/A"
+                
+                # Only add if we have meaningful data
+                if listing_data["title"] != "N/A" or listing_data["price"] != "N/A":
+                    page_results.append(listing_data)
+            
+            for field, field_hits in hits.items():
+                for selector, count in field_hits.items():
+                    metrics.inc("selector_hits_total", count, field=field, selector=selector)
+            
+        except Exception as e:
+            logger.error(f"Error parsing HTML for page {page_num}: {e}")
+            traceback.print_exc()
+        
+        finally:
+            metrics.observe("parse_seconds", time.perf_counter() - start, backend=self.backend.name)
+            metrics.inc("listings_parsed_total", len(page_results))
+        
+        return page_results
+
+class TeeReader:
+    """File-like wrapper that copies everything read from raw into a second file"""
+    def __init__(self, raw, copy):
+        self.raw = raw
+        self.copy = copy
+    
+    def read(self, size=-1):
+        data = self.raw.read(size)
+        self.copy.write(data)
+        return data
+
+def stream_api_response(fileobj):
+    """Yield ("item", dict) for each search result and ("metadata", dict) from an API response, parsing incrementally
+    
+    Uses ijson when it is installed so items are handed out while the body is still downloading;
+    otherwise the whole body is decoded with json. A body that is not valid JSON raises ValueError either way.
+    """
+    try:
+        import ijson
+        from ijson.common import ObjectBuilder
+    except ImportError:
+        data = json.loads(fileobj.read().decode("utf-8"))
+        for item in data.get("data") or []:
+            yield "item", item
+        yield "metadata", data.get("metadata") or {}
+        return
+    
+    builder = None
+    target = None
+    try:
+        for prefix, event, value in ijson.parse(fileobj, use_float=True):
+            if builder is None:
+                if event == "start_map" and prefix in ("data.item", "metadata"):
+                    builder = ObjectBuilder()
+                    target = prefix
+                    builder.event(event, value)
+                continue
+            
+            builder.event(event, value)
+            if prefix == target and event == "end_map":
+                yield ("item" if target == "data.item" else "metadata"), builder.value
+                builder = None
+    except ijson.JSONError as e:
+        # IncompleteJSONError is not a ValueError; raise what json.loads would
+        raise ValueError(str(e)) from e
+
+def api_item_to_listing(item, base_url):
+    """Map an API search result onto the listing fields parse_html produces"""
+    price = (item.get("price") or {}).get("value") or {}
+    
+    # Most specific place first, like the "Sublocality, City" shown on result cards
+    resolved = item.get("locations_resolved") or {}
+    names = [resolved.get(f"{level}_name") for level in ("SUBLOCALITY_LEVEL_1", "ADMIN_LEVEL_3", "ADMIN_LEVEL_1")]
+    names = [name for name in names if name][:2]
+    location = ", ".join(names) or (item.get("location") or {}).get("label")
+    
+    url = item.get("url")
+    if not url and item.get("id"):
+        slug = re.sub(r"[^a-z0-9]+", "-", (item.get("title") or "").lower()).strip("-")
+        url = f"{base_url}/item/{slug}-iid-{item['id']}"
+    
+    return {
+        "title": item.get("title") or "N/A",
+        "price": price.get("display") or "N/A",
+        "location": location or "N/A",
+        "date_posted": item.get("created_at") or "N/A",
+        "url": url or "N/A",
+    }
+
+class MappedPage:
+    """An archived page on disk, read through mmap by whichever process parses it"""
+    def __init__(self, path):
+        self.path = path
+    
+    def read(self):
+        with open(self.path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return ""
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+                # Decode straight from the mapping; mapped[:] would first copy the whole file
+                return codecs.decode(view, "utf-8", "replace")
+
+# Parsers built once per worker process, keyed by (base_url, backend)
+_worker_parsers = {}
+
+def init_parse_worker():
+    """Start a parse worker with empty metrics (forked workers inherit the parent's)"""
+    metrics.reset()
+
+def parse_in_worker(html, page_num, base_url, backend):
+    """Parse one page in a parse worker process, returning (listings, metrics recorded meanwhile)
+
+    html may be raw bytes or a MappedPage (archived pages), which are read and decoded here rather than in the parent.
+    """
+    parser = _worker_parsers.get((base_url, backend))
+    if parser is None:
+        parser = _worker_parsers[(base_url, backend)] = ListingParser(base_url, backend)
+    if isinstance(html, MappedPage):
+        html = html.read()
+    elif not isinstance(html, str):
+        html = bytes(html).decode("utf-8", errors="replace")
+    return parser.parse(html, page_num), metrics.drain()
+
+class ParsePipeline:
+    """Process-pool parse stage fed by the fetchers, yielding parsed pages in page order
+    
+    At most max_pending pages wait for a parse worker; until one finishes, no more fetched
+    pages are pulled, which in turn stops the fetch window from topping up.
+    """
+    def __init__(self, workers=None, backend="auto", max_pending=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.backend = backend
+        self.max_pending = max_pending or 2 * self.workers
+        from concurrent.futures import ProcessPoolExecutor
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=init_parse_worker)
+        # Start every worker now, before fetch or batch threads exist: a worker forked later
+        # could inherit a lock that one of them holds
+        for future in [self.executor.submit(int) for _ in range(self.workers)]:
+            future.result()
+    
+    def run(self, fetched, base_url):
+        """Parse (page, html) pairs from fetched, yielding (page, listings), or (page, None) for pages that failed to fetch"""
+        pending = deque()
+        try:
+            for page, html in fetched:
+                if html is None:
+                    pending.append((page, None))
+                else:
+                    pending.append((page, self.executor.submit(parse_in_worker, html, page, base_url, self.backend)))
+                
+                # Hand back finished pages in order; block only when the queue is full
+                while pending and (len(pending) >= self.max_pending or pending[0][1] is None or pending[0][1].done()):
+                    page, future = pending.popleft()
+                    yield page, self._collect(page, future)
+            
+            while pending:
+                page, future = pending.popleft()
+                yield page, self._collect(page, future)
+        
+        finally:
+            for _, future in pending:
+                if future is not None:
+                    future.cancel()
+            if hasattr(fetched, "close"):
+                fetched.close()
+    
+    def _collect(self, page, future):
+        """Wait for a parsed page, folding the worker's metrics into this process's"""
+        if future is None:
+            return None
+        try:
+            listings, worker_metrics = future.result()
+        except OSError as e:
+            # An unreadable archived page only loses that page
+            logger.error(f"Error reading page {page}: {e}")
+            return []
+        metrics.merge(worker_metrics)
+        return listings
+    
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+# Listing fields in output column order
+LISTING_FIELDS = ["title", "price", "location", "date_posted", "url"]
+
+# Fields added by the normalization stage (--normalize)
+NORMALIZED_FIELDS = ["price_value", "currency", "posted_at"]
+
+# Currency and decimal mark of each OLX site, keyed by its domain suffix (--country, as in www.olx.<country>)
+COUNTRY_CURRENCIES = {
+    "in": ("INR", "."),
+    "com.pk": ("PKR", "."),
+    "co.id": ("IDR", ","),
+    "com.lb": ("USD", "."),
+    "pt": ("EUR", ","),
+    "pl": ("PLN", ","),
+    "ro": ("RON", ","),
+    "bg": ("BGN", ","),
+    "ua": ("UAH", ","),
+    "kz": ("KZT", ","),
+    "uz": ("UZS", ","),
+    "com.br": ("BRL", ","),
+    "com.ar": ("ARS", ","),
+    "com.co": ("COP", ","),
+    "com.ec": ("USD", "."),
+    "com.pe": ("PEN", "."),
+    "com.gt": ("GTQ", "."),
+    "com.pa": ("USD", "."),
+    "com.sv": ("USD", "."),
+    "com.bh": ("BHD", "."),
+    "com.kw": ("KWD", "."),
+    "com.om": ("OMR", "."),
+    "qa": ("QAR", "."),
+    "com.eg": ("EGP", "."),
+    "sa.com": ("SAR", "."),
+    "com.sa": ("SAR", "."),
+    "ae": ("AED", "."),
+}
+
+# Currency markers that may appear in a price, longest first; a marker shared by several
+# currencies means the site's own currency when it is one of them, else the first listed
+CURRENCY_MARKERS = [
+    ("R$", ("BRL",)), ("S/", ("PEN",)), ("US$", ("USD",)), ("₹", ("INR",)), ("€", ("EUR",)),
+    ("zł", ("PLN",)), ("lei", ("RON",)), ("лв", ("BGN",)), ("грн", ("UAH",)), ("₴", ("UAH",)),
+    ("₸", ("KZT",)), ("тг", ("KZT",)), ("сўм", ("UZS",)), ("сум", ("UZS",)), ("so'm", ("UZS",)),
+    ("Rp", ("IDR",)), ("Rs", ("PKR", "INR")), ("ج.م", ("EGP",)), ("د.إ", ("AED",)),
+    ("$", ("USD", "ARS", "COP")),
+]
+CURRENCY_CODES = {currency for currency, _ in COUNTRY_CURRENCIES.values()} | {"USD", "EUR"}
+CURRENCY_CODE = re.compile(r"\b([A-Z]{3})\b")
+
+# One number pattern per decimal mark; digits may be grouped with spaces, dots, commas or apostrophes
+PRICE_NUMBERS = {
+    ".": re.compile(r"\d[\d,\s']*(?:\.\d+)?"),
+    ",": re.compile(r"\d[\d.\s']*(?:,\d+)?"),
+}
+PRICE_TRAILING = re.compile(r"[,.\s']+$")
+PRICE_GROUPING = re.compile(r"[,.\s']")
+
+# "Today"/"Yesterday" in the languages OLX sites use
+TODAY_WORDS = {"today", "hoy", "hoje", "dzisiaj", "azi", "днес", "сегодня", "сьогодні", "bugun", "hari ini", "اليوم"}
+YESTERDAY_WORDS = {"yesterday", "ayer", "ontem", "wczoraj", "ieri", "вчера", "вчора", "kecha", "kemarin", "أمس"}
+RELATIVE_UNITS = {
+    "second": timedelta(seconds=1), "minute": timedelta(minutes=1), "hour": timedelta(hours=1),
+    "day": timedelta(days=1), "week": timedelta(weeks=1), "month": timedelta(days=30), "year": timedelta(days=365),
+}
+
+def relative_date(pattern, units, doubled=None):
+    """Compile a relative date pattern capturing (count, unit word), with the unit word stems of each RELATIVE_UNITS unit
+    
+    doubled holds words that mean two of a unit (Arabic duals). Stems are tried longest first.
+    """
+    stems = [(stem, RELATIVE_UNITS[unit]) for unit, words in units.items() for stem in words.split()]
+    stems += [(stem, 2 * RELATIVE_UNITS[unit]) for unit, words in (doubled or {}).items() for stem in words.split()]
+    return re.compile(pattern), sorted(stems, key=lambda item: -len(item[0]))
+
+# "3 days ago" in the languages OLX sites use; a missing count ("godzinę temu", "acum o zi") means one
+PORTUGUESE_UNITS = {"second": "seg", "minute": "min", "hour": "hora", "day": "dia", "week": "semana", "month": "mês mes", "year": "ano"}
+RELATIVE_DATES = [
+    relative_date(r"(?:(\d+)\s*|(?:an?|one)\s+)?([^\W\d]+)\s+ago\b",
+                  {"second": "sec", "minute": "min", "hour": "hour hr", "day": "day", "week": "week", "month": "month", "year": "year"}),
+    relative_date(r"\bhace\s+(?:(\d+)\s*|una?\s+)?([^\W\d]+)",
+                  {"second": "seg", "minute": "min", "hour": "hora", "day": "día dia", "week": "semana", "month": "mes", "year": "año ano"}),
+    relative_date(r"\bhá\s+(?:(\d+)\s*|uma?\s+)?([^\W\d]+)", PORTUGUESE_UNITS),
+    relative_date(r"(?:(\d+)\s*|uma?\s+)?([^\W\d]+)\s+atrás", PORTUGUESE_UNITS),
+    relative_date(r"(?:(\d+)\s*)?([^\W\d]+)\s+temu\b",
+                  {"second": "sekund", "minute": "minut", "hour": "godz", "day": "dzie dni dnia", "week": "tydz tygod", "month": "miesi", "year": "rok lat"}),
+    relative_date(r"\bacum\s+(?:(\d+)\s*(?:de\s+)?|(?:o|un|una)\s+)?([^\W\d]+)",
+                  {"second": "secund", "minute": "minut", "hour": "oră ora ore", "day": "zi", "week": "săptămân saptaman", "month": "lun", "year": "an"}),
+    relative_date(r"\bпреди\s+(?:(\d+)\s*)?([^\W\d]+)",
+                  {"second": "секунд", "minute": "минут", "hour": "час", "day": "ден дни", "week": "седмиц", "month": "месец", "year": "годин"}),
+    relative_date(r"(?:(\d+)\s*)?([^\W\d]+)\s+назад\b",
+                  {"second": "секунд", "minute": "минут", "hour": "час", "day": "день дня дней", "week": "недел", "month": "месяц", "year": "год лет"}),
+    relative_date(r"(?:(\d+)\s*)?([^\W\d]+)\s+тому\b",
+                  {"second": "секунд", "minute": "хвилин", "hour": "годин", "day": "день дні дня", "week": "тижд тижн", "month": "місяц", "year": "рік рок"}),
+    relative_date(r"(?:(\d+)\s*)?([^\W\d]+)\s+oldin\b",
+                  {"second": "soniya", "minute": "daqiqa", "hour": "soat", "day": "kun", "week": "hafta", "month": "oy", "year": "yil"}),
+    relative_date(r"(?:(\d+)\s*)?([^\W\d]+)\s+(?:yang\s+)?lalu\b",
+                  {"second": "detik", "minute": "menit", "hour": "jam sejam", "day": "hari sehari", "week": "minggu seminggu",
+                   "month": "bulan sebulan", "year": "tahun setahun"}),
+    relative_date(r"منذ\s+(?:(\d+)\s*)?([^\W\d]+)",
+                  {"second": "ثانية ثوان", "minute": "دقيقة دقائق", "hour": "ساعة ساعات", "day": "يوم أيام", "week": "أسبوع أسابيع",
+                   "month": "شهر أشهر", "year": "سنة سنوات"},
+                  {"second": "ثانيتين", "minute": "دقيقتين", "hour": "ساعتين", "day": "يومين", "week": "أسبوعين", "month": "شهرين", "year": "سنتين"}),
+]
+# Absolute dates shown on result cards, with and without a year
+DATE_FORMATS = ["%d %b %Y", "%d %B %Y", "%b %d, %Y", "%B %d, %Y", "%d/%m/%Y", "%d.%m.%Y"]
+DAY_MONTH_FORMATS = ["%d %b", "%d %B", "%b %d", "%B %d"]
+
+def decimal_mark_for(country):
+    """Return the decimal mark prices use on a country's OLX site ("." when the country is unknown)"""
+    return COUNTRY_CURRENCIES.get(country, (None, "."))[1]
+
+def parse_price(price, decimal_mark="."):
+    """Return the numeric value of a price such as '₹ 1,299' or '1.299,50 €', or None if it has no number"""
+    match = PRICE_NUMBERS[decimal_mark].search(price or "")
+    if not match:
+        return None
+    number = PRICE_TRAILING.sub("", match.group())
+    whole, _, fraction = number.rpartition(decimal_mark)
+    if not whole or len(fraction) == 3:
+        # No decimal mark, or it was really a thousands separator ("1,299" on a comma-decimal site)
+        whole, fraction = number, ""
+    value = PRICE_GROUPING.sub("", whole)
+    return float(f"{value}.{fraction}" if fraction else value)
+
+@functools.lru_cache(maxsize=4096)
+def detect_currency(price, default):
+    """Return the ISO code of the currency written in price, or default if it names none"""
+    if not price or price == "N/A":
+        return None
+    for code in CURRENCY_CODE.findall(price):
+        if code in CURRENCY_CODES:
+            return code
+    for marker, codes in CURRENCY_MARKERS:
+        if marker in price:
+            return default if default in codes else codes[0]
+    return default
+
+def parse_posted_date(text, now):
+    """Turn a card date ('Today', '3 days ago', 'hace 3 días', '12 Mar', ISO) into a naive local ISO timestamp,
+    or None if unrecognised"""
+    text = (text or "").strip()
+    if not text or text == "N/A":
+        return None
+    if now.tzinfo is not None:
+        now = now.astimezone().replace(tzinfo=None)
+    lowered = text.lower()
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if lowered in TODAY_WORDS:
+        return midnight.isoformat()
+    if lowered in YESTERDAY_WORDS:
+        return (midnight - timedelta(days=1)).isoformat()
+    
+    for pattern, stems in RELATIVE_DATES:
+        match = pattern.search(lowered)
+        if not match:
+            continue
+        unit = next((delta for stem, delta in stems if match.group(2).startswith(stem)), None)
+        if unit is not None:
+            count = int(match.group(1)) if match.group(1) else 1
+            return (now - count * unit).replace(microsecond=0).isoformat()
+    
+    try:
+        posted = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        pass
+    else:
+        if posted.tzinfo is not None:
+            # Every posted_at is naive local time, like the run's clock
+            posted = posted.astimezone().replace(tzinfo=None)
+        return posted.isoformat()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).isoformat()
+        except ValueError:
+            pass
+    for fmt in DAY_MONTH_FORMATS:
+        try:
+            posted = datetime.strptime(f"{text} {now.year}", f"{fmt} %Y")
+        except ValueError:
+            continue
+        # Cards omit the year; a date later than today is from last year
+        if posted > now:
+            posted = posted.replace(year=posted.year - 1)
+        return posted.isoformat()
+    return None
+
+class ListingNormalizer:
+    """Adds numeric price_value, currency and absolute posted_at to batches of listings
+    
+    Prices and dates repeat heavily within a crawl ('Today', common price points), so each batch
+    is reduced to its distinct values, those are parsed once, and the results are mapped back.
+    """
+    def __init__(self, country="in", now=None):
+        self.currency, self.decimal_mark = COUNTRY_CURRENCIES.get(country, (None, "."))
+        # Relative dates are resolved against the start of the run
+        self.now = now or datetime.now()
+    
+    def normalize_prices(self, prices):
+        """Return (values, currencies) lists for a batch of price strings"""
+        distinct = {
+            price: (parse_price(price, self.decimal_mark), detect_currency(price, self.currency))
+            for price in set(prices)
+        }
+        parsed = [distinct[price] for price in prices]
+        return [value for value, _ in parsed], [currency for _, currency in parsed]
+    
+    def normalize_dates(self, dates):
+        """Return ISO timestamps (or None) for a batch of card dates"""
+        distinct = {text: parse_posted_date(text, self.now) for text in set(dates)}
+        return [distinct[text] for text in dates]
+    
+    def normalize(self, listings):
+        """Return copies of listings with the NORMALIZED_FIELDS filled in"""
+        values, currencies = self.normalize_prices([listing.get("price") for listing in listings])
+        posted = self.normalize_dates([listing.get("date_posted") for listing in listings])
+        normalized = []
+        for listing, value, currency, posted_at in zip(listings, values, currencies, posted):
+            listing = dict(listing)
+            listing["price_value"] = value
+            listing["currency"] = currency if value is not None else None
+            listing["posted_at"] = posted_at
+            normalized.append(listing)
+        return normalized
+
+class ListingStore:
+    """Column-oriented listing buffer with interned repeated values and numeric prices
+    
+    Holds one list per field instead of one dict per listing; iterating yields listing dicts,
+    so it can be passed anywhere a list of listings is expected.
+    """
+    # Text columns --normalize adds; only held once normalized listings are stored
+    NORMALIZED_COLUMNS = ["currency", "posted_at"]
+    # Fields whose values repeat across many listings
+    INTERNED_FIELDS = ("location", "date_posted", "currency")
+    
+    def __init__(self, listings=(), decimal_mark="."):
+        self.columns = {field: [] for field in LISTING_FIELDS}
+        # Parsed prices, NaN where the price has no number; decimal_mark is the site's (see decimal_mark_for)
+        self.price_values = array("d")
+        self.decimal_mark = decimal_mark
+        # Set once normalized listings are stored, so they are handed back with their extra fields
+        self.normalized = False
+        self._strings = {}
+        self.extend(listings)
+    
+    def append(self, listing):
+        if "price_value" in listing and not self.normalized:
+            self.normalized = True
+            for field in self.NORMALIZED_COLUMNS:
+                self.columns[field] = [None] * len(self)
+        for field, column in self.columns.items():
+            value = listing.get(field, "N/A" if field in LISTING_FIELDS else None)
+            if field in self.INTERNED_FIELDS:
+                value = self._strings.setdefault(value, value)
+            column.append(value)
+        if "price_value" in listing:
+            price_value = listing["price_value"]
+        else:
+            price_value = parse_price(listing.get("price"), self.decimal_mark)
+        self.price_values.append(price_value if price_value is not None else math.nan)
+    
+    def extend(self, listings):
+        for listing in listings:
+            self.append(listing)
+    
+    def __len__(self):
+        return len(self.price_values)
+    
+    def __getitem__(self, index):
+        listing = {field: self.columns[field][index] for field in LISTING_FIELDS}
+        if self.normalized:
+            price_value = self.price_values[index]
+            listing["price_value"] = None if math.isnan(price_value) else price_value
+            listing["currency"] = self.columns["currency"][index]
+            listing["posted_at"] = self.columns["posted_at"][index]
+        return listing
+    
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+    
+    def to_arrow(self):
+        """Return the listings as a pyarrow Table, with repeated values dictionary-encoded"""
+        import pyarrow as pa
+        arrays = {}
+        for field, column in self.columns.items():
+            arrays[field] = pa.array(column, pa.string())
+            if field in self.INTERNED_FIELDS:
+                arrays[field] = arrays[field].dictionary_encode()
+        # from_pandas turns NaN into null
+        arrays["price_value"] = pa.array(self.price_values.tolist(), pa.float64(), from_pandas=True)
+        return pa.table(arrays)
+
+class TxtSink:
+    """Write listings as a human-readable text report, one page at a time"""
+    extension = "txt"
+    resumable = True
+    
+    def __init__(self, path, search_query, resume_count=None):
+        self.path = path
+        if resume_count is not None:
+            # Continue the listing numbering of an interrupted run
+            self.count = resume_count
+            self.file = open(path, "a", encoding="utf-8")
+            return
+        self.count = 0
+        self.file = open(path, "w", encoding="utf-8")
+        self.file.write(f"OLX Search Results for '{search_query}'\n")
+        self.file.write("=" * 60 + "\n\n")
+    
+    def write_page(self, listings):
+        for listing in listings:
+            self.count += 1
+            self.file.write(f"Listing #{self.count}\n")
+            self.file.write(f"Title: {listing['title']}\n")
+            self.file.write(f"Price: {listing['price']}\n")
+            self.file.write(f"Location: {listing['location']}\n")
+            self.file.write(f"Date Posted: {listing['date_posted']}\n")
+            self.file.write(f"URL: {listing['url']}\n")
+            self.file.write("-" * 60 + "\n")
+        self.file.flush()
+    
+    def sync(self):
+        return sync_file(self.file)
+    
+    def close(self):
+        if not self.count:
+            self.file.write("No listings found.\n")
+        self.file.close()
+
+class CsvSink:
+    """Write listings as CSV rows, one page at a time"""
+    extension = "csv"
+    resumable = True
+    
+    def __init__(self, path, search_query, resume_count=None):
+        self.path = path
+        self.count = resume_count or 0
+        self.file = open(path, "a" if resume_count is not None else "w", encoding="utf-8", newline="")
+        self.writer = None
+    
+    def write_page(self, listings):
+        if not listings:
+            return
+        if self.writer is None:
+            # Normalized listings get their extra columns
+            fieldnames = LISTING_FIELDS + [field for field in NORMALIZED_FIELDS if field in listings[0]]
+            self.writer = csv.DictWriter(self.file, fieldnames=fieldnames, extrasaction="ignore")
+            # A resumed file already has its header
+            if not self.count:
+                self.writer.writeheader()
+        self.writer.writerows(listings)
+        self.count += len(listings)
+        self.file.flush()
+    
+    def sync(self):
+        return sync_file(self.file)
+    
+    def close(self):
+        if not self.count:
+            self.file.write("No listings found.\n")
+        self.file.close()
+
+class JsonSink:
+    """Write listings as a JSON array, one compact object per line, streamed page by page"""
+    extension = "json"
+    resumable = True
+    
+    def __init__(self, path, search_query, resume_count=None):
+        self.path = path
+        if resume_count is not None:
+            # The file was cut back to the end of the last checkpointed listing, before the closing "]"
+            self.count = resume_count
+            self.file = open(path, "a", encoding="utf-8")
+            return
+        self.count = 0
+        self.file = open(path, "w", encoding="utf-8")
+        self.file.write("[")
+    
+    def write_page(self, listings):
+        for listing in listings:
+            self.file.write(",\n" if self.count else "\n")
+            self.file.write(json.dumps(listing, ensure_ascii=False))
+            self.count += 1
+        self.file.flush()
+    
+    def sync(self):
+        return sync_file(self.file)
+    
+    def close(self):
+        self.file.write("\n]\n" if self.count else "]\n")
+        self.file.close()
+
+class JsonlSink:
+    """Write listings as JSON Lines, one page at a time"""
+    extension = "jsonl"
+    resumable = True
+    
+    def __init__(self, path, search_query, resume_count=None):
+        self.path = path
+        self.count = resume_count or 0
+        self.file = open(path, "a" if resume_count is not None else "w", encoding="utf-8")
+    
+    def write_page(self, listings):
+        for listing in listings:
+            self.file.write(json.dumps(listing, ensure_ascii=False) + "\n")
+        self.count += len(listings)
+        self.file.flush()
+    
+    def sync(self):
+        return sync_file(self.file)
+    
+    def close(self):
+        self.file.close()
+
+class JsonlGzSink:
+    """Write listings as gzip-compressed JSON Lines with a numeric price_value, one page at a time"""
+    extension = "jsonl.gz"
+    # A gzip stream cannot be cut back to a page boundary, so interrupted runs start this file over
+    resumable = False
+    # open_sinks passes the site's decimal mark to sinks that parse prices
+    parses_prices = True
+    
+    def __init__(self, path, search_query, decimal_mark="."):
+        self.path = path
+        self.count = 0
+        self.decimal_mark = decimal_mark
+        self.file = gzip.open(path, "wt", encoding="utf-8")
+    
+    def write_page(self, listings):
+        for listing in listings:
+            record = dict(listing)
+            record.setdefault("price_value", parse_price(listing.get("price"), self.decimal_mark))
+            self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        # Not flushed per page: a sync flush per page would cost most of the compression
+        self.count += len(listings)
+    
+    def sync(self):
+        return None
+    
+    def close(self):
+        self.file.close()
+
+class ParquetSink:
+    """Write listings to a Parquet file, buffering pages in a ListingStore and writing a row group per ROW_GROUP_SIZE listings"""
+    extension = "parquet"
+    # Parquet files cannot be appended to once closed
+    resumable = False
+    parses_prices = True
+    ROW_GROUP_SIZE = 50000
+    
+    def __init__(self, path, search_query, decimal_mark="."):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet output needs pyarrow (pip install pyarrow)")
+        self._pq = pq
+        self.path = path
+        self.search_query = search_query
+        self.count = 0
+        self.writer = None
+        self.decimal_mark = decimal_mark
+        self.buffer = ListingStore(decimal_mark=decimal_mark)
+    
+    def write_page(self, listings):
+        self.buffer.extend(listings)
+        self.count += len(listings)
+        if len(self.buffer) >= self.ROW_GROUP_SIZE:
+            self._write_row_group()
+    
+    def sync(self):
+        return None
+    
+    def _write_row_group(self):
+        table = self.buffer.to_arrow()
+        if self.writer is None:
+            schema = table.schema.with_metadata({"search_query": self.search_query})
+            self.writer = self._pq.ParquetWriter(self.path, schema, compression="zstd")
+        self.writer.write_table(table)
+        self.buffer = ListingStore(decimal_mark=self.decimal_mark)
+    
+    def close(self):
+        # An empty run still gets a valid file with the schema
+        if len(self.buffer) or self.writer is None:
+            self._write_row_group()
+        self.writer.close()
+
+SINK_CLASSES = {
+    "txt": TxtSink,
+    "csv": CsvSink,
+    "json": JsonSink,
+    "jsonl": JsonlSink,
+    "jsonl.gz": JsonlGzSink,
+    "parquet": ParquetSink,
+}
+
+def sync_file(file):
+    """Flush file to disk and return its size, the offset a resumed run continues from"""
+    file.flush()
+    os.fsync(file.fileno())
+    return os.fstat(file.fileno()).st_size
+
+def open_sinks(base_filename, formats, search_query, resume=None, decimal_mark="."):
+    """Open one sink per requested output format, continuing the files in resume (extension -> count and offset) if given"""
+    sinks = []
+    for fmt in formats:
+        sink_class = SINK_CLASSES[fmt]
+        path = f"{base_filename}.{sink_class.extension}"
+        if getattr(sink_class, "parses_prices", False):
+            sinks.append(sink_class(path, search_query, decimal_mark=decimal_mark))
+            continue
+        state = (resume or {}).get(sink_class.extension)
+        if sink_class.resumable and state and state["offset"] is not None and os.path.exists(path):
+            # Drop anything written after the last checkpointed page
+            with open(path, "r+b") as f:
+                f.truncate(state["offset"])
+            sinks.append(sink_class(path, search_query, resume_count=state["count"]))
+        else:
+            sinks.append(sink_class(path, search_query))
+    return sinks
+
+class ResponseCache:
+    """Content-addressed on-disk cache of fetched pages with HTTP validators, a TTL and LRU eviction
+    
+    The index (validators, fetch and access times) is kept in memory and written once by close().
+    """
+    INDEX_FILE = "index.json"
+    
+    def __init__(self, directory="cache", ttl=3600, max_bytes=500 * 1024 * 1024):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        
+        self.index = {}
+        # Set when the index has changed since it was loaded or saved
+        self._dirty = False
+        index_path = os.path.join(directory, self.INDEX_FILE)
+        if os.path.exists(index_path):
+            try:
+                with open(index_path, encoding="utf-8") as f:
+                    self.index = json.load(f)
+            except ValueError:
+                logger.warning(f"Cache index {index_path} is corrupt, starting with an empty cache")
+    
+    @staticmethod
+    def make_key(url, query):
+        """Return the content address for a URL fetched for a search query"""
+        return hashlib.sha256(f"{query}\n{url}".encode("utf-8")).hexdigest()
+    
+    def _body_path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.html")
+    
+    def _save_index(self):
+        # Write to a temp file first so a crash never leaves a half-written index
+        index_path = os.path.join(self.directory, self.INDEX_FILE)
+        tmp_path = f"{index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, index_path)
+    
+    def get(self, url, query):
+        """Return the cache entry for url/query (marking it recently used), or None"""
+        key = self.make_key(url, query)
+        with self._lock:
+            entry = self.index.get(key)
+            if entry is None or not os.path.exists(self._body_path(key)):
+                return None
+            entry["last_access"] = time.time()
+            self._dirty = True
+            return dict(entry, key=key)
+    
+    def is_fresh(self, entry):
+        """Return True if the entry is younger than the TTL and can be used without revalidating"""
+        return time.time() - entry["fetched_at"] < self.ttl
+    
+    def read(self, entry):
+        """Return the cached page body"""
+        with open(self._body_path(entry["key"]), encoding="utf-8") as f:
+            return f.read()
+    
+    def conditional_headers(self, entry):
+        """Return If-None-Match/If-Modified-Since headers to revalidate the entry"""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+    
+    def refresh(self, entry):
+        """Mark an entry as revalidated (the server answered 304 Not Modified)"""
+        with self._lock:
+            if entry["key"] in self.index:
+                self.index[entry["key"]]["fetched_at"] = time.time()
+                self._dirty = True
+    
+    def store(self, url, query, body, etag=None, last_modified=None):
+        """Save a page body with its validators, evicting least recently used entries over the size limit"""
+        key = self.make_key(url, query)
+        data = body.encode("utf-8")
+        path = self._body_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        with self._lock:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            
+            now = time.time()
+            self.index[key] = {
+                "url": url,
+                "query": query,
+                "etag": etag,
+                "last_modified": last_modified,
+                "fetched_at": now,
+                "last_access": now,
+                "size": len(data),
+            }
+            self._evict()
+            self._dirty = True
+    
+    def _evict(self):
+        total = sum(entry["size"] for entry in self.index.values())
+        for key, entry in sorted(self.index.items(), key=lambda item: item[1]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            total -= entry["size"]
+            del self.index[key]
+            try:
+                os.remove(self._body_path(key))
+            except OSError:
+                pass
+    
+    def close(self):
+        """Save the index if it changed, so access times carry over to the next run's LRU eviction"""
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+                self._dirty = False
+
+class SeenIndex:
+    """Persistent SQLite index of emitted listings, so re-runs only emit new or changed ones"""
+    # OLX listing URLs end in -iid-<id>; the ID is stable even if the slug or host changes
+    LISTING_ID_PATTERN = re.compile(r"iid-(\d+)")
+    
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        import sqlite3
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS listings ("
+            " scope TEXT NOT NULL,"
+            " listing_key TEXT NOT NULL,"
+            " fingerprint TEXT NOT NULL,"
+            " first_seen REAL NOT NULL,"
+            " last_seen REAL NOT NULL,"
+            " PRIMARY KEY (scope, listing_key))"
+        )
+        self.conn.commit()
+    
+    def listing_key(self, listing):
+        """Return the identity of a listing: its OLX ID, else its URL, else a hash of title and location"""
+        url = listing.get("url", "N/A")
+        if url != "N/A":
+            match = self.LISTING_ID_PATTERN.search(url)
+            return f"iid:{match.group(1)}" if match else url
+        return "hash:" + hashlib.sha1(f"{listing.get('title')}\n{listing.get('location')}".encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def fingerprint(listing):
+        """Hash the fields whose change makes a listing worth emitting again"""
+        data = json.dumps([listing.get("title"), listing.get("price"), listing.get("location")], sort_keys=True, default=str)
+        return hashlib.sha1(data.encode("utf-8")).hexdigest()
+    
+    def filter_new(self, scope, listings):
+        """Return the listings that are new or changed within scope, without recording them (see mark_seen)"""
+        fresh = []
+        page_keys = {}
+        with self._lock:
+            for listing in listings:
+                key = self.listing_key(listing)
+                fingerprint = self.fingerprint(listing)
+                if key in page_keys:
+                    # Repeated on the same page: only its first copy can be new
+                    changed = page_keys[key] != fingerprint
+                else:
+                    row = self.conn.execute(
+                        "SELECT fingerprint FROM listings WHERE scope = ? AND listing_key = ?", (scope, key)
+                    ).fetchone()
+                    changed = row is None or row[0] != fingerprint
+                page_keys[key] = fingerprint
+                if changed:
+                    fresh.append(listing)
+        return fresh
+    
+    def mark_seen(self, scope, listings):
+        """Record listings as seen within scope; call once their page is safely in the output"""
+        now = time.time()
+        with self._lock, self.conn:
+            for listing in listings:
+                key = self.listing_key(listing)
+                fingerprint = self.fingerprint(listing)
+                updated = self.conn.execute(
+                    "UPDATE listings SET fingerprint = ?, last_seen = ? WHERE scope = ? AND listing_key = ?",
+                    (fingerprint, now, scope, key)
+                ).rowcount
+                if not updated:
+                    self.conn.execute(
+                        "INSERT INTO listings VALUES (?, ?, ?, ?, ?)", (scope, key, fingerprint, now, now)
+                    )
+    
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+# URL patterns blocked per resource type when Selenium loads pages
+BLOCKABLE_RESOURCES = {
+    "images": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico"],
+    "fonts": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    "media": ["*.mp4", "*.webm", "*.mp3", "*.m3u8"],
+    "stylesheets": ["*.css"],
+}
+
+# Rendered listings; their appearance is what page loads wait for
+LISTING_SELECTOR = "[data-aut-id='itemBox']"
+
+def chrome_driver_factory(proxy=None, user_agent=None, headless=True, block_resources=("images", "fonts"), proxy_pool=None):
+    """Return a function that starts a configured Chrome WebDriver, each on a proxy from proxy_pool if given
+    (recorded as the driver's proxy_server, so pages it loads can report back to the pool)"""
+    def create_driver():
+        # Only import Selenium when needed
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+        from selenium.common.exceptions import WebDriverException
+        
+        chrome_options = Options()
+        if headless:
+            chrome_options.add_argument("--headless=new")
+        chrome_options.add_argument("--disable-gpu")
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.add_argument("--window-size=1920,1080")
+        if user_agent:
+            chrome_options.add_argument(f"user-agent={user_agent}")
+        if "images" in block_resources:
+            chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        
+        # Set up proxy if provided
+        server = proxy_pool.choose() if proxy_pool else proxy
+        if server:
+            chrome_options.add_argument(f'--proxy-server={server}')
+        
+        # Try to use the installed Chrome WebDriver
+        try:
+            driver = webdriver.Chrome(service=Service(), options=chrome_options)
+            logger.info("Successfully initialized Chrome WebDriver with system driver")
+        except WebDriverException:
+            # Fall back to ChromeDriverManager
+            from webdriver_manager.chrome import ChromeDriverManager
+            driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
+            logger.info("Successfully initialized Chrome WebDriver with ChromeDriverManager")
+        
+        # Block the remaining resource types at the network layer
+        patterns = [pattern for resource in block_resources for pattern in BLOCKABLE_RESOURCES[resource]]
+        if patterns:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        driver.proxy_server = server
+        return driver
+    
+    return create_driver
+
+def wait_for_listings(driver, timeout=15, poll_interval=0.25):
+    """Wait until listings render and their count stops changing, instead of sleeping a fixed time"""
+    deadline = time.monotonic() + timeout
+    last_count = -1
+    while time.monotonic() < deadline:
+        count = len(driver.find_elements("css selector", LISTING_SELECTOR))
+        if count and count == last_count:
+            return True
+        last_count = count
+        time.sleep(poll_interval)
+    
+    # No listings rendered: settle for a fully loaded document so its source can still be inspected
+    return driver.execute_script("return document.readyState") == "complete"
+
+class DriverPool:
+    """Pool of WebDrivers started on demand and reused across pages and queries
+    
+    Drivers come from factory() and only need get(url), page_source, find_elements(by, value),
+    execute_script(script) and quit(), so tests can pass a factory that returns a fake driver.
+    """
+    def __init__(self, factory, size=1):
+        self.factory = factory
+        self.size = max(1, size)
+        self._idle = []
+        self._drivers = []
+        # Drivers running or being started; a discarded or failed driver frees its slot for a waiter
+        self._slots = 0
+        self._cond = threading.Condition()
+    
+    def acquire(self):
+        """Take an idle driver, starting a new one if the pool is not full yet, else wait for one"""
+        with self._cond:
+            while not self._idle and self._slots >= self.size:
+                self._cond.wait()
+            if self._idle:
+                return self._idle.pop()
+            # Reserve the slot before the (slow) browser start
+            self._slots += 1
+        
+        try:
+            driver = self.factory()
+        except Exception:
+            with self._cond:
+                self._slots -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._drivers.append(driver)
+        return driver
+    
+    def release(self, driver):
+        """Return a healthy driver to the pool"""
+        with self._cond:
+            self._idle.append(driver)
+            self._cond.notify()
+    
+    def discard(self, driver):
+        """Quit a broken driver; its slot goes to a waiting caller, which starts a fresh one"""
+        with self._cond:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+                self._slots -= 1
+                self._cond.notify()
+        try:
+            driver.quit()
+        except Exception:
+            pass
+    
+    def close(self):
+        """Quit every driver in the pool"""
+        with self._cond:
+            drivers = self._drivers
+            self._drivers = []
+            self._idle = []
+            self._slots = 0
+            self._cond.notify_all()
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        if drivers:
+            logger.info(f"Closed {len(drivers)} WebDriver(s)")
+
+class StrategyPlanner:
+    """Per-country record of how well each scraping method works, persisted between runs"""
+    METHODS = ("requests", "api", "selenium")
+    
+    def __init__(self, path=None):
+        # Without a path the planner only learns within this process
+        self.path = path
+        self._lock = threading.Lock()
+        self.stats = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.stats = json.load(f)
+            except ValueError:
+                logger.warning(f"Strategy stats file {path} is corrupt, starting fresh")
+    
+    def order(self, country, methods):
+        """Return methods best first: the one that last worked, then by success rate and latency"""
+        country_stats = self.stats.get(country, {})
+        last_success = max(
+            (method for method in methods if country_stats.get(method, {}).get("last_success")),
+            key=lambda method: country_stats[method]["last_success"],
+            default=None
+        )
+        
+        def rank(method):
+            stats = country_stats.get(method)
+            if not stats:
+                # Untried methods keep their default position behind known-good ones
+                return (method != last_success, -0.5, 0.0, methods.index(method))
+            # Laplace-smoothed so one lucky page does not outrank a long track record
+            success_rate = (stats["successes"] + 1) / (stats["attempts"] + 2)
+            return (method != last_success, -success_rate, stats["avg_latency"], methods.index(method))
+        
+        return sorted(methods, key=rank)
+    
+    def record(self, country, method, attempts, successes, elapsed):
+        """Record the outcome of running method over attempts pages, successes of which had listings"""
+        if not attempts:
+            return
+        with self._lock:
+            stats = self.stats.setdefault(country, {}).setdefault(
+                method, {"attempts": 0, "successes": 0, "avg_latency": 0.0, "last_success": None}
+            )
+            latency = elapsed / attempts
+            # Exponential moving average keeps latency responsive to recent runs
+            stats["avg_latency"] = latency if not stats["attempts"] else 0.7 * stats["avg_latency"] + 0.3 * latency
+            stats["attempts"] += attempts
+            stats["successes"] += successes
+            if successes:
+                stats["last_success"] = time.time()
+            self._save()
+    
+    def _save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.stats, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+class CrawlCheckpoint:
+    """Durable record of a crawl's progress (completed pages, counters and output file offsets)
+    
+    Rewritten atomically after every page, once that page's output is on disk, so --resume can
+    continue an interrupted run in the same files without fetching any completed page again.
+    """
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.state = {}
+        if resume and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.state = json.load(f)
+        elif os.path.exists(path):
+            logger.warning(f"Ignoring the checkpoint in {path} (use --resume to continue that run)")
+        self.resumed = bool(self.state)
+    
+    @staticmethod
+    def path_for(directory, query, country):
+        """Return the checkpoint file of a query in directory"""
+        return os.path.join(directory, f"olx_{query.replace(' ', '_')}_{country}.json")
+    
+    @property
+    def completed_pages(self):
+        return set(self.state.get("completed_pages", []))
+    
+    def start(self, base_filename, formats):
+        """Begin a new checkpoint for output written to base_filename in formats"""
+        self.state = {
+            "base_filename": base_filename,
+            "formats": list(formats),
+            "completed_pages": [],
+            "found_count": 0,
+            "result_count": 0,
+            "pages_fetched": 0,
+            "stopped": False,
+            "sinks": {},
+        }
+        self.save()
+    
+    def record(self, page, scraper, sinks):
+        """Mark page as done, with the scraper's counters and the synced sinks' sizes"""
+        if page is not None and page not in self.state["completed_pages"]:
+            self.state["completed_pages"].append(page)
+        for name in ("found_count", "result_count", "pages_fetched", "stopped"):
+            self.state[name] = getattr(scraper, name)
+        self.state["sinks"] = {sink.extension: {"count": sink.count, "offset": offset} for sink, offset in sinks}
+        self.state["updated_at"] = datetime.now().isoformat(timespec="seconds")
+        self.save()
+    
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+    
+    def remove(self):
+        """Forget the checkpoint once the crawl has finished"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+def proxy_label(proxy):
+    """Return proxy without its credentials, for logs and metrics"""
+    parsed = urlparse(proxy if "://" in proxy else f"http://{proxy}")
+    return f"{parsed.scheme}://{parsed.hostname}:{parsed.port}" if parsed.port else f"{parsed.scheme}://{parsed.hostname}"
+
+class ProxyPool:
+    """Proxies scored by latency and failure rate, with traffic spread over the healthy ones
+    
+    Each proxy keeps moving averages of its latency and failure rate; requests go to a random
+    proxy weighted by health. After failure_threshold failures in a row (errors, 403/429, CAPTCHA
+    or access denied pages) a proxy's circuit opens and it rests for cooldown seconds, doubling
+    every time it trips again, before it is tried again.
+    """
+    def __init__(self, proxies, failure_threshold=3, cooldown=60.0, max_cooldown=900.0):
+        if not proxies:
+            raise ValueError("the proxy pool needs at least one proxy")
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._lock = threading.Lock()
+        self.stats = {
+            proxy: {"latency": None, "failure_rate": 0.0, "consecutive_failures": 0, "trips": 0,
+                    "open_until": 0.0, "successes": 0, "failures": 0}
+            for proxy in proxies
+        }
+    
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """Load one proxy URL per line (blank lines and # comments are skipped)"""
+        with open(path, encoding="utf-8") as f:
+            proxies = [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+        return cls(list(dict.fromkeys(proxies)), **kwargs)
+    
+    def choose(self, exclude=()):
+        """Pick a proxy, favouring low latency and few failures among those whose circuit is closed,
+        and avoiding the proxies in exclude unless no other is available"""
+        now = time.monotonic()
+        with self._lock:
+            healthy = [proxy for proxy, stats in self.stats.items() if stats["open_until"] <= now]
+            healthy = [proxy for proxy in healthy if proxy not in exclude] or healthy
+            if not healthy:
+                # Everything is resting: use the proxy that comes back first rather than stall
+                return min(self.stats, key=lambda proxy: self.stats[proxy]["open_until"])
+            
+            known = [self.stats[proxy]["latency"] for proxy in healthy if self.stats[proxy]["latency"] is not None]
+            # Untried proxies are assumed to be average so they get their share of traffic
+            default_latency = sum(known) / len(known) if known else 1.0
+            weights = []
+            for proxy in healthy:
+                stats = self.stats[proxy]
+                latency = stats["latency"] if stats["latency"] is not None else default_latency
+                weights.append(max(1.0 - stats["failure_rate"], 0.05) ** 2 / max(latency, 0.05))
+        return random.choices(healthy, weights=weights)[0]
+    
+    def record_success(self, proxy, seconds=None):
+        """Count a page that came back with listings in seconds, closing the proxy's circuit"""
+        with self._lock:
+            stats = self.stats.get(proxy)
+            if stats is None:
+                return
+            # Only successful pages count towards latency, so fast block pages do not look attractive
+            if seconds is not None:
+                stats["latency"] = seconds if stats["latency"] is None else 0.7 * stats["latency"] + 0.3 * seconds
+            stats["successes"] += 1
+            stats["failure_rate"] *= 0.7
+            stats["consecutive_failures"] = 0
+            stats["trips"] = 0
+            stats["open_until"] = 0.0
+        metrics.inc("proxy_requests_total", proxy=proxy_label(proxy), outcome="success")
+    
+    def is_open(self, proxy):
+        """Return True if the proxy's circuit is open and it is resting"""
+        with self._lock:
+            stats = self.stats.get(proxy)
+            return stats is not None and stats["open_until"] > time.monotonic()
+    
+    def record_failure(self, proxy, reason):
+        """Count a failed or blocked request, opening the proxy's circuit after too many in a row"""
+        with self._lock:
+            stats = self.stats.get(proxy)
+            if stats is None:
+                return
+            stats["failures"] += 1
+            stats["failure_rate"] = 0.7 * stats["failure_rate"] + 0.3
+            stats["consecutive_failures"] += 1
+            # Requests already in flight when the circuit opened do not extend the rest
+            now = time.monotonic()
+            tripped = stats["consecutive_failures"] >= self.failure_threshold and stats["open_until"] <= now
+            if tripped:
+                cooldown = min(self.cooldown * 2 ** stats["trips"], self.max_cooldown)
+                stats["trips"] += 1
+                stats["open_until"] = now + cooldown
+        metrics.inc("proxy_requests_total", proxy=proxy_label(proxy), outcome=reason)
+        if tripped:
+            logger.warning(f"Proxy {proxy_label(proxy)} failed {stats['consecutive_failures']} times in a row ({reason}), "
+                           f"resting it for {cooldown:.0f}s")
+    
+    def log_summary(self):
+        """Log each proxy's health at the end of a run"""
+        with self._lock:
+            for proxy, stats in self.stats.items():
+                latency = f"{stats['latency']:.2f}s" if stats["latency"] is not None else "n/a"
+                logger.info(f"Proxy {proxy_label(proxy)}: {stats['successes']} ok, {stats['failures']} failed, "
+                            f"failure rate {stats['failure_rate']:.2f}, latency {latency}")
+
+class FetchScheduler:
+    """Worker pool shared by one or more scrapers, with per-domain rate limits and pooled sessions"""
+    def __init__(self, workers=1, rate_limit=0.5, session_pool=None, cache=None, offline=False):
+        self.workers = max(1, workers)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers)
+        # Politeness is enforced per host, so concurrent workers never hit OLX faster than rate_limit
+        self.rate_limiter = RateLimiter(rate_limit, jitter=1.0 / rate_limit if rate_limit > 0 else 0.0)
+        # Keep-alive sessions are shared by every request made through this scheduler
+        self.session_pool = session_pool or SessionPool(pool_size=self.workers)
+        # Optional on-disk response cache; offline mode serves only from it
+        self.cache = cache
+        self.offline = offline
+    
+    def submit(self, fn, *args):
+        """Run fn(*args) on a shared worker"""
+        return self.executor.submit(fn, *args)
+    
+    def close(self):
+        """Stop the workers, release pooled HTTP connections and save the cache index"""
+        self.executor.shutdown(wait=True)
+        self.session_pool.close()
+        if self.cache:
+            self.cache.close()
+
 class OlxScraper:
-    def __init__(self, search_query, max_pages=1, use_selenium=False, proxy=None, country="in"):
+    # Extra rounds for pages lost to a failing proxy when a proxy pool is used
+    PROXY_RETRIES = 2
+    
+    def __init__(self, search_query, max_pages=1, use_selenium=False, proxy=None, country="in",
+                 concurrency=1, rate_limit=0.5, base_url=None, session_pool=None, parser_backend="auto",
+                 keep_results=True, scheduler=None, cache=None, offline=False, seen_index=None, early_stop=True,
+                 driver_pool=None, selenium_workers=1, headless=True, block_resources=("images", "fonts"),
+                 planner=None, parse_pipeline=None, normalize=False, checkpoint=None, proxy_pool=None, debug_dump=True):
         self.search_query = search_query
         self.max_pages = max_pages
         self.use_selenium = use_selenium
         self.proxy = proxy
+        # With a proxy pool every request picks a healthy proxy and pages report back how it did
+        self.proxy_pool = proxy_pool
+        self.page_proxies = {}
+        # Pages lost to a failing or blocked proxy (page -> proxies that failed it), worth retrying through another one
+        self.proxy_failed_pages = {}
+        # Fetched pages waiting to be cached until they parse to listings (page -> ResponseCache.store arguments)
+        self.pending_cache = {}
         self.country = country  # Country code (in for India, ae for UAE, etc.)
-        self.results = []
+        self.concurrency = max(1, concurrency)
+        self.base_url = (base_url or f"https://www.olx.{country}").rstrip("/")
+        # Batch runs pass one scheduler to every scraper; otherwise this scraper owns its own
+        self.owns_scheduler = scheduler is None
+        self.scheduler = scheduler or FetchScheduler(self.concurrency, rate_limit, session_pool, cache, offline)
+        self.rate_limiter = self.scheduler.rate_limiter
+        self.session_pool = self.scheduler.session_pool
+        self.listing_parser = ListingParser(self.base_url, parser_backend)
+        # Optional process-pool parse stage; without it pages are parsed inline
+        self.parse_pipeline = parse_pipeline
+        # Optional stage adding numeric prices, currencies and absolute dates to every page
+        self.normalizer = ListingNormalizer(country) if normalize else None
+        # Buffered results are held column-wise to keep large crawls small in memory
+        self.results = ListingStore(decimal_mark=decimal_mark_for(country))
+        # Streaming runs write pages to sinks and skip buffering in self.results
+        self.keep_results = keep_results
+        self.result_count = 0
+        self.found_count = 0
+        self.pages_fetched = 0
+        # Pages handed to emit_page, so the planner only credits pages that were really scraped
+        self.pages_emitted = 0
+        # With a seen index only new or changed listings are emitted, and pagination
+        # stops at the first page whose listings were all seen before
+        self.seen_index = seen_index
+        self.early_stop = early_stop
+        self.stopped = False
+        # Browsers are pooled; a scraper without a shared pool starts its own on the first Selenium pass
+        # and keeps it for the probe, crawl and fallback passes until close()
+        self.driver_pool = driver_pool
+        self.owns_driver_pool = False
+        self.selenium_workers = max(1, selenium_workers)
+        self.headless = headless
+        self.block_resources = block_resources
+        # Learns which method works per country; shared across batch queries
+        self.planner = planner or StrategyPlanner()
+        # Progress is checkpointed after every page so an interrupted run can be resumed
+        self.checkpoint = checkpoint
+        self.sinks = []
         self.user_agents = [
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36",
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/18.0 Safari/605.1.15",
             "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/135.0.0.0 Safari/537.36",
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:105.0) Gecko/20100101 Firefox/125.0"
         ]
-        
-        # Create directory for debug files
-        os.makedirs("debug", exist_ok=True)
+        # Raw pages are saved to DEBUG_DIR/<country>/<query>/ for troubleshooting unless turned off
+        self.debug_dump = debug_dump
+        self.debug_dir = debug_dir_for(search_query, country)
+    
+    def close(self):
+        """Release the fetch workers, pooled HTTP connections and browsers unless they are shared"""
+        if self.owns_scheduler:
+            self.scheduler.close()
+        if self.owns_driver_pool:
+            self.driver_pool.close()
+            self.driver_pool = None
+            self.owns_driver_pool = False
+    
+    def debug_path(self, name):
+        """Return where to save a debug dump, creating the query's debug directory on first use, or None if dumps are off"""
+        if not self.debug_dump:
+            return None
+        os.makedirs(self.debug_dir, exist_ok=True)
+        return os.path.join(self.debug_dir, name)
+    
+    def save_debug(self, name, text):
+        """Save a page for debugging unless debug dumps are off"""
+        path = self.debug_path(name)
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
     
     def get_random_user_agent(self):
         """Return a random user agent from the list"""
         return random.choice(self.user_agents)
     
-    def scrape_with_requests(self):
-        """Scrape OLX using the requests library (no browser automation)"""
+    def choose_proxy(self, page=None):
+        """Return the proxy for the next request: one from the pool if there is one (preferring proxies
+        that have not already failed this page), else --proxy"""
+        if not self.proxy_pool:
+            return self.proxy
+        return self.proxy_pool.choose(exclude=self.proxy_failed_pages.get(page, ()))
+    
+    def proxy_failed(self, page, proxy, reason):
+        """Count a failure against proxy and remember that it could not fetch page"""
+        self.proxy_pool.record_failure(proxy, reason)
+        self.proxy_failed_pages.setdefault(page, set()).add(proxy)
+    
+    def report_proxy_response(self, page, proxy, response):
+        """Count a failure status against the proxy that got it"""
+        if self.proxy_pool and (response.status_code in (403, 407, 429) or response.status_code >= 500):
+            self.proxy_failed(page, proxy, f"http_{response.status_code}")
+    
+    def report_proxy_page(self, page, listings, html):
+        """Count a parsed page for or against the proxy that fetched it; CAPTCHA and access denied pages are failures"""
+        proxy, seconds = self.page_proxies.pop(page, (None, None))
+        if proxy is None or listings is None:
+            return
+        if listings:
+            self.proxy_pool.record_success(proxy, seconds)
+            self.proxy_failed_pages.pop(page, None)
+        else:
+            block = detect_block(html) if html else None
+            if block:
+                self.proxy_failed(page, proxy, block)
+    
+    def get_search_url(self, page=1):
+        """Return the search results URL for the given page"""
         # Format the URL - replace spaces with hyphens for OLX search
         formatted_query = self.search_query.replace(" ", "-")
-        base_url = f"https://www.olx.{self.country}/items/q-{formatted_query}"
+        base_url = f"{self.base_url}/items/q-{formatted_query}"
+        return f"{base_url}?page={page}" if page > 1 else base_url
+    
+    def fetch_page(self, page):
+        """Fetch a single search page with requests, returning its HTML or None on failure"""
+        url = self.get_search_url(page)
+        
+        headers = {
+            "User-Agent": self.get_random_user_agent(),
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
+            "Accept-Language": "en-US,en;q=0.5",
+            "Accept-Encoding": "gzip, deflate, br",
+            "Connection": "keep-alive",
+            "Upgrade-Insecure-Requests": "1",
+            "Sec-Fetch-Dest": "document",
+            "Sec-Fetch-Mode": "navigate",
+            "Sec-Fetch-Site": "none",
+            "Sec-Fetch-User": "?1",
+            "Cache-Control": "max-age=0",
+        }
         
-        for page in range(1, self.max_pages + 1):
-            url = f"{base_url}?page={page}" if page > 1 else base_url
-            logger.info(f"Loading page {page} with requests: {url}")
+        cache = self.scheduler.cache
+        # A retry through another proxy must reach the server, not a cached copy of the page that failed
+        entry = cache.get(url, self.search_query) if cache and page not in self.proxy_failed_pages else None
+        fresh = entry is not None and (self.scheduler.offline or cache.is_fresh(entry))
+        if cache:
+            metrics.inc("cache_lookups_total", result="hit" if fresh else "stale" if entry else "miss")
+        if fresh:
+            logger.info(f"Loading page {page} from cache: {url}")
+            return cache.read(entry)
+        if self.scheduler.offline:
+            logger.warning(f"Page {page} is not in the cache, skipping (offline mode)")
+            return None
+        if entry:
+            # Stale entry: ask the server whether it changed
+            headers.update(cache.conditional_headers(entry))
+        
+        # Wait for this host's next rate limit slot
+        self.rate_limiter.acquire(urlparse(url).netloc)
+        logger.info(f"Loading page {page} with requests: {url}")
+        
+        proxy = self.choose_proxy(page)
+        try:
+            start = time.perf_counter()
+            response = self.session_pool.get(proxy).get(url, headers=headers, timeout=20)
+            self.record_response(response, time.perf_counter() - start, "requests")
+            self.report_proxy_response(page, proxy, response)
             
-            headers = {
-                "User-Agent": self.get_random_user_agent(),
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
-                "Accept-Language": "en-US,en;q=0.5",
-                "Accept-Encoding": "gzip, deflate, br",
-                "Connection": "keep-alive",
-                "Upgrade-Insecure-Requests": "1",
-                "Sec-Fetch-Dest": "document",
-                "Sec-Fetch-Mode": "navigate",
-                "Sec-Fetch-Site": "none",
-                "Sec-Fetch-User": "?1",
-                "Cache-Control": "max-age=0",
-            }
+            logger.info(f"Page {page} response status: {response.status_code}")
             
-            proxy_dict = None
-            if self.proxy:
-                proxy_dict = {
-                    "http": self.proxy,
-                    "https": self.proxy
-                }
+            if response.status_code == 304 and entry:
+                cache.refresh(entry)
+                return cache.read(entry)
             
-            # Add a random delay between requests
-            time.sleep(2 + random.random() * 3)
+            # Save the response for debugging
+            self.save_debug(f"olx_requests_page_{page}.html", response.text)
             
-            try:
-                response = requests.get(url, headers=headers, proxies=proxy_dict, timeout=20)
+            if response.status_code == 200:
+                if self.proxy_pool:
+                    # Whether the proxy really got through is only known once the page is parsed
+                    self.page_proxies[page] = (proxy, response.elapsed.total_seconds())
+                if cache:
+                    # Only cached once it parses to listings, so block pages are never served from the cache
+                    self.pending_cache[page] = (url, self.search_query, response.text,
+                                                response.headers.get("ETag"), response.headers.get("Last-Modified"))
+                return response.text
+            logger.error(f"Failed to retrieve page {page}: Status code {response.status_code}")
+        
+        except Exception as e:
+            metrics.inc("http_errors_total", method="requests", error=type(e).__name__)
+            if self.proxy_pool:
+                self.proxy_failed(page, proxy, "error")
+            logger.error(f"Error retrieving page {page}: {e}")
+            traceback.print_exc()
+        
+        return None
+    
+    def fetch_pages(self, pages, fetch=None, submit=None, window=None):
+        """Run fetch(page) for each page (fetch_page on the scheduler by default), keeping at most
+        window pages in flight, and yield (page, html) in page order"""
+        fetch = fetch or self.fetch_page
+        submit = submit or self.scheduler.submit
+        window = window or self.concurrency
+        pages = iter(pages)
+        pending = deque()
+        
+        for page in pages:
+            pending.append((page, submit(fetch, page)))
+            if len(pending) >= window:
+                break
+        
+        try:
+            while pending:
+                page, future = pending.popleft()
+                html = future.result()
                 
-                # Save the response for debugging
-                debug_file = f"debug/olx_requests_page_{page}.html"
-                with open(debug_file, "w", encoding="utf-8") as f:
-                    f.write(response.text)
-                    
-                logger.info(f"Page {page} response status: {response.status_code}")
+                # Top the window back up before handing this page to the caller
+                next_page = next(pages, None)
+                if next_page is not None:
+                    pending.append((next_page, submit(fetch, next_page)))
                 
-                if response.status_code == 200:
-                    # Parse the response
-                    page_results = self.parse_html(response.text, page)
-                    self.results.extend(page_results)
-                else:
-                    logger.error(f"Failed to retrieve page {page}: Status code {response.status_code}")
-            
-            except Exception as e:
-                logger.error(f"Error retrieving page {page}: {e}")
-                traceback.print_exc()
+                yield page, html
+        finally:
+            # The caller stopped early, so drop requests that have not started yet
+            for _, future in pending:
+                future.cancel()
+    
+    def parse_fetched(self, fetched):
+        """Parse (page, html) pairs in page order, yielding (page, listings), or (page, None) for pages that failed to fetch"""
+        html_by_page = {}
+        if self.proxy_pool:
+            # Keep each page's HTML until it is parsed, to tell blocked pages from empty ones
+            fetched = self.track_html(fetched, html_by_page)
+        
+        for page, listings in self.parse_pages(fetched):
+            self.cache_page(page, listings)
+            if self.proxy_pool:
+                self.report_proxy_page(page, listings, html_by_page.pop(page, None))
+            yield page, listings
+    
+    def cache_page(self, page, listings):
+        """Store a freshly fetched page in the response cache if it parsed to listings"""
+        pending = self.pending_cache.pop(page, None)
+        if pending and listings:
+            self.scheduler.cache.store(*pending)
     
-    def scrape_with_selenium(self):
-        """Scrape OLX using Selenium WebDriver"""
+    @staticmethod
+    def track_html(fetched, html_by_page):
+        """Pass (page, html) pairs through, remembering each page's HTML in html_by_page"""
         try:
-            # Only import Selenium when needed
-            from selenium import webdriver
-            from selenium.webdriver.chrome.options import Options
-            from selenium.webdriver.chrome.service import Service
-            from selenium.webdriver.common.by import By
-            from selenium.webdriver.support.ui import WebDriverWait
-            from selenium.webdriver.support import expected_conditions as EC
-            from selenium.common.exceptions import TimeoutException, WebDriverException
-            
-            chrome_options = Options()
-            # Comment out headless mode for debugging
-            # chrome_options.add_argument("--headless")
-            chrome_options.add_argument("--disable-gpu")
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            chrome_options.add_argument("--window-size=1920,1080")
-            chrome_options.add_argument(f"user-agent={self.get_random_user_agent()}")
-            
-            # Set up proxy if provided
-            if self.proxy:
-                chrome_options.add_argument(f'--proxy-server={self.proxy}')
-            
-            # Try to use the installed Chrome WebDriver
-            try:
-                service = Service()
-                driver = webdriver.Chrome(service=service, options=chrome_options)
-                logger.info("Successfully initialized Chrome WebDriver with system driver")
-            except WebDriverException:
-                # Fall back to ChromeDriverManager
+            for page, html in fetched:
+                html_by_page[page] = html
+                yield page, html
+        finally:
+            if hasattr(fetched, "close"):
+                fetched.close()
+    
+    def parse_pages(self, fetched):
+        """Parse (page, html) pairs inline or on the parse pipeline"""
+        if self.parse_pipeline:
+            # Parse on worker processes while the fetchers keep downloading
+            for item in self.parse_pipeline.run(fetched, self.base_url):
+                yield item
+            return
+        
+        for page, html in fetched:
+            # Parse the response
+            yield page, self.parse_html(html, page) if html is not None else None
+    
+    def scrape_with_requests(self, pages=None):
+        """Scrape OLX using the requests library (no browser automation), returning the pages that yielded nothing"""
+        pages = list(range(1, self.max_pages + 1)) if pages is None else list(pages)
+        failed = self.crawl_with_requests(pages)
+        
+        # The pool steers retries of pages lost to a bad proxy towards healthier ones
+        for _ in range(self.PROXY_RETRIES if self.proxy_pool else 0):
+            retry = [page for page in failed if page in self.proxy_failed_pages]
+            if not retry or self.stopped:
+                break
+            logger.info(f"Retrying pages {retry} through other proxies")
+            failed = sorted(set(failed) - set(retry) | set(self.crawl_with_requests(retry)))
+        return failed
+    
+    def crawl_with_requests(self, pages):
+        """Fetch and emit pages with requests, returning the pages that yielded nothing"""
+        failed = []
+        for page, page_results in self.parse_fetched(self.fetch_pages(pages)):
+            if page_results is not None:
+                self.pages_fetched += 1
+            if not page_results:
+                failed.append(page)
+            elif not self.emit_page(page_results, page):
+                break
+        return failed
+    
+    def load_with_selenium(self, page):
+        """Load one search page in a pooled browser, returning its HTML or None on failure"""
+        url = self.get_search_url(page)
+        
+        # Wait for this host's next rate limit slot
+        self.rate_limiter.acquire(urlparse(url).netloc)
+        logger.info(f"Loading page {page} with Selenium: {url}")
+        
+        driver = self.driver_pool.acquire()
+        # Pooled browsers stay on the proxy they were started with
+        proxy = getattr(driver, "proxy_server", None) if self.proxy_pool else None
+        healthy = True
+        try:
+            # Load the page with retry logic
+            max_retries = 3
+            for attempt in range(max_retries):
                 try:
-                    from webdriver_manager.chrome import ChromeDriverManager
-                    service = Service(ChromeDriverManager().install())
-                    driver = webdriver.Chrome(service=service, options=chrome_options)
-                    logger.info("Successfully initialized Chrome WebDriver with ChromeDriverManager")
-                except Exception as e:
-                    logger.error(f"Failed to initialize Chrome WebDriver: {e}")
-                    raise
-            
-            # Format the URL
-            formatted_query = self.search_query.replace(" ", "-")
-            base_url = f"https://www.olx.{self.country}/items/q-{formatted_query}"
-            
-            for page in range(1, self.max_pages + 1):
-                url = f"{base_url}?page={page}" if page > 1 else base_url
-                logger.info(f"Loading page {page} with Selenium: {url}")
-                
-                # Add a random delay between pages
-                if page > 1:
-                    time.sleep(3 + random.random() * 2)
-                
-                # Load the page with retry logic
-                max_retries = 3
-                for attempt in range(max_retries):
-                    try:
+                    start = time.perf_counter()
+                    with metrics.timer("selenium_load_seconds"):
                         driver.get(url)
-                        
-                        # Wait for page to load (try multiple selectors)
-                        try:
-                            WebDriverWait(driver, 15).until(
-                                EC.presence_of_element_located((By.CSS_SELECTOR, "[data-aut-id='itemBox']"))
-                            )
-                        except TimeoutException:
-                            # Try alternative wait conditions
-                            WebDriverWait(driver, 15).until(
-                                EC.presence_of_element_located((By.TAG_NAME, "body"))
-                            )
-                        
-                        # Add a small delay for JavaScript to fully load
-                        time.sleep(3)
-                        
-                        logger.info(f"Page {page} loaded successfully")
-                        
-                        # Save the page source for debugging
-                        html = driver.page_source
-                        debug_file = f"debug/olx_selenium_page_{page}.html"
-                        with open(debug_file, "w", encoding="utf-8") as f:
-                            f.write(html)
-                        
-                        # Parse the page
-                        page_results = self.parse_html(html, page)
-                        self.results.extend(page_results)
-                        break
-                        
-                    except Exception as e:
-                        if attempt < max_retries - 1:
-                            logger.warning(f"Error on page {page}, retrying ({attempt+1}/{max_retries}): {e}")
-                            time.sleep(5)  # Wait before retrying
+                        wait_for_listings(driver)
+                    
+                    logger.info(f"Page {page} loaded successfully")
+                    
+                    # Save the page source for debugging
+                    html = driver.page_source
+                    self.save_debug(f"olx_selenium_page_{page}.html", html)
+                    if proxy:
+                        block = detect_block(html)
+                        if block:
+                            self.proxy_failed(page, proxy, block)
+                            # Replace a browser whose proxy is now resting with one on a healthier proxy
+                            healthy = not self.proxy_pool.is_open(proxy)
                         else:
-                            logger.error(f"Failed to load page {page} after {max_retries} attempts: {e}")
-                            # Save the current page source for debugging
-                            try:
-                                with open(f"debug/olx_selenium_error_page_{page}.html", "w", encoding="utf-8") as f:
-                                    f.write(driver.page_source)
-                            except:
-                                pass
-                            break
-            
-            driver.quit()
-            logger.info("WebDriver closed")
+                            # Whether the proxy really got through is only known once the page is parsed
+                            self.page_proxies[page] = (proxy, time.perf_counter() - start)
+                    return html
+                    
+                except Exception as e:
+                    if attempt < max_retries - 1:
+                        logger.warning(f"Error on page {page}, retrying ({attempt+1}/{max_retries}): {e}")
+                        time.sleep(5)  # Wait before retrying
+                    else:
+                        logger.error(f"Failed to load page {page} after {max_retries} attempts: {e}")
+                        if proxy:
+                            self.proxy_failed(page, proxy, "error")
+                        # Save the current page source for debugging
+                        try:
+                            self.save_debug(f"olx_selenium_error_page_{page}.html", driver.page_source)
+                        except:
+                            # The browser itself is unusable, replace it
+                            healthy = False
+        finally:
+            if healthy:
+                self.driver_pool.release(driver)
+            else:
+                self.driver_pool.discard(driver)
+        
+        return None
+    
+    def scrape_with_selenium(self, pages=None):
+        """Scrape OLX using a pool of Selenium WebDrivers, loading pages in parallel, and return the pages that yielded nothing"""
+        pages = list(range(1, self.max_pages + 1)) if pages is None else list(pages)
+        done = set()
+        if self.driver_pool is None:
+            factory = chrome_driver_factory(self.proxy, self.get_random_user_agent(), self.headless, self.block_resources,
+                                            self.proxy_pool)
+            self.driver_pool = DriverPool(factory, self.selenium_workers)
+            self.owns_driver_pool = True
+        
+        try:
+            with ThreadPoolExecutor(max_workers=self.driver_pool.size) as executor:
+                fetched = self.fetch_pages(pages, self.load_with_selenium, executor.submit, self.driver_pool.size)
+                for page, page_results in self.parse_fetched(fetched):
+                    if page_results is not None:
+                        self.pages_fetched += 1
+                        if page_results:
+                            done.add(page)
+                            if not self.emit_page(page_results, page):
+                                break
             
         except Exception as e:
             logger.error(f"Error during Selenium scraping: {e}")
             traceback.print_exc()
+        
+        return [page for page in pages if page not in done] if not self.stopped else []
+    
+    def try_api_approach(self, pages=(1,)):
+        """Ingest search results from the OLX JSON API, fetching pages concurrently, and return the pages that yielded nothing"""
+        pages = list(pages)
+        if not pages:
+            return []
+        
+        # The first page tells us how many pages exist
+        page_results, metadata = self.fetch_api_page(pages[0])
+        if page_results is not None:
+            self.pages_fetched += 1
+        failed = [] if page_results else [pages[0]]
+        if page_results and not self.emit_page(page_results, pages[0]):
+            return []
+        
+        remaining = pages[1:]
+        total_pages = metadata.get("total_pages")
+        if total_pages is not None:
+            # API pages are numbered from 0, search pages from 1
+            remaining = [page for page in remaining if page <= total_pages]
+        elif metadata.get("next_page_url"):
+            # No page count: next-page links only lead to the pages straight after the first one,
+            # pages after a gap are fetched by number below
+            linked = []
+            for page in remaining:
+                if page != pages[0] + len(linked) + 1:
+                    break
+                linked.append(page)
+            failed += self.follow_api_pages(metadata["next_page_url"], linked)
+            if self.stopped:
+                return []
+            remaining = remaining[len(linked):]
+        # Without metadata (or when the first page failed) the other pages are still fetched by number
+        
+        def fetch(page):
+            return self.fetch_api_page(page)[0]
+        
+        for page, page_results in self.fetch_pages(remaining, fetch):
+            if page_results is not None:
+                self.pages_fetched += 1
+            if not page_results:
+                failed.append(page)
+            elif not self.emit_page(page_results, page):
+                return []
+        return failed
     
-    def try_api_approach(self):
-        """Try to access OLX API endpoints directly"""
+    def follow_api_pages(self, next_url, pages):
+        """Fetch pages by following the API's next_page_url links, returning the pages that yielded nothing"""
+        for i, page in enumerate(pages):
+            if not next_url:
+                return []
+            page_results, metadata = self.fetch_api_page(page, next_url)
+            if page_results is not None:
+                self.pages_fetched += 1
+            if not page_results:
+                return pages[i:]
+            if not self.emit_page(page_results, page):
+                return []
+            next_url = metadata.get("next_page_url")
+        return []
+    
+    def get_api_url(self, page=1):
+        """Return the API search URL for the given search page"""
         # OLX sometimes has API endpoints that can be accessed directly
         formatted_query = self.search_query.replace(" ", "+")
         
         # Different OLX domains might have different API structures
         # This is a common pattern, but might need adjustments
-        base_api_url = f"https://www.olx.{self.country}/api/relevance/search?query={formatted_query}"
+        api_url = f"{self.base_url}/api/relevance/search?query={formatted_query}"
+        if page > 1:
+            # API pages are numbered from 0
+            api_url += f"&page={page - 1}"
+        return api_url
+    
+    def fetch_api_page(self, page, url=None):
+        """Fetch one page of API search results, returning (listings, metadata), or (None, {}) if it could not be fetched
         
+        Runs on the fetch workers, so pages_fetched is counted by the caller.
+        """
+        url = url or self.get_api_url(page)
         headers = {
             "User-Agent": self.get_random_user_agent(),
             "Accept": "application/json",
             "X-Requested-With": "XMLHttpRequest"
         }
         
+        page_results = None
+        metadata = {}
+        proxy = None
         try:
-            response = requests.get(base_api_url, headers=headers, timeout=15)
+            self.rate_limiter.acquire(urlparse(url).netloc)
+            logger.info(f"Loading API page {page}: {url}")
+            proxy = self.choose_proxy(page)
+            start = time.perf_counter()
+            response = self.session_pool.get(proxy).get(url, headers=headers, timeout=15, stream=True)
+            self.report_proxy_response(page, proxy, response)
             
-            # Save the API response for analysis
-            with open("debug/olx_api_response.json", "w", encoding="utf-8") as f:
-                f.write(response.text)
-                
-            if response.status_code == 200:
-                try:
-                    data = response.json()
-                    logger.info("Successfully retrieved data from API")
-                    
-                    # Parse API response - structure will depend on OLX's API
-                    # This is a placeholder - adapt based on actual API response
-                    if "data" in data and isinstance(data["data"], list):
-                        for item in data["data"]:
-                            listing = {}
-                            listing["title"] = item.get("title", "N/A")
-                            listing["price"] = item.get("price", {}).get("value", "N/A")
-                            listing["location"] = item.get("location", {}).get("label", "N/A")
-                            listing["date_posted"] = item.get("created_at", "N/A")
-                            listing["url"] = item.get("url", "N/A")
-                            self.results.append(listing)
-                    
-                except ValueError:
-                    logger.warning("API response is not valid JSON")
-            else:
+            if response.status_code != 200:
+                self.record_response(response, time.perf_counter() - start, "api")
                 logger.warning(f"API request failed with status code: {response.status_code}")
-                
+                response.close()
+                return page_results, metadata
+            
+            # Save the API response for analysis while it is parsed
+            debug_file = self.debug_path("olx_api_response.json" if page == 1 else f"olx_api_response_{page}.json")
+            response.raw.decode_content = True
+            listings = []
+            with open(debug_file, "wb") if debug_file else nullcontext() as f, response:
+                for kind, value in stream_api_response(TeeReader(response.raw, f) if f else response.raw):
+                    if kind == "item":
+                        listings.append(api_item_to_listing(value, self.base_url))
+                    else:
+                        metadata = value
+            # The body is parsed as it streams in, so download time includes JSON decoding
+            self.record_response(response, time.perf_counter() - start, "api")
+            
+            page_results = listings
+            if self.proxy_pool and page_results:
+                self.proxy_pool.record_success(proxy, response.elapsed.total_seconds())
+                self.proxy_failed_pages.pop(page, None)
+            logger.info(f"Retrieved {len(page_results)} listings from API page {page}")
+        
+        except ValueError as e:
+            logger.warning(f"API response is not valid JSON: {e}")
+            if self.proxy_pool and proxy:
+                # Usually a challenge page served in place of the JSON, so it counts against the proxy
+                self.proxy_failed(page, proxy, "invalid_json")
+            # Items streamed before the error are an incomplete page, so the page counts as failed
+            page_results, metadata = None, {}
         except Exception as e:
+            metrics.inc("http_errors_total", method="api", error=type(e).__name__)
+            if self.proxy_pool and proxy:
+                self.proxy_failed(page, proxy, "error")
             logger.error(f"Error accessing API: {e}")
+            page_results, metadata = None, {}
+        
+        return page_results, metadata
+    
+    @staticmethod
+    def record_response(response, seconds, method):
+        """Record a response's status and its time to first byte and download time"""
+        # requests measures elapsed from sending the request until the headers are parsed
+        ttfb = response.elapsed.total_seconds()
+        metrics.inc("http_responses_total", method=method, status=response.status_code)
+        metrics.observe("http_request_seconds", seconds, method=method)
+        metrics.observe("http_ttfb_seconds", ttfb, method=method)
+        metrics.observe("http_download_seconds", max(seconds - ttfb, 0.0), method=method)
     
     def parse_html(self, html, page_num):
         """Parse HTML to extract listing information"""
-        page_results = []
+        return self.listing_parser.parse(html, page_num)
+    
+    def open_sinks(self, formats=("txt", "csv", "json"), base_filename=None):
+        """Start streaming results to the given output formats, returning the file names
         
-        try:
-            soup = BeautifulSoup(html, "html.parser")
-            
-            # Try multiple selectors for listings
-            listings = []
-            
-            # Strategy 1: Look for itemBox data attribute (common in newer OLX designs)
-            listings = soup.select("[data-aut-id='itemBox']")
-            
-            # Strategy 2: Look for list items with specific class patterns
-            if not listings:
-                listings = soup.find_all("li", class_=re.compile(r"_.*item.*"))
-            
-            # Strategy 3: Look for cards/divs with listing content
-            if not listings:
-                listings = soup.select(".EIR5N")  # Example class name, adjust based on inspection
-            
-            # Strategy 4: Generic listing pattern (fallback)
-            if not listings:
-                listings = soup.select("div[class*='listing']")
-                if not listings:
-                    listings = soup.select("div[class*='item']")
-            
-            if not listings:
-                logger.warning(f"No listings found on page {page_num} using any selector method")
-                # Check for possible API blocking or CAPTCHA
-                if "captcha" in html.lower() or "robot" in html.lower():
-                    logger.warning("Possible CAPTCHA or anti-bot measures detected")
-                elif "access denied" in html.lower() or "blocked" in html.lower():
-                    logger.warning("Access appears to be blocked or denied")
-                
-                return page_results
-            
-            logger.info(f"Found {len(listings)} listings on page {page_num}")
-            
-            # Process each listing
-            for listing in listings:
-                listing_data = {}
-                
-                # Extract title - try multiple selectors
-                title = None
-                title_selectors = [
-                    "[data-aut-id='itemTitle']",
-                    "span[class*='title']",
-                    "h2",
-                    ".title",
-                    "[class*='title']"
-                ]
-                
-                for selector in title_selectors:
-                    title_tag = listing.select_one(selector)
-                    if title_tag:
-                        title = title_tag.get_text(strip=True)
-                        break
-                
-                listing_data["title"] = title if title else "N/A"
-                
-                # Extract price - try multiple selectors
-                price = None
-                price_selectors = [
-                    "[data-aut-id='itemPrice']",
-                    "span[class*='price']",
-                    ".price",
-                    "[class*='price']"
-                ]
-                
-                for selector in price_selectors:
-                    price_tag = listing.select_one(selector)
-                    if price_tag:
-                        price = price_tag.get_text(strip=True)
-                        break
-                
-                listing_data["price"] = price if price else "N/A"
-                
-                # Extract location - try multiple selectors
-                location = None
-                location_selectors = [
-                    "[data-aut-id='item-location']",
-                    "span[class*='location']",
-                    ".location",
-                    "[class*='location']"
-                ]
-                
-                for selector in location_selectors:
-                    location_tag = listing.select_one(selector)
-                    if location_tag:
-                        location = location_tag.get_text(strip=True)
-                        break
-                
-                listing_data["location"] = location if location else "N/A"
-                
-                # Extract date posted - try multiple selectors
-                date = None
-                date_selectors = [
-                    "[data-aut-id='itemCreationDate']",
-                    "span[class*='date']",
-                    ".date",
-                    "[class*='date']",
-                    "[class*='time']"
-                ]
-                
-                for selector in date_selectors:
-                    date_tag = listing.select_one(selector)
-                    if date_tag:
-                        date = date_tag.get_text(strip=True)
-                        break
-                
-                listing_data["date_posted"] = date if date else "N/A"
-                
-                # Extract URL
-                url = None
-                link_tag = listing.find("a")
-                if link_tag and 'href' in link_tag.attrs:
-                    href = link_tag['href']
-                    # Ensure absolute URL
-                    if href.startswith('/'):
-                        url = f"https://www.olx.{self.country}{href}"
-                    elif href.startswith('http'):
-                        url = href
-                    else:
-                        url = f"https://www.olx.{self.country}/{href}"
-                
-                listing_data["url"] = url if url else "N/A"
-                
-                # Only add if we have meaningful data
-                if listing_data["title"] != "N/A" or listing_data["price"] != "N/A":
-                    page_results.append(listing_data)
-            
-        except Exception as e:
-            logger.error(f"Error parsing HTML for page {page_num}: {e}")
-            traceback.print_exc()
+        A resumed run keeps writing to the files (and formats) of the run it continues.
+        """
+        resume = None
+        if self.checkpoint and self.checkpoint.resumed:
+            base_filename = self.checkpoint.state["base_filename"]
+            formats = self.checkpoint.state["formats"]
+            resume = self.checkpoint.state["sinks"]
+            restarted = [fmt for fmt in formats if not SINK_CLASSES[fmt].resumable]
+            if restarted:
+                logger.warning(f"{', '.join(restarted)} output cannot be resumed and will only hold pages scraped from now on")
+        elif base_filename is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            base_filename = f"olx_{self.search_query.replace(' ', '_')}_{timestamp}"
         
-        return page_results
+        self.sinks = open_sinks(base_filename, formats, self.search_query, resume, decimal_mark_for(self.country))
+        if self.checkpoint and not self.checkpoint.resumed:
+            self.checkpoint.start(base_filename, formats)
+        return [sink.path for sink in self.sinks]
     
-    def scrape(self):
-        """Main scraping method that tries different approaches"""
-        logger.info(f"Starting OLX scraper for '{self.search_query}' in {self.country}")
+    def close_sinks(self, discard=False):
+        """Close streaming sinks, deleting their files if discard is set"""
+        for sink in self.sinks:
+            sink.close()
+            if discard:
+                os.remove(sink.path)
+        self.sinks = []
+    
+    def emit_page(self, page_results, page=None):
+        """Hand one parsed page to every open sink (and the in-memory buffer if kept) and checkpoint it,
+        returning False once pagination can stop"""
+        self.pages_emitted += 1
+        self.found_count += len(page_results)
+        if self.normalizer:
+            page_results = self.normalizer.normalize(page_results)
+        new_results = page_results
+        scope = f"{self.country}:{self.search_query}"
+        if self.seen_index:
+            new_results = self.seen_index.filter_new(scope, page_results)
+            if len(new_results) < len(page_results):
+                logger.info(f"Skipped {len(page_results) - len(new_results)} already seen listings")
         
-        # First try the requests approach (simpler, less resource-intensive)
-        self.scrape_with_requests()
+        self.result_count += len(new_results)
+        if self.keep_results:
+            self.results.extend(new_results)
+        for sink in self.sinks:
+            with metrics.timer("sink_write_seconds", format=sink.extension):
+                sink.write_page(new_results)
         
-        # If we got results, we can stop here
-        if self.results:
-            logger.info(f"Successfully scraped {len(self.results)} listings using requests approach")
-            return self.results
+        if self.seen_index and self.early_stop and page_results and not new_results:
+            logger.info("Every listing on this page was seen before, stopping pagination")
+            self.stopped = True
         
-        # If no results from requests, try the API approach
-        logger.info("No results from requests approach, trying API approach")
-        self.try_api_approach()
+        if self.checkpoint:
+            # The page only counts as done once its output is on disk
+            self.checkpoint.record(page, self, [(sink, sink.sync()) for sink in self.sinks])
+        if self.seen_index:
+            # Only now: a kill before this point leaves the page unseen, so --resume scrapes it again
+            self.seen_index.mark_seen(scope, page_results)
+        return not self.stopped
+    
+    def resume_from_checkpoint(self, pages):
+        """Restore the counters of the interrupted run and return the pages it had not finished"""
+        state = self.checkpoint.state
+        self.found_count = state["found_count"]
+        self.result_count = state["result_count"]
+        self.pages_fetched = state["pages_fetched"]
+        self.stopped = state["stopped"]
+        done = self.checkpoint.completed_pages
+        remaining = [] if self.stopped else [page for page in pages if page not in done]
+        logger.info(f"Resuming '{self.search_query}': {len(done)} pages already done, {len(remaining)} left")
+        return remaining
+    
+    def run_method(self, method, pages):
+        """Scrape pages with one method, record how it did and return the pages that yielded nothing"""
+        scrape_methods = {
+            "requests": self.scrape_with_requests,
+            "api": self.try_api_approach,
+            "selenium": self.scrape_with_selenium,
+        }
+        start = time.monotonic()
+        emitted = self.pages_emitted
+        failed = scrape_methods[method](pages)
+        # Pages left unfetched after an early stop are neither successes nor failures
+        successes = self.pages_emitted - emitted
+        self.planner.record(self.country, method, successes + len(failed), successes, time.monotonic() - start)
+        return failed
+    
+    def scrape(self):
+        """Main scraping method: probe page 1 with the most promising method, crawl with the first one that
+        works, then retry pages that came back empty with the remaining methods one page at a time"""
+        logger.info(f"Starting OLX scraper for '{self.search_query}' in {self.country}")
+        pages = list(range(1, self.max_pages + 1))
+        if self.checkpoint and self.checkpoint.resumed:
+            pages = self.resume_from_checkpoint(pages)
+            if not pages:
+                return self.results
         
-        # If we got results from API, we can stop here
-        if self.results:
-            logger.info(f"Successfully scraped {len(self.results)} listings using API approach")
+        # Offline runs re-parse cached pages and never touch the network
+        if self.scheduler.offline:
+            self.scrape_with_requests(pages)
+            logger.info(f"Re-parsed {self.found_count} listings from the cache")
             return self.results
         
-        # If still no results and Selenium is enabled, try Selenium
+        methods = ["requests", "api"]
         if self.use_selenium:
-            logger.info("No results from requests or API, trying Selenium approach")
-            self.scrape_with_selenium()
-            
-            if self.results:
-                logger.info(f"Successfully scraped {len(self.results)} listings using Selenium approach")
-            else:
-                logger.warning("No results from any approach")
+            methods.append("selenium")
         else:
             logger.info("Selenium approach skipped (disabled)")
-            
+        methods = self.planner.order(self.country, methods)
+        logger.info(f"Strategy order for {self.country}: {', '.join(methods)}")
+        
+        # Probe a single page before committing to a full crawl
+        chosen = None
+        for method in methods:
+            logger.info(f"Probing page 1 with {method} approach")
+            if not self.run_method(method, pages[:1]):
+                chosen = method
+                break
+            logger.info(f"No results from {method} approach")
+        
+        if chosen is None:
+            logger.warning("No results from any approach")
+            return self.results
+        
+        failed = self.run_method(chosen, pages[1:]) if not self.stopped else []
+        
+        # Let only the pages that failed fall back to the other methods
+        for method in methods[methods.index(chosen) + 1:]:
+            if not failed or self.stopped:
+                break
+            logger.info(f"Retrying pages {failed} with {method} approach")
+            failed = self.run_method(method, failed)
+        
+        if failed:
+            logger.warning(f"Pages {failed} yielded no listings with any approach")
+        logger.info(f"Successfully scraped {self.found_count} listings, mostly using {chosen} approach")
         return self.results
     
-    def save_results(self):
-        """Save scraping results to both TXT and CSV formats"""
+    def save_results(self, formats=("txt", "csv", "json")):
+        """Save buffered results to the given formats (TXT, CSV and JSON by default), returning the file names"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         base_filename = f"olx_{self.search_query.replace(' ', '_')}_{timestamp}"
         
-        # Save to TXT
-        txt_filename = f"{base_filename}.txt"
-        with open(txt_filename, "w", encoding="utf-8") as file:
-            file.write(f"OLX Search Results for '{self.search_query}'\n")
-            file.write("=" * 60 + "\n\n")
-            
-            if not self.results:
-                file.write("No listings found.\n")
-            else:
-                for i, listing in enumerate(self.results, 1):
-                    file.write(f"Listing #{i}\n")
-                    file.write(f"Title: {listing['title']}\n")
-                    file.write(f"Price: {listing['price']}\n")
-                    file.write(f"Location: {listing['location']}\n")
-                    file.write(f"Date Posted: {listing['date_posted']}\n")
-                    file.write(f"URL: {listing['url']}\n")
-                    file.write("-" * 60 + "\n")
-        
-        # Save to CSV
-        csv_filename = f"{base_filename}.csv"
-        with open(csv_filename, "w", encoding="utf-8", newline="") as file:
-            if not self.results:
-                file.write("No listings found.\n")
-            else:
-                fieldnames = ["title", "price", "location", "date_posted", "url"]
-                writer = csv.DictWriter(file, fieldnames=fieldnames)
-                writer.writeheader()
-                for listing in self.results:
-                    writer.writerow(listing)
-        
-        # Save raw JSON for programmatic access
-        json_filename = f"{base_filename}.json"
-        with open(json_filename, "w", encoding="utf-8") as file:
-            json.dump(self.results, file, indent=2)
+        sinks = open_sinks(base_filename, formats, self.search_query, decimal_mark=decimal_mark_for(self.country))
+        for sink in sinks:
+            sink.write_page(self.results)
+            sink.close()
         
-        return txt_filename, csv_filename, json_filename
+        return tuple(sink.path for sink in sinks)
+
+def read_batch_file(path, default_country):
+    """Read (query, country) pairs from a batch file of 'query[,country]' lines"""
+    jobs = []
+    with open(path, encoding="utf-8", newline="") as f:
+        for row in csv.reader(f):
+            if not row or not row[0].strip() or row[0].lstrip().startswith("#"):
+                continue
+            query = row[0].strip()
+            country = row[1].strip() if len(row) > 1 and row[1].strip() else default_country
+            jobs.append((query, country))
+    return jobs
+
+def build_cache(args):
+    """Create the response cache requested on the command line, if any"""
+    if not args.cache_dir and not args.from_cache:
+        return None
+    return ResponseCache(args.cache_dir or "cache", ttl=args.cache_ttl, max_bytes=int(args.cache_max_mb * 1024 * 1024))
+
+def parse_block_resources(value):
+    """Turn a comma-separated --block-resources value into resource type names"""
+    resources = [resource.strip() for resource in value.split(",") if resource.strip() and resource.strip() != "none"]
+    unknown = [resource for resource in resources if resource not in BLOCKABLE_RESOURCES]
+    if unknown:
+        raise ValueError(f"unknown resource type(s): {', '.join(unknown)}")
+    return tuple(resources)
+
+def build_scraper(args, query, country, scheduler=None, seen_index=None, driver_pool=None, planner=None, parse_pipeline=None,
+                  proxy_pool=None):
+    """Create a streaming scraper for one query from the command-line options"""
+    return OlxScraper(
+        search_query=query,
+        max_pages=args.pages,
+        use_selenium=args.selenium,
+        proxy=args.proxy,
+        country=country,
+        concurrency=args.concurrency,
+        rate_limit=args.rate_limit,
+        base_url=args.base_url,
+        session_pool=None if scheduler else SessionPool(pool_size=args.pool_size, retries=args.retries, backoff=args.backoff),
+        parser_backend=args.parser,
+        keep_results=False,
+        cache=None if scheduler else build_cache(args),
+        offline=args.from_cache,
+        seen_index=seen_index,
+        early_stop=not args.no_early_stop,
+        driver_pool=driver_pool,
+        selenium_workers=args.selenium_workers,
+        headless=not args.headed,
+        block_resources=parse_block_resources(args.block_resources),
+        planner=planner or StrategyPlanner(args.strategy_file),
+        parse_pipeline=parse_pipeline,
+        normalize=args.normalize,
+        checkpoint=CrawlCheckpoint(CrawlCheckpoint.path_for(args.checkpoint_dir, query, country), args.resume),
+        proxy_pool=proxy_pool,
+        debug_dump=not args.no_debug_dump,
+        scheduler=scheduler
+    )
+
+def run_query(scraper, formats, base_filename=None):
+    """Scrape one query, streaming it to the given formats, and return the output file names"""
+    # Pages are written to every output as soon as they are parsed
+    filenames = scraper.open_sinks(formats, base_filename)
+    try:
+        scraper.scrape()
+        if scraper.checkpoint:
+            # The run finished, so there is nothing left to resume
+            scraper.checkpoint.remove()
+    finally:
+        scraper.close()
+        # Nothing was found, so don't leave empty result files behind
+        scraper.close_sinks(discard=not scraper.result_count)
+    return filenames if scraper.result_count else []
+
+def run_batch(args, formats):
+    """Scrape every query in the batch file over one shared fetch scheduler"""
+    jobs = read_batch_file(args.batch, args.country)
+    scheduler = FetchScheduler(
+        workers=args.concurrency,
+        rate_limit=args.rate_limit,
+        session_pool=SessionPool(pool_size=args.pool_size, retries=args.retries, backoff=args.backoff),
+        cache=build_cache(args),
+        offline=args.from_cache
+    )
+    seen_index = SeenIndex(args.seen_db) if args.seen_db else None
+    planner = StrategyPlanner(args.strategy_file)
+    parse_pipeline = ParsePipeline(args.parse_workers, args.parser) if args.parse_workers else None
+    proxy_pool = ProxyPool.from_file(args.proxy_file) if args.proxy_file else None
+    # Browsers are started at most once for the whole batch
+    driver_pool = None
+    if args.selenium:
+        factory = chrome_driver_factory(args.proxy, None, not args.headed, parse_block_resources(args.block_resources),
+                                        proxy_pool)
+        driver_pool = DriverPool(factory, args.selenium_workers)
+    logger.info(f"Running {len(jobs)} queries with {args.batch_workers} at a time over {scheduler.workers} shared fetch workers")
+    
+    def run_job(job):
+        query, country = job
+        scraper = build_scraper(args, query, country, scheduler, seen_index, driver_pool, planner, parse_pipeline, proxy_pool)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        base_filename = f"olx_{query.replace(' ', '_')}_{country}_{timestamp}"
+        start = time.monotonic()
+        try:
+            run_query(scraper, formats, base_filename)
+        except Exception as e:
+            logger.error(f"Query '{query}' ({country}) failed: {e}")
+        return query, country, scraper.pages_fetched, scraper.result_count, time.monotonic() - start
+    
+    # Query drivers only parse and write; all HTTP work runs on the scheduler's workers
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, args.batch_workers)) as drivers:
+            stats = list(drivers.map(run_job, jobs))
+    finally:
+        scheduler.close()
+        if seen_index:
+            seen_index.close()
+        if driver_pool:
+            driver_pool.close()
+        if parse_pipeline:
+            parse_pipeline.close()
+        if proxy_pool:
+            proxy_pool.log_summary()
+    
+    print(f"\n{'query':<30}{'country':<9}{'pages':>6}{'listings':>10}{'seconds':>9}{'pages/s':>9}{'listings/s':>12}")
+    for query, country, pages, listings, elapsed in stats:
+        elapsed = max(elapsed, 1e-9)
+        print(f"{query[:29]:<30}{country:<9}{pages:>6}{listings:>10}{elapsed:>9.1f}{pages / elapsed:>9.2f}{listings / elapsed:>12.1f}")
+    print(f"\nTotal {'new ' if seen_index else ''}listings found: {sum(stat[3] for stat in stats)}")
+
+def natural_key(name):
+    """Sort key that puts page_9 before page_10"""
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", name)]
+
+def iter_archived_pages(source):
+    """Yield (name, size, page) for every archived HTML page in a directory tree or tarball"""
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort(key=natural_key)
+            for name in sorted(files, key=natural_key):
+                if name.endswith((".html", ".htm")):
+                    path = os.path.join(root, name)
+                    # Workers map the file themselves, so only the path crosses the process boundary
+                    yield os.path.relpath(path, source), os.path.getsize(path), MappedPage(path)
+    else:
+        # Compression is detected automatically (.tar, .tar.gz, .tar.bz2, .tar.xz); members are
+        # read in archive order so compressed tarballs are streamed in a single pass
+        import tarfile
+        with tarfile.open(source) as tar:
+            for member in tar:
+                if member.isfile() and member.name.endswith((".html", ".htm")):
+                    yield member.name, member.size, tar.extractfile(member).read()
+
+def reparse_main(argv):
+    """Re-parse archived pages on all cores and write consolidated output"""
+    parser = argparse.ArgumentParser(prog="olx-scrapper.py reparse",
+                                     description="Re-parse archived OLX pages without re-crawling")
+    parser.add_argument("source", nargs="?", help="Directory (searched recursively) or tarball of archived .html pages")
+    parser.add_argument("--query", type=str,
+                        help=f"Re-parse this query's debug dumps ({DEBUG_DIR}/<country>/<query>/) instead of a source")
+    parser.add_argument("--country", type=str, default="in",
+                        help="OLX domain suffix (e.g. 'in', 'com.pk') used to make listing URLs absolute and read prices")
+    parser.add_argument("--base-url", type=str, help="Site URL used to make listing URLs absolute (overrides --country)")
+    parser.add_argument("--parser", type=str, default="auto", choices=["auto"] + list(PARSER_BACKENDS), help="HTML parser backend")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parse worker processes")
+    parser.add_argument("--formats", type=str, default="jsonl", help=f"Comma-separated output formats ({', '.join(SINK_CLASSES)})")
+    parser.add_argument("--output", type=str, help="Output file name without extension (default olx_reparse_<timestamp>)")
+    args = parser.parse_args(argv)
+    
+    formats = [fmt.strip() for fmt in args.formats.split(",") if fmt.strip()]
+    unknown = [fmt for fmt in formats if fmt not in SINK_CLASSES]
+    if unknown:
+        parser.error(f"unknown output format(s): {', '.join(unknown)}")
+    if (args.source is None) == (args.query is None):
+        parser.error("give either a source or --query")
+    if args.query:
+        args.source = debug_dir_for(args.query, args.country)
+    if not os.path.exists(args.source):
+        parser.error(f"{args.source} does not exist")
+    
+    setup_logging()
+    base_url = (args.base_url or f"https://www.olx.{args.country}").rstrip("/")
+    base_filename = args.output or f"olx_reparse_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    sinks = open_sinks(base_filename, formats, f"reparse of {args.source}", decimal_mark=decimal_mark_for(args.country))
+    
+    stats = {"pages": 0, "bytes": 0}
+    def archived_pages():
+        for name, size, page in iter_archived_pages(args.source):
+            stats["pages"] += 1
+            stats["bytes"] += size
+            yield name, page
+    
+    pipeline = ParsePipeline(args.workers, args.parser)
+    listings = 0
+    start = time.monotonic()
+    try:
+        for name, page_results in pipeline.run(archived_pages(), base_url):
+            listings += len(page_results)
+            for sink in sinks:
+                sink.write_page(page_results)
+    finally:
+        pipeline.close()
+        for sink in sinks:
+            sink.close()
+    elapsed = max(time.monotonic() - start, 1e-9)
+    
+    print(f"\nRe-parsed {stats['pages']} pages ({stats['bytes'] / 1e6:.1f} MB) into {listings} listings "
+          f"in {elapsed:.2f}s with {pipeline.workers} workers")
+    print(f"Throughput: {stats['pages'] / elapsed:.1f} pages/s, {stats['bytes'] / 1e6 / elapsed:.1f} MB/s, "
+          f"{listings / elapsed:.0f} listings/s")
+    print("\nResults saved to:\n" + "\n".join(f"- {sink.path}" for sink in sinks))
+
+def finish_profile(profiler, path):
+    """Save profiler stats to path and print the most expensive calls"""
+    import pstats
+    profiler.dump_stats(path)
+    print(f"\nProfile saved to {path}; top functions by cumulative time:")
+    pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
+
+def finish_metrics(path):
+    """Log where the run's time went and write the metrics dump if one was requested"""
+    logger.info(f"Time spent: {metrics.summary()}")
+    if path:
+        metrics.write(path)
+        logger.info(f"Metrics written to {path}")
+
+def run_single(args, formats):
+    """Scrape the --query given on the command line"""
+    seen_index = SeenIndex(args.seen_db) if args.seen_db else None
+    parse_pipeline = ParsePipeline(args.parse_workers, args.parser) if args.parse_workers else None
+    proxy_pool = ProxyPool.from_file(args.proxy_file) if args.proxy_file else None
+    scraper = build_scraper(args, args.query, args.country, seen_index=seen_index, parse_pipeline=parse_pipeline,
+                            proxy_pool=proxy_pool)
+    try:
+        filenames = run_query(scraper, formats)
+    finally:
+        if seen_index:
+            seen_index.close()
+        if parse_pipeline:
+            parse_pipeline.close()
+        if proxy_pool:
+            proxy_pool.log_summary()
+    
+    if scraper.result_count:
+        logger.info(f"Successfully scraped {scraper.result_count} listings")
+        print("\nResults saved to:\n" + "\n".join(f"- {filename}" for filename in filenames))
+        print(f"\nTotal listings found: {scraper.result_count}")
+    elif scraper.found_count:
+        logger.info(f"Found {scraper.found_count} listings, none new since the last run")
+        print("\nNo new or changed listings since the last run.")
+    else:
+        logger.warning("No results found")
+        print("\nNo listings were found. Check the debug directory and log file for details."
+              if not args.no_debug_dump else "\nNo listings were found. Check the log file for details.")
+        print("\nTry running with --selenium flag for browser automation approach")
+
+def setup_logging():
+    """Log to the console and to olx_scraper.log"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler("olx_scraper.log"),
+            logging.StreamHandler()
+        ]
+    )
 
 def main():
     """Main function to run the scraper"""
-    parser = argparse.ArgumentParser(description="OLX Scraper Tool")
+    if sys.argv[1:2] == ["reparse"]:
+        reparse_main(sys.argv[2:])
+        return
+    
+    parser = argparse.ArgumentParser(description="OLX Scraper Tool",
+                                     epilog="Run 'olx-scrapper.py reparse --help' to re-parse archived pages offline.")
     parser.add_argument("--query", type=str, default="car cover", help="Search query")
     parser.add_argument("--pages", type=int, default=3, help="Maximum number of pages to scrape")
     parser.add_argument("--selenium", action="store_true", help="Use Selenium if other methods fail")
+    parser.add_argument("--selenium-workers", type=int, default=1, help="Browsers to run in parallel for the Selenium approach")
+    parser.add_argument("--headed", action="store_true", help="Show the Selenium browser window instead of running headless")
+    parser.add_argument("--block-resources", type=str, default="images,fonts",
+                        help=f"Resource types Selenium should not load ({', '.join(BLOCKABLE_RESOURCES)}, or 'none')")
     parser.add_argument("--proxy", type=str, help="Proxy to use (format: http://host:port)")
-    parser.add_argument("--country", type=str, default="in", help="Country code for OLX domain (e.g., 'in' for India)")
+    parser.add_argument("--proxy-file", type=str,
+                        help="File of proxy URLs, one per line; requests are spread over the healthy ones (overrides --proxy)")
+    parser.add_argument("--country", type=str, default="in", help="OLX domain suffix, as in www.olx.<country> (e.g., 'in' for India, 'com.pk' for Pakistan)")
+    parser.add_argument("--concurrency", type=int, default=1, help="Number of pages to fetch in parallel (shared by all queries in batch mode)")
+    parser.add_argument("--rate-limit", type=float, default=0.5, help="Maximum requests per second per host (0 to disable)")
+    parser.add_argument("--base-url", type=str, help="Override the OLX site URL (e.g., a local mirror or mock server)")
+    parser.add_argument("--parser", type=str, default="auto", choices=["auto"] + list(PARSER_BACKENDS),
+                        help="HTML parser backend (auto picks selectolax or lxml when installed, else bs4)")
+    parser.add_argument("--parse-workers", type=int, default=0,
+                        help="Parse pages on this many worker processes while fetching continues (0 parses inline)")
+    parser.add_argument("--formats", type=str, default="txt,csv,json",
+                        help=f"Comma-separated output formats to stream ({', '.join(SINK_CLASSES)})")
+    parser.add_argument("--normalize", action="store_true",
+                        help="Add numeric price_value, currency and ISO posted_at fields to every listing")
+    parser.add_argument("--pool-size", type=int, default=10, help="Keep-alive connections to keep open per host")
+    parser.add_argument("--retries", type=int, default=3, help="Retries for failed requests (429/5xx and connection errors)")
+    parser.add_argument("--backoff", type=float, default=1.0, help="Exponential backoff factor in seconds between retries")
+    parser.add_argument("--cache-dir", type=str, help="Cache fetched pages in this directory and revalidate them with ETag/Last-Modified")
+    parser.add_argument("--cache-ttl", type=float, default=3600, help="Seconds a cached page is used without revalidating")
+    parser.add_argument("--cache-max-mb", type=float, default=500, help="Size limit of the cache; least recently used pages are evicted")
+    parser.add_argument("--from-cache", action="store_true", help="Re-parse cached pages without touching the network")
+    parser.add_argument("--seen-db", type=str, help="SQLite file of listings already scraped; only new or changed listings are emitted")
+    parser.add_argument("--no-early-stop", action="store_true", help="Keep paginating even when a page has only already seen listings")
+    parser.add_argument("--strategy-file", type=str, default="strategy_stats.json",
+                        help="File recording which scraping method works best per country")
+    parser.add_argument("--batch", type=str, help="File of 'query[,country]' lines to scrape in one run")
+    parser.add_argument("--batch-workers", type=int, default=4, help="Queries to run at once in batch mode")
+    parser.add_argument("--checkpoint-dir", type=str, default="checkpoints",
+                        help="Directory where progress is checkpointed after every page")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted run of the same query from its checkpoint, skipping completed pages")
+    parser.add_argument("--no-debug-dump", action="store_true",
+                        help=f"Do not save every fetched page and API response to {DEBUG_DIR}/")
+    parser.add_argument("--metrics-out", type=str,
+                        help="Write stage timings and counters here at the end of the run (.json for JSON, else Prometheus text)")
+    parser.add_argument("--profile", type=str,
+                        help="Run under cProfile and save the stats to this file (fetch worker threads are not profiled)")
     
     args = parser.parse_args()
     
-    scraper = OlxScraper(
-        search_query=args.query,
-        max_pages=args.pages,
-        use_selenium=args.selenium,
-        proxy=args.proxy,
-        country=args.country
-    )
+    try:
+        parse_block_resources(args.block_resources)
+    except ValueError as e:
+        parser.error(str(e))
     
-    results = scraper.scrape()
+    formats = [fmt.strip() for fmt in args.formats.split(",") if fmt.strip()]
+    unknown = [fmt for fmt in formats if fmt not in SINK_CLASSES]
+    if unknown:
+        parser.error(f"unknown output format(s): {', '.join(unknown)}")
     
-    if results:
-        logger.info(f"Successfully scraped {len(results)} listings")
-        txt_file, csv_file, json_file = scraper.save_results()
-        print(f"\nResults saved to:\n- {txt_file}\n- {csv_file}\n- {json_file}")
-        print(f"\nTotal listings found: {len(results)}")
-    else:
-        logger.warning("No results found")
-        print("\nNo listings were found. Check the debug directory and log file for details.")
-        print("\nTry running with --selenium flag for browser automation approach")
+    setup_logging()
+    profiler = None
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    
+    try:
+        if args.batch:
+            run_batch(args, formats)
+        else:
+            run_single(args, formats)
+    finally:
+        if profiler:
+            profiler.disable()
+            finish_profile(profiler, args.profile)
+        finish_metrics(args.metrics_out)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,193 @@
+import os
+import sys
+import json
+import time
+import threading
+import importlib.util
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_DIR = os.path.join(ROOT, "debug")
+
+def load_module(name, filename):
+    """Import a script from the repository root (olx-scrapper.py is not a valid module name)"""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, filename))
+    module = importlib.util.module_from_spec(spec)
+    # Registered so parse workers can unpickle the module's functions
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+@pytest.fixture(scope="session")
+def olx():
+    return load_module("olx_scrapper", "olx-scrapper.py")
+
+@pytest.fixture(scope="session")
+def amfi():
+    return load_module("amfi_nav", "amfi_nav.py")
+
+@pytest.fixture
+def fixture_pages():
+    """The saved OLX search pages in debug/ as (name, html) pairs"""
+    pages = []
+    for name in sorted(os.listdir(FIXTURE_DIR)):
+        if name.endswith(".html"):
+            with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+                pages.append((name, f.read()))
+    return pages
+
+def search_page(page, listings=5):
+    """A search results page whose listings are numbered after the page they are on"""
+    items = "".join(
+        f'<li data-aut-id="itemBox"><a href="/item/car-cover-iid-{page * 1000 + i}">'
+        f'<span data-aut-id="itemPrice">₹ {1000 + i:,}</span>'
+        f'<span data-aut-id="itemTitle">Car cover {page}-{i}</span>'
+        f'<span data-aut-id="item-location">Pune, Maharashtra</span>'
+        f'<span data-aut-id="itemCreationDate">{i} days ago</span></a></li>'
+        for i in range(listings)
+    )
+    return f"<html><body><ul>{items}</ul></body></html>"
+
+def build(olx, server, query="car cover", **options):
+    """A scraper pointed at a MockOlx server, with no rate limit, retries or debug dumps"""
+    options.setdefault("rate_limit", 0)
+    options.setdefault("session_pool", olx.SessionPool(retries=0))
+    options.setdefault("parser_backend", "bs4")
+    options.setdefault("debug_dump", False)
+    return olx.OlxScraper(query, base_url=server.url, **options)
+
+class MockOlx:
+    """Local stand-in for OLX serving search pages and API results, recording every request
+
+    fail maps ("html" or "api", page) to a status code to answer with (only the first fail_times[key] times if set,
+    with a Retry-After header if retry_after[key] is set), bodies to a body to send instead,
+    and truncate to the number of bytes of the body to send (a connection cut off mid-response). API pages are numbered from 0
+    like OLX's; pagination is "count" (metadata.total_pages), "links" (next_page_url only) or "none".
+    """
+    def __init__(self, pages=5, listings=5, latency=0.0, pagination="count", delays=None):
+        self.pages = pages
+        self.listings = listings
+        self.latency = latency
+        # Per-page latency overrides, keyed by (kind, page)
+        self.delays = delays or {}
+        self.pagination = pagination
+        self.fail = {}
+        self.fail_times = {}
+        self.retry_after = {}
+        self.bodies = {}
+        self.truncate = {}
+        self.hits = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.handler_class())
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        self.thread.start()
+    
+    def handler_class(self):
+        mock = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+            
+            def do_GET(self):
+                with mock._lock:
+                    mock.in_flight += 1
+                    mock.max_in_flight = max(mock.max_in_flight, mock.in_flight)
+                try:
+                    mock.handle(self)
+                finally:
+                    with mock._lock:
+                        mock.in_flight -= 1
+        
+        return Handler
+    
+    def handle(self, request):
+        url = urlparse(request.path)
+        query = parse_qs(url.query)
+        if url.path.startswith("/api/"):
+            kind, page = "api", int(query.get("page", ["0"])[0])
+        else:
+            kind, page = "html", int(query.get("page", ["1"])[0])
+        with self._lock:
+            self.hits.append((time.monotonic(), kind, page))
+        time.sleep(self.delays.get((kind, page), self.latency))
+        
+        status = self.fail.get((kind, page))
+        with self._lock:
+            remaining = self.fail_times.get((kind, page))
+            if status and remaining is not None:
+                self.fail_times[(kind, page)] = remaining - 1
+                status = status if remaining > 0 else None
+        if status:
+            request.send_response(status)
+            if (kind, page) in self.retry_after:
+                request.send_header("Retry-After", str(self.retry_after[(kind, page)]))
+            request.send_header("Content-Length", "0")
+            request.end_headers()
+            return
+        
+        if kind == "api":
+            items = [{"id": str(page * 1000 + i), "title": f"API item {page}-{i}",
+                      "price": {"value": {"display": f"₹ {100 + i}"}},
+                      "locations_resolved": {"ADMIN_LEVEL_1_name": "Kerala", "ADMIN_LEVEL_3_name": "Kochi"},
+                      "created_at": "2025-05-10T17:00:11+05:30"}
+                     for i in range(self.listings)] if page < self.pages else []
+            metadata = {}
+            if self.pagination == "count":
+                metadata["total_pages"] = self.pages
+            elif self.pagination == "links" and page + 1 < self.pages:
+                metadata["next_page_url"] = f"{self.url}/api/relevance/search?query=x&page={page + 1}"
+            body = json.dumps({"data": items, "metadata": metadata}).encode("utf-8")
+            content_type = "application/json"
+        else:
+            body = search_page(page, self.listings if page <= self.pages else 0).encode("utf-8")
+            content_type = "text/html; charset=utf-8"
+        
+        etag = f'"page-{page}"'
+        if request.headers.get("If-None-Match") == etag:
+            request.send_response(304)
+            request.end_headers()
+            return
+        body = self.bodies.get((kind, page), body)
+        body = body[:self.truncate.get((kind, page), len(body))]
+        request.send_response(200)
+        request.send_header("Content-Type", content_type)
+        request.send_header("Content-Length", str(len(body)))
+        request.send_header("ETag", etag)
+        request.end_headers()
+        request.wfile.write(body)
+    
+    def requested(self, kind):
+        """Pages requested so far, in arrival order"""
+        with self._lock:
+            return [page for _, hit_kind, page in self.hits if hit_kind == kind]
+    
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def mock_olx():
+    servers = []
+    
+    def start(**options):
+        server = MockOlx(**options)
+        servers.append(server)
+        return server
+    
+    yield start
+    for server in servers:
+        server.close()
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run in an empty directory so output files, checkpoints and strategy stats stay out of the tree"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+FEED = """Scheme Code;ISIN Div Payout/ ISIN Growth;ISIN Div Reinvestment;Scheme Name;Net Asset Value;Date
+
+Open Ended Schemes(Debt Scheme - Banking and PSU Fund)
+
+Aditya Birla Sun Life Mutual Fund
+
+119551;INF209KA12Z1;INF209KA13Z9;Aditya Birla Sun Life Banking & PSU Debt Fund  - DIRECT - IDCW;105.2449;16-Oct-2025
+108272;INF209K01PE9;-;Aditya Birla Sun Life Banking; PSU Debt Fund - Regular - Growth;N.A.;16-Oct-2025
+
+Axis Mutual Fund
+
+120438;INF846K01EW2;;Axis Banking & PSU Debt Fund - Direct Plan - Growth Option;nan;16-Oct-2025
+
+Close Ended Schemes(Income)
+
+Axis Mutual Fund
+
+148921;-;-;Axis CRISIL IBX 50:50 Gilt Plus SDL Sep 2027 Index Fund;11.0712;not a date
+"""
+
+@pytest.fixture
+def feed(tmp_path):
+    path = tmp_path / "NAVAll.txt"
+    path.write_text(FEED, encoding="utf-8")
+    return path
+
+def test_records_follow_their_section_lines(amfi):
+    records = list(amfi.iter_nav_records(FEED.splitlines()))
+    assert [record["scheme_code"] for record in records] == [119551, 108272, 120438, 148921]
+    assert [(record["category"], record["fund_house"]) for record in records] == [
+        ("Open Ended Schemes(Debt Scheme - Banking and PSU Fund)", "Aditya Birla Sun Life Mutual Fund"),
+        ("Open Ended Schemes(Debt Scheme - Banking and PSU Fund)", "Aditya Birla Sun Life Mutual Fund"),
+        ("Open Ended Schemes(Debt Scheme - Banking and PSU Fund)", "Axis Mutual Fund"),
+        ("Close Ended Schemes(Income)", "Axis Mutual Fund"),
+    ]
+    assert records[0] == {
+        "scheme_code": 119551,
+        "isin_growth": "INF209KA12Z1",
+        "isin_reinvestment": "INF209KA13Z9",
+        "scheme_name": "Aditya Birla Sun Life Banking & PSU Debt Fund  - DIRECT - IDCW",
+        "nav": 105.2449,
+        "date": "2025-10-16",
+        "category": "Open Ended Schemes(Debt Scheme - Banking and PSU Fund)",
+        "fund_house": "Aditya Birla Sun Life Mutual Fund",
+    }
+
+def test_odd_scheme_lines(amfi):
+    _, split_name, nan_nav, no_isins = amfi.iter_nav_records(FEED.splitlines())
+    # A ';' inside the name does not shift the NAV and date columns
+    assert split_name["scheme_name"] == "Aditya Birla Sun Life Banking; PSU Debt Fund - Regular - Growth"
+    assert split_name["nav"] is None and split_name["date"] == "2025-10-16"
+    assert split_name["isin_reinvestment"] is None
+    assert nan_nav["nav"] is None and nan_nav["isin_reinvestment"] is None
+    assert no_isins["isin_growth"] is None and no_isins["isin_reinvestment"] is None
+    assert no_isins["date"] is None
+
+@pytest.mark.parametrize("value", ["nan", "inf", "-Infinity", "N.A.", ""])
+def test_non_finite_navs_are_null(amfi, value):
+    assert amfi.parse_nav(value) is None
+    record = next(amfi.iter_nav_records([f"1;-;-;Fund;{value};16-Oct-2025"]))
+    assert json.loads(amfi.record_json(record))["nav"] is None
+
+def test_record_json_matches_json_dumps(amfi):
+    for record in amfi.iter_nav_records(FEED.splitlines()):
+        assert json.loads(amfi.record_json(record)) == record
+
+@pytest.mark.parametrize("fmt", ["json", "jsonl"])
+def test_lookup_through_the_offset_index(amfi, feed, tmp_path, fmt):
+    output = str(tmp_path / "nav")
+    count, paths = amfi.ingest(str(feed), output, [fmt])
+    assert count == 4
+    assert paths == [f"{output}.{fmt}", f"{output}.{fmt}.index.json"]
+    
+    with open(paths[0], encoding="utf-8") as f:
+        records = json.load(f) if fmt == "json" else [json.loads(line) for line in f]
+    assert [record["scheme_code"] for record in records] == [119551, 108272, 120438, 148921]
+    
+    nav_index = amfi.NavIndex(paths[1])
+    try:
+        for record in records:
+            assert record["scheme_code"] in nav_index
+            assert nav_index.get(str(record["scheme_code"])) == record
+        assert 999999 not in nav_index
+        assert nav_index.get(999999) is None
+    finally:
+        nav_index.close()
@@ -0,0 +1,111 @@
+import sys
+
+import pytest
+
+@pytest.fixture
+def api_scraper(olx, workdir):
+    scrapers = []
+    
+    def build(server, **options):
+        scraper = olx.OlxScraper("car cover", base_url=server.url, rate_limit=0, concurrency=2, debug_dump=False,
+                                 session_pool=olx.SessionPool(retries=0), **options)
+        scraper.emitted = []
+        emit_page = scraper.emit_page
+        
+        def record(page_results, page=None):
+            scraper.emitted.append((page, [listing["title"] for listing in page_results]))
+            return emit_page(page_results, page)
+        
+        scraper.emit_page = record
+        scrapers.append(scraper)
+        return scraper
+    
+    yield build
+    for scraper in scrapers:
+        scraper.close()
+
+def api_page_of(titles):
+    """The API page a page's listings came from ("API item <page>-<i>")"""
+    return {int(title.split()[2].split("-")[0]) for title in titles}
+
+def test_pages_are_fetched_by_number_with_a_page_count(mock_olx, api_scraper):
+    server = mock_olx(pages=4)
+    scraper = api_scraper(server)
+    assert scraper.try_api_approach([1, 2, 3, 4, 5]) == []
+    # Page 5 is beyond total_pages and is not requested
+    assert sorted(server.requested("api")) == [0, 1, 2, 3]
+    assert sorted(page for page, _ in scraper.emitted) == [1, 2, 3, 4]
+    assert scraper.pages_fetched == 4
+    for page, titles in scraper.emitted:
+        assert api_page_of(titles) == {page - 1}
+
+def test_failed_first_page_does_not_drop_the_others(mock_olx, api_scraper):
+    server = mock_olx(pages=4)
+    server.fail[("api", 1)] = 502
+    scraper = api_scraper(server)
+    assert scraper.try_api_approach([2, 3, 4]) == [2]
+    assert sorted(page for page, _ in scraper.emitted) == [3, 4]
+
+def test_pages_without_metadata_are_fetched_by_number(mock_olx, api_scraper):
+    server = mock_olx(pages=4, pagination="none")
+    scraper = api_scraper(server)
+    assert scraper.try_api_approach([1, 2, 3]) == []
+    assert sorted(page for page, _ in scraper.emitted) == [1, 2, 3]
+
+def test_next_page_links_are_only_followed_for_consecutive_pages(mock_olx, api_scraper):
+    server = mock_olx(pages=6, pagination="links")
+    scraper = api_scraper(server)
+    assert scraper.try_api_approach([2, 3, 5]) == []
+    assert [page for page, _ in scraper.emitted] == [2, 3, 5]
+    for page, titles in scraper.emitted:
+        assert api_page_of(titles) == {page - 1}
+
+def test_non_contiguous_pages_with_links(mock_olx, api_scraper):
+    server = mock_olx(pages=6, pagination="links")
+    scraper = api_scraper(server)
+    assert scraper.try_api_approach([2, 4]) == []
+    assert [(page, api_page_of(titles)) for page, titles in scraper.emitted] == [(2, {1}), (4, {3})]
+
+def test_failed_linked_page_is_returned(mock_olx, api_scraper):
+    server = mock_olx(pages=6, pagination="links")
+    server.fail[("api", 2)] = 503
+    scraper = api_scraper(server)
+    # The link to page 4 is on the failed page, so 3 and 4 are both left for another approach
+    assert scraper.try_api_approach([2, 3, 4]) == [3, 4]
+    # Page 3 failed and page 4 was never requested, so only page 2 counts as fetched
+    assert scraper.pages_fetched == 1
+
+@pytest.fixture(params=["ijson", "json"])
+def json_parser(request, monkeypatch):
+    """Parse API responses with ijson (when installed) and with the json fallback"""
+    if request.param == "ijson":
+        pytest.importorskip("ijson")
+    else:
+        monkeypatch.setitem(sys.modules, "ijson", None)
+    return request.param
+
+@pytest.mark.parametrize("body", ["truncated", "html"])
+def test_a_broken_api_body_fails_the_page(mock_olx, api_scraper, json_parser, body, caplog):
+    server = mock_olx(pages=3)
+    if body == "truncated":
+        # Cut off in the middle of the third item
+        server.truncate[("api", 1)] = 700
+    else:
+        server.bodies[("api", 1)] = b"<html><body>Please log in</body></html>"
+    scraper = api_scraper(server)
+    
+    assert scraper.try_api_approach([1, 2, 3]) == [2]
+    # Items parsed before the error are not emitted as a finished page
+    assert sorted(page for page, _ in scraper.emitted) == [1, 3]
+    assert "not valid JSON" in caplog.text
+
+def test_a_challenge_page_fails_the_proxy(olx, mock_olx, api_scraper):
+    server = mock_olx(pages=2)
+    server.bodies[("api", 1)] = b'<html><body><div class="g-recaptcha"></div></body></html>'
+    # The mock server answers proxied requests for its own pages, so it can stand in for the proxy
+    proxy_pool = olx.ProxyPool([server.url], failure_threshold=1)
+    scraper = api_scraper(server, proxy_pool=proxy_pool)
+    
+    assert scraper.try_api_approach([2]) == [2]
+    assert proxy_pool.stats[server.url]["trips"] == 1
+    assert scraper.proxy_failed_pages == {2: {server.url}}
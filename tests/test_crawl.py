@@ -0,0 +1,255 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import build
+
+def listing_pages(scraper):
+    """Search page of every buffered listing, in output order ("Car cover <page>-<i>")"""
+    return [int(listing["title"].split()[2].split("-")[0]) for listing in scraper.results]
+
+def test_pages_are_emitted_in_order(olx, workdir, mock_olx):
+    # Earlier pages answer slowest, so they complete last
+    server = mock_olx(pages=6, delays={("html", page): 0.05 * (7 - page) for page in range(1, 7)})
+    scraper = build(olx, server, max_pages=6, concurrency=4)
+    try:
+        assert scraper.scrape_with_requests() == []
+    finally:
+        scraper.close()
+    assert listing_pages(scraper) == [page for page in range(1, 7) for _ in range(5)]
+    assert [listing["title"] for listing in scraper.results][:2] == ["Car cover 1-0", "Car cover 1-1"]
+
+def test_concurrent_fetches_stay_within_the_limit(olx, workdir, mock_olx):
+    server = mock_olx(pages=9, latency=0.2)
+    scraper = build(olx, server, max_pages=9, concurrency=3)
+    start = time.monotonic()
+    try:
+        scraper.scrape_with_requests()
+    finally:
+        scraper.close()
+    elapsed = time.monotonic() - start
+    assert server.max_in_flight == 3
+    assert scraper.result_count == 45
+    # Three rounds of three pages rather than nine sequential fetches
+    assert elapsed < 9 * 0.2
+
+def test_rate_limit_spaces_requests_to_a_host(olx, workdir, mock_olx):
+    server = mock_olx(pages=6)
+    scraper = build(olx, server, max_pages=6, concurrency=4, rate_limit=10)
+    try:
+        scraper.scrape_with_requests()
+    finally:
+        scraper.close()
+    starts = sorted(hit[0] for hit in server.hits)
+    assert len(starts) == 6
+    gaps = [later - earlier for earlier, later in zip(starts, starts[1:])]
+    # 10 requests per second: one every 100 ms, with some slack for scheduling
+    assert min(gaps) > 0.08
+
+def test_failed_pages_are_returned(olx, workdir, mock_olx):
+    server = mock_olx(pages=4)
+    server.fail[("html", 3)] = 500
+    scraper = build(olx, server, max_pages=4, concurrency=2)
+    try:
+        assert scraper.scrape_with_requests() == [3]
+    finally:
+        scraper.close()
+    assert sorted(set(listing_pages(scraper))) == [1, 2, 4]
+
+def test_retry_after_is_honoured(olx, workdir, mock_olx):
+    server = mock_olx(pages=1)
+    server.fail[("html", 1)] = 503
+    server.fail_times[("html", 1)] = 1
+    server.retry_after[("html", 1)] = 1
+    # Without backoff, any wait before the retry comes from Retry-After
+    scraper = build(olx, server, session_pool=olx.SessionPool(retries=2, backoff=0))
+    try:
+        assert scraper.scrape_with_requests() == []
+    finally:
+        scraper.close()
+    assert server.requested("html") == [1, 1]
+    first, retry = (hit[0] for hit in server.hits)
+    assert retry - first >= 0.9
+    assert scraper.result_count == 5
+
+def test_concurrent_queries_keep_separate_debug_dumps(olx, workdir, mock_olx):
+    server = mock_olx(pages=2)
+    scheduler = olx.FetchScheduler(workers=4, rate_limit=0, session_pool=olx.SessionPool(retries=0))
+    scrapers = [build(olx, server, query, max_pages=2, scheduler=scheduler, debug_dump=True)
+                for query in ("car cover", "Seat Cover")]
+    try:
+        with ThreadPoolExecutor(max_workers=2) as drivers:
+            list(drivers.map(lambda scraper: scraper.scrape_with_requests(), scrapers))
+    finally:
+        scheduler.close()
+    for query in ("car_cover", "seat_cover"):
+        assert sorted(path.name for path in (workdir / "debug" / "in" / query).iterdir()) == [
+            "olx_requests_page_1.html", "olx_requests_page_2.html"]
+
+def test_cache_revalidates_and_serves_offline(olx, workdir, mock_olx):
+    server = mock_olx(pages=3)
+    cache_dir = str(workdir / "cache")
+    
+    first = build(olx, server, max_pages=3, cache=olx.ResponseCache(cache_dir, ttl=3600))
+    first.scrape_with_requests()
+    first.close()
+    assert server.requested("html") == [1, 2, 3]
+    
+    # Fresh entries are served without a request
+    fresh = build(olx, server, max_pages=3, cache=olx.ResponseCache(cache_dir, ttl=3600))
+    fresh.scrape_with_requests()
+    fresh.close()
+    assert server.requested("html") == [1, 2, 3]
+    assert fresh.result_count == 15
+    
+    # Stale entries are revalidated with their ETag; the server answers 304 and the cached body is used
+    stale = build(olx, server, max_pages=3, cache=olx.ResponseCache(cache_dir, ttl=0))
+    stale.scrape_with_requests()
+    stale.close()
+    assert server.requested("html") == [1, 2, 3, 1, 2, 3]
+    assert stale.result_count == 15
+    
+    # Offline runs never touch the network and skip pages that were never cached
+    offline = build(olx, server, max_pages=4, cache=olx.ResponseCache(cache_dir, ttl=0), offline=True)
+    assert offline.scrape_with_requests() == [4]
+    offline.close()
+    assert len(server.hits) == 6
+    assert offline.result_count == 15
+
+def test_block_pages_are_not_cached(olx, workdir, mock_olx):
+    server = mock_olx(pages=2)
+    server.bodies[("html", 2)] = b'<html><body><div class="g-recaptcha"></div></body></html>'
+    cache_dir = str(workdir / "cache")
+    
+    blocked = build(olx, server, max_pages=2, cache=olx.ResponseCache(cache_dir, ttl=3600))
+    assert blocked.scrape_with_requests() == [2]
+    blocked.close()
+    
+    # Once the block is lifted the page is fetched again instead of being served from the cache
+    del server.bodies[("html", 2)]
+    retry = build(olx, server, max_pages=2, cache=olx.ResponseCache(cache_dir, ttl=3600))
+    assert retry.scrape_with_requests() == []
+    retry.close()
+    assert server.requested("html") == [1, 2, 2]
+    assert retry.result_count == 10
+
+def test_proxy_retries_bypass_the_cache(olx, workdir, mock_olx):
+    server = mock_olx(pages=2)
+    server.bodies[("html", 2)] = b'<html><body><div class="g-recaptcha"></div></body></html>'
+    # The mock server answers proxied requests for its own pages, so it can stand in for the proxies
+    pool = olx.ProxyPool([server.url, f"{server.url}/"], failure_threshold=10)
+    scraper = build(olx, server, max_pages=2, cache=olx.ResponseCache(str(workdir / "cache"), ttl=3600),
+                    proxy_pool=pool)
+    try:
+        assert scraper.scrape_with_requests() == [2]
+    finally:
+        scraper.close()
+    # The first attempt and both retries went to the server
+    assert server.requested("html") == [1, 2, 2, 2]
+    assert sum(stats["failures"] for stats in pool.stats.values()) == 3
+
+def test_cache_accesses_carry_over_to_eviction(olx, workdir, mock_olx):
+    server = mock_olx(pages=2)
+    cache_dir = workdir / "cache"
+    
+    first = build(olx, server, max_pages=2, cache=olx.ResponseCache(str(cache_dir), ttl=3600))
+    first.scrape_with_requests()
+    # The index is written once, when the run's scheduler closes
+    assert not (cache_dir / "index.json").exists()
+    first.close()
+    assert (cache_dir / "index.json").exists()
+    
+    # A run served entirely from the cache still records that it used page 1
+    reread = build(olx, server, max_pages=1, cache=olx.ResponseCache(str(cache_dir), ttl=3600))
+    reread.scrape_with_requests()
+    reread.close()
+    assert server.requested("html") == [1, 2]
+    
+    cache = olx.ResponseCache(str(cache_dir), ttl=3600)
+    page_1, page_2 = (cache.make_key(first.get_search_url(page), "car cover") for page in (1, 2))
+    assert set(cache.index) == {page_1, page_2}
+    # Page 2 was fetched last but used least recently, so it is the one evicted
+    cache.max_bytes = sum(entry["size"] for entry in cache.index.values())
+    cache.store(f"{server.url}/other", "car cover", "<html></html>")
+    cache.close()
+    assert set(olx.ResponseCache(str(cache_dir)).index) == {page_1, cache.make_key(f"{server.url}/other", "car cover")}
+
+class Killed(BaseException):
+    """Stands in for the process dying mid-crawl (not caught by the scraper's error handling)"""
+
+def test_resume_continues_an_interrupted_run(olx, workdir, mock_olx):
+    server = mock_olx(pages=5)
+    path = olx.CrawlCheckpoint.path_for(str(workdir / "checkpoints"), "car cover", "in")
+    formats = ["txt", "csv", "json", "jsonl"]
+    
+    first = build(olx, server, max_pages=5, keep_results=False, checkpoint=olx.CrawlCheckpoint(path))
+    emit_page = first.emit_page
+    
+    def die_on_page_3(page_results, page=None):
+        if page == 3:
+            raise Killed()
+        return emit_page(page_results, page)
+    
+    first.emit_page = die_on_page_3
+    with pytest.raises(Killed):
+        olx.run_query(first, formats)
+    assert sorted(olx.CrawlCheckpoint(path, resume=True).completed_pages) == [1, 2]
+    
+    requested = len(server.hits)
+    second = build(olx, server, max_pages=5, keep_results=False, checkpoint=olx.CrawlCheckpoint(path, resume=True))
+    filenames = olx.run_query(second, formats)
+    
+    # Completed pages are not fetched again, and the checkpoint is gone once the run finishes
+    assert 1 not in server.requested("html")[requested:] and 2 not in server.requested("html")[requested:]
+    assert not (workdir / "checkpoints" / "olx_car_cover_in.json").exists()
+    assert second.result_count == 25
+    
+    by_format = {name.rsplit(".", 1)[1]: name for name in filenames}
+    with open(by_format["json"], encoding="utf-8") as f:
+        listings = json.load(f)
+    assert sorted(listing["url"] for listing in listings) == sorted({listing["url"] for listing in listings})
+    assert len(listings) == 25
+    with open(by_format["jsonl"], encoding="utf-8") as f:
+        assert len([json.loads(line) for line in f]) == 25
+    with open(by_format["csv"], encoding="utf-8") as f:
+        rows = f.read().splitlines()
+    assert len(rows) == 26 and rows[0].startswith("title") and not any(row.startswith("title") for row in rows[1:])
+
+def test_resume_with_seen_index_keeps_a_page_killed_before_its_checkpoint(olx, workdir, mock_olx):
+    server = mock_olx(pages=5)
+    path = olx.CrawlCheckpoint.path_for(str(workdir / "checkpoints"), "car cover", "in")
+    seen_db = str(workdir / "seen.db")
+    
+    seen_index = olx.SeenIndex(seen_db)
+    first = build(olx, server, max_pages=5, keep_results=False, checkpoint=olx.CrawlCheckpoint(path), seen_index=seen_index)
+    record = first.checkpoint.record
+    
+    def die_on_page_3(page, scraper, positions):
+        # Page 3 is already in the sinks but not yet in the checkpoint
+        if page == 3:
+            raise Killed()
+        return record(page, scraper, positions)
+    
+    first.checkpoint.record = die_on_page_3
+    with pytest.raises(Killed):
+        olx.run_query(first, ["jsonl"])
+    seen_index.close()
+    
+    seen_index = olx.SeenIndex(seen_db)
+    second = build(olx, server, max_pages=5, keep_results=False, checkpoint=olx.CrawlCheckpoint(path, resume=True),
+                   seen_index=seen_index)
+    filenames = olx.run_query(second, ["jsonl"])
+    with open(filenames[0], encoding="utf-8") as f:
+        titles = [json.loads(line)["title"] for line in f]
+    assert sorted(titles) == sorted(f"Car cover {page}-{i}" for page in range(1, 6) for i in range(5))
+    
+    # Everything is seen now, so a fresh run emits nothing
+    third = build(olx, server, max_pages=5, seen_index=seen_index)
+    try:
+        third.scrape_with_requests()
+    finally:
+        third.close()
+        seen_index.close()
+    assert third.result_count == 0
@@ -0,0 +1,47 @@
+import pytest
+
+def test_fixture_pages_are_not_blocked(olx, fixture_pages):
+    # Real OLX pages mention the Roboto font, <meta name="robots"> and "blocked" in their scripts
+    assert fixture_pages
+    for name, html in fixture_pages:
+        assert olx.detect_block(html) is None, name
+
+@pytest.mark.parametrize("html", [
+    '<div class="g-recaptcha" data-sitekey="abc"></div>',
+    '<iframe src="https://newassets.hcaptcha.com/captcha/v1"></iframe>',
+    '<title>Just a moment...</title><script src="/cdn-cgi/challenge-platform/h/b/orchestrate"></script>',
+    '<form id="captcha-form" action="/verify"></form>',
+    "<p>Please verify you are a human</p>",
+])
+def test_captcha_pages(olx, html):
+    assert olx.detect_block(html) == "captcha"
+
+@pytest.mark.parametrize("html", [
+    "<html><head><title>Access Denied</title></head><body>Reference #18</body></html>",
+    "<title>403 Forbidden</title>",
+])
+def test_access_denied_pages(olx, html):
+    assert olx.detect_block(html) == "blocked"
+
+def test_captcha_page_fails_the_proxy(olx):
+    pool = olx.ProxyPool(["http://proxy-a:8080"], failure_threshold=1)
+    scraper = olx.OlxScraper("car cover", rate_limit=0, proxy_pool=pool, debug_dump=False)
+    try:
+        scraper.page_proxies[1] = ("http://proxy-a:8080", 0.2)
+        scraper.report_proxy_page(1, [], '<div class="g-recaptcha"></div>')
+        assert scraper.proxy_failed_pages[1] == {"http://proxy-a:8080"}
+        assert pool.stats["http://proxy-a:8080"]["trips"] == 1
+    finally:
+        scraper.close()
+
+def test_empty_results_page_does_not_fail_the_proxy(olx, fixture_pages):
+    pool = olx.ProxyPool(["http://proxy-a:8080"], failure_threshold=1)
+    scraper = olx.OlxScraper("car cover", rate_limit=0, proxy_pool=pool, debug_dump=False)
+    try:
+        scraper.page_proxies[1] = ("http://proxy-a:8080", 0.2)
+        scraper.report_proxy_page(1, [], fixture_pages[0][1])
+        assert 1 not in scraper.proxy_failed_pages
+        assert pool.stats["http://proxy-a:8080"]["failures"] == 0
+        assert pool.stats["http://proxy-a:8080"]["trips"] == 0
+    finally:
+        scraper.close()
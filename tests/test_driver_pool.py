@@ -0,0 +1,222 @@
+import threading
+
+import pytest
+
+from conftest import search_page
+
+class FakeDriver:
+    """Stands in for a Selenium WebDriver; serves the mock search pages without a browser"""
+    def __init__(self, name, broken=False, counts=None, blocked=False):
+        self.name = name
+        self.broken = broken
+        # Serve CAPTCHA pages, as a browser on a blocked proxy would
+        self.blocked = blocked
+        # Listing counts find_elements returns on successive polls (the last one repeats)
+        self.counts = list(counts or [5])
+        self.page = None
+        self.loaded = []
+        self.quit_called = False
+    
+    def get(self, url):
+        if self.broken:
+            raise RuntimeError("browser crashed")
+        self.page = int(url.rsplit("page=", 1)[1]) if "page=" in url else 1
+        self.loaded.append(self.page)
+    
+    @property
+    def page_source(self):
+        if self.broken:
+            raise RuntimeError("browser crashed")
+        if self.blocked:
+            return '<html><body><div class="g-recaptcha"></div></body></html>'
+        return search_page(self.page)
+    
+    def find_elements(self, by, value):
+        count = self.counts.pop(0) if len(self.counts) > 1 else self.counts[0]
+        return [object()] * count
+    
+    def execute_script(self, script):
+        return "complete"
+    
+    def quit(self):
+        self.quit_called = True
+
+class FakeFactory:
+    """Starts fake drivers, the nth one on proxies[n] if given"""
+    def __init__(self, broken=(), blocked=(), proxies=()):
+        self.broken = set(broken)
+        self.blocked = set(blocked)
+        self.proxies = list(proxies)
+        self.drivers = []
+    
+    def __call__(self):
+        n = len(self.drivers)
+        driver = FakeDriver(n, broken=n in self.broken, blocked=n in self.blocked)
+        driver.proxy_server = self.proxies[n] if n < len(self.proxies) else None
+        self.drivers.append(driver)
+        return driver
+
+def test_drivers_are_reused(olx):
+    factory = FakeFactory()
+    pool = olx.DriverPool(factory, size=2)
+    for _ in range(5):
+        driver = pool.acquire()
+        pool.release(driver)
+    assert len(factory.drivers) == 1
+    pool.close()
+    assert factory.drivers[0].quit_called
+
+def test_pool_never_starts_more_than_size(olx):
+    factory = FakeFactory()
+    pool = olx.DriverPool(factory, size=2)
+    barrier = threading.Barrier(6)
+    
+    def work():
+        barrier.wait()
+        for _ in range(20):
+            pool.release(pool.acquire())
+    
+    threads = [threading.Thread(target=work) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert not any(thread.is_alive() for thread in threads)
+    assert len(factory.drivers) <= 2
+    pool.close()
+
+def acquire_in_thread(pool):
+    result = {}
+    
+    def run():
+        try:
+            result["driver"] = pool.acquire()
+        except Exception as e:
+            result["error"] = e
+    
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread, result
+
+def test_discard_wakes_a_waiter(olx):
+    factory = FakeFactory()
+    pool = olx.DriverPool(factory, size=1)
+    broken = pool.acquire()
+    thread, result = acquire_in_thread(pool)
+    thread.join(0.2)
+    assert thread.is_alive()
+    
+    pool.discard(broken)
+    thread.join(5)
+    assert not thread.is_alive()
+    assert broken.quit_called
+    assert result["driver"] is factory.drivers[1]
+    pool.close()
+
+def test_failed_start_wakes_a_waiter(olx):
+    started = threading.Event()
+    fail = threading.Event()
+    drivers = []
+    
+    def factory():
+        if not drivers:
+            drivers.append(None)
+            started.set()
+            fail.wait(5)
+            raise RuntimeError("chromedriver not found")
+        driver = FakeDriver(len(drivers))
+        drivers.append(driver)
+        return driver
+    
+    pool = olx.DriverPool(factory, size=1)
+    first, first_result = acquire_in_thread(pool)
+    started.wait(5)
+    second, second_result = acquire_in_thread(pool)
+    second.join(0.2)
+    assert second.is_alive()
+    
+    fail.set()
+    first.join(5)
+    second.join(5)
+    assert isinstance(first_result["error"], RuntimeError)
+    assert second_result["driver"] is drivers[1]
+    pool.close()
+
+def test_wait_for_listings_waits_until_the_count_settles(olx):
+    driver = FakeDriver(0, counts=[0, 3, 8, 8])
+    assert olx.wait_for_listings(driver, timeout=5, poll_interval=0.01)
+    assert driver.counts == [8]
+
+def test_wait_for_listings_falls_back_to_ready_state(olx):
+    driver = FakeDriver(0, counts=[0])
+    assert olx.wait_for_listings(driver, timeout=0.05, poll_interval=0.01)
+
+@pytest.fixture
+def no_sleep(olx, monkeypatch):
+    # load_with_selenium waits 5 seconds between attempts
+    sleep = olx.time.sleep
+    monkeypatch.setattr(olx.time, "sleep", lambda seconds: sleep(min(seconds, 0.01)))
+
+def test_selenium_scrape_with_fake_drivers(olx, workdir, no_sleep):
+    factory = FakeFactory()
+    pool = olx.DriverPool(factory, size=2)
+    scraper = olx.OlxScraper("car cover", max_pages=4, rate_limit=0, driver_pool=pool, selenium_workers=2,
+                             parser_backend="bs4", debug_dump=False)
+    try:
+        assert scraper.scrape_with_selenium() == []
+    finally:
+        scraper.close()
+        pool.close()
+    assert scraper.result_count == 20
+    assert len(factory.drivers) <= 2
+    assert sorted(page for driver in factory.drivers for page in driver.loaded) == [1, 2, 3, 4]
+
+def test_broken_driver_is_discarded_and_replaced(olx, workdir, no_sleep):
+    factory = FakeFactory(broken={0})
+    pool = olx.DriverPool(factory, size=1)
+    scraper = olx.OlxScraper("car cover", max_pages=2, rate_limit=0, driver_pool=pool, parser_backend="bs4",
+                             debug_dump=False)
+    try:
+        failed = scraper.scrape_with_selenium()
+    finally:
+        scraper.close()
+        pool.close()
+    broken = factory.drivers[0]
+    assert broken.quit_called
+    # The page the broken browser was loading fails; the replacement loads the other one
+    assert len(failed) == 1
+    assert factory.drivers[1].loaded
+    assert scraper.result_count == 5
+
+def test_scraper_without_a_shared_pool_starts_browsers_once(olx, workdir, no_sleep, monkeypatch):
+    factory = FakeFactory()
+    monkeypatch.setattr(olx, "chrome_driver_factory", lambda *args: factory)
+    scraper = olx.OlxScraper("car cover", max_pages=3, rate_limit=0, parser_backend="bs4", debug_dump=False)
+    try:
+        # Probe, crawl and per-page fallback passes, as scrape() runs them
+        assert scraper.scrape_with_selenium([1]) == []
+        assert scraper.scrape_with_selenium([2, 3]) == []
+        assert scraper.scrape_with_selenium([3]) == []
+    finally:
+        scraper.close()
+    assert len(factory.drivers) == 1
+    assert factory.drivers[0].loaded == [1, 2, 3, 3]
+    assert factory.drivers[0].quit_called and scraper.driver_pool is None
+
+def test_driver_on_a_blocked_proxy_is_replaced(olx, workdir, no_sleep):
+    proxy_pool = olx.ProxyPool(["http://proxy-a:8080", "http://proxy-b:8080"], failure_threshold=1)
+    factory = FakeFactory(blocked={0}, proxies=["http://proxy-a:8080", "http://proxy-b:8080"])
+    pool = olx.DriverPool(factory, size=1)
+    scraper = olx.OlxScraper("car cover", max_pages=3, rate_limit=0, driver_pool=pool, proxy_pool=proxy_pool,
+                             parser_backend="bs4", debug_dump=False)
+    try:
+        assert scraper.scrape_with_selenium() == [1]
+    finally:
+        scraper.close()
+        pool.close()
+    # The CAPTCHA opened proxy-a's circuit, so its browser was quit and one on proxy-b took over
+    assert factory.drivers[0].quit_called and factory.drivers[0].loaded == [1]
+    assert factory.drivers[1].loaded == [2, 3]
+    assert proxy_pool.stats["http://proxy-a:8080"]["trips"] == 1
+    assert proxy_pool.stats["http://proxy-b:8080"]["successes"] == 2
+    assert scraper.proxy_failed_pages == {1: {"http://proxy-a:8080"}}
@@ -0,0 +1,89 @@
+import json
+import pickle
+import pstats
+import sys
+
+from conftest import search_page
+
+def test_prometheus_exposition(olx):
+    metrics = olx.Metrics()
+    metrics.inc("http_responses_total", method="requests", status=200)
+    metrics.inc("http_responses_total", 2, method="requests", status=200)
+    metrics.inc("proxy_requests_total", proxy='a\\b "c"\nd')
+    for seconds in (0.003, 0.04, 0.04, 20.0):
+        metrics.observe("parse_seconds", seconds, backend="bs4")
+    
+    lines = metrics.to_prometheus().splitlines()
+    assert lines[:4] == [
+        "# TYPE olx_http_responses_total counter",
+        'olx_http_responses_total{method="requests",status="200"} 3',
+        "# TYPE olx_proxy_requests_total counter",
+        'olx_proxy_requests_total{proxy="a\\\\b \\"c\\"\\nd"} 1',
+    ]
+    assert lines[4] == "# TYPE olx_parse_seconds histogram"
+    buckets = {line.split('le="')[1].split('"')[0]: int(line.split()[-1]) for line in lines if "_bucket" in line}
+    # Buckets are cumulative and end with +Inf, which counts every observation
+    assert list(buckets) == [str(bound) for bound in olx.Metrics.BUCKETS] + ["+Inf"]
+    assert (buckets["0.005"], buckets["0.025"], buckets["0.05"], buckets["10.0"], buckets["+Inf"]) == (1, 1, 3, 3, 4)
+    assert 'olx_parse_seconds_bucket{backend="bs4",le="+Inf"} 4' in lines
+    assert lines[-2:] == ['olx_parse_seconds_sum{backend="bs4"} 20.083', 'olx_parse_seconds_count{backend="bs4"} 4']
+
+def test_to_dict(olx):
+    metrics = olx.Metrics()
+    metrics.inc("pages_total", kind="html")
+    metrics.observe("parse_seconds", 0.02)
+    metrics.observe("parse_seconds", 0.06)
+    data = json.loads(json.dumps(metrics.to_dict()))
+    assert data["counters"] == {"pages_total": [{"labels": {"kind": "html"}, "value": 1}]}
+    histogram, = data["histograms"]["parse_seconds"]
+    assert (histogram["count"], histogram["max"]) == (2, 0.06)
+    assert abs(histogram["mean"] - 0.04) < 1e-9
+    assert (histogram["buckets"]["0.025"], histogram["buckets"]["0.1"], histogram["buckets"]["+Inf"]) == (1, 1, 0)
+
+def test_worker_snapshots_merge(olx):
+    worker = olx.Metrics()
+    worker.inc("listing_strategy_hits_total", strategy="item_box")
+    worker.observe("parse_seconds", 0.02, backend="bs4")
+    # Snapshots cross the process boundary pickled
+    snapshot = pickle.loads(pickle.dumps(worker.drain()))
+    assert worker.to_dict() == {"counters": {}, "histograms": {}}
+    
+    parent = olx.Metrics()
+    parent.inc("listing_strategy_hits_total", 2, strategy="item_box")
+    parent.observe("parse_seconds", 3.0, backend="bs4")
+    parent.merge(snapshot)
+    parent.merge(({("listing_strategy_hits_total", (("strategy", "generic"),)): 1}, {}))
+    assert parent.to_dict()["counters"]["listing_strategy_hits_total"] == [
+        {"labels": {"strategy": "generic"}, "value": 1},
+        {"labels": {"strategy": "item_box"}, "value": 3},
+    ]
+    histogram, = parent.to_dict()["histograms"]["parse_seconds"]
+    assert (histogram["count"], histogram["sum"], histogram["max"]) == (2, 3.02, 3.0)
+
+def test_parse_worker_metrics_reach_the_parent(olx):
+    def parsed_pages():
+        histograms = olx.metrics.to_dict()["histograms"].get("parse_seconds", [])
+        return sum(histogram["count"] for histogram in histograms)
+    
+    before = parsed_pages()
+    pipeline = olx.ParsePipeline(workers=2, backend="bs4")
+    try:
+        list(pipeline.run(iter([(page, search_page(page)) for page in (1, 2, 3)]), "https://www.olx.in"))
+    finally:
+        pipeline.close()
+    assert parsed_pages() - before == 3
+
+def test_profile_and_metrics_outputs(olx, workdir, mock_olx, monkeypatch, capsys):
+    server = mock_olx(pages=1)
+    monkeypatch.setattr(olx, "setup_logging", lambda: None)
+    monkeypatch.setattr(sys, "argv", [
+        "olx-scrapper.py", "--query", "car cover", "--base-url", server.url, "--rate-limit", "0", "--retries", "0",
+        "--parser", "bs4", "--formats", "jsonl", "--no-debug-dump",
+        "--profile", "scrape.prof", "--metrics-out", "metrics.prom",
+    ])
+    olx.main()
+    
+    assert "Profile saved to scrape.prof" in capsys.readouterr().out
+    assert pstats.Stats(str(workdir / "scrape.prof")).total_calls > 0
+    exposition = (workdir / "metrics.prom").read_text(encoding="utf-8")
+    assert 'olx_http_responses_total{method="requests",status="200"}' in exposition
@@ -0,0 +1,66 @@
+import gzip
+import json
+import math
+
+import pytest
+
+LISTINGS = [
+    {"title": "Sofa", "price": "1.299.000 zł", "location": "Warszawa", "date_posted": "Dzisiaj", "url": "https://www.olx.pl/d/1"},
+    {"title": "Rower", "price": "1 299,50 zł", "location": "Kraków", "date_posted": "Wczoraj", "url": "https://www.olx.pl/d/2"},
+    {"title": "Za darmo", "price": "Za darmo", "location": "Kraków", "date_posted": "Wczoraj", "url": "https://www.olx.pl/d/3"},
+]
+
+def price_values(records):
+    return [record["price_value"] for record in records]
+
+def test_listing_store_uses_the_site_decimal_mark(olx):
+    store = olx.ListingStore(LISTINGS, decimal_mark=olx.decimal_mark_for("pl"))
+    assert list(store.price_values[:2]) == [1299000.0, 1299.5]
+    assert math.isnan(store.price_values[2])
+
+def test_jsonl_gz_uses_the_site_decimal_mark(olx, workdir):
+    sink = olx.open_sinks("out", ["jsonl.gz"], "sofa", decimal_mark=olx.decimal_mark_for("pl"))[0]
+    sink.write_page(LISTINGS)
+    sink.close()
+    with gzip.open("out.jsonl.gz", "rt", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert price_values(records) == [1299000.0, 1299.5, None]
+
+def test_parquet_uses_the_site_decimal_mark(olx, workdir):
+    pq = pytest.importorskip("pyarrow.parquet")
+    sink = olx.open_sinks("out", ["parquet"], "sofa", decimal_mark=olx.decimal_mark_for("pl"))[0]
+    sink.write_page(LISTINGS)
+    sink.close()
+    values = pq.read_table("out.parquet").column("price_value").to_pylist()
+    assert values == [1299000.0, 1299.5, None]
+
+def test_scraper_results_follow_its_country(olx, workdir):
+    scraper = olx.OlxScraper("sofa", country="pl", rate_limit=0, debug_dump=False)
+    scraper.results.extend(LISTINGS)
+    scraper.close()
+    assert list(scraper.results.price_values[:2]) == [1299000.0, 1299.5]
+
+def test_parquet_has_normalized_columns_only_when_normalized(olx, workdir):
+    pq = pytest.importorskip("pyarrow.parquet")
+    for name, listings in [("plain", LISTINGS), ("normalized", olx.ListingNormalizer("pl").normalize(LISTINGS))]:
+        sink = olx.open_sinks(name, ["parquet"], "sofa", decimal_mark=olx.decimal_mark_for("pl"))[0]
+        sink.write_page(listings)
+        sink.close()
+    
+    assert pq.read_table("plain.parquet").column_names == ["title", "price", "location", "date_posted", "url", "price_value"]
+    table = pq.read_table("normalized.parquet")
+    assert {"currency", "posted_at"} <= set(table.column_names)
+    assert table.column("currency").to_pylist() == ["PLN", "PLN", None]
+
+# Prices without a currency marker are in the site's own currency
+@pytest.mark.parametrize("country, price, value, currency", [
+    ("com.co", "$ 1.299.000", 1299000.0, "COP"),
+    ("com.pk", "1,299,000", 1299000.0, "PKR"),
+    ("com.ec", "1,299.50", 1299.5, "USD"),
+    ("com.pe", "1,299.50", 1299.5, "PEN"),
+    ("sa.com", "1,299", 1299.0, "SAR"),
+])
+def test_countries_are_olx_domain_suffixes(olx, country, price, value, currency):
+    listing = {"title": "Sofa", "price": price, "location": "", "date_posted": "", "url": ""}
+    normalized, = olx.ListingNormalizer(country).normalize([listing])
+    assert (normalized["price_value"], normalized["currency"]) == (value, currency)
@@ -0,0 +1,59 @@
+import pytest
+from bs4 import BeautifulSoup
+
+# Cards with mixed markup, as when promoted and regular results share a page
+MIXED_CARDS = [
+    '<h2>Featured A</h2><span class="price">₹ 100</span>',
+    '<h2>Promoted</h2><span data-aut-id="itemTitle">Real title B</span><span data-aut-id="itemPrice">₹ 200</span>',
+    '<span class="card-title">Span title C</span><h2>Promoted</h2>'
+    '<span data-aut-id="item-location">Kochi</span><span class="card-price">₹ 300</span>',
+    '<div class="title">Div title D</div><span data-aut-id="itemCreationDate"><span>2 days ago</span></span>',
+    '<span data-aut-id="itemTitle">Title E</span><h2>Promoted</h2><span class="post-time">Today</span>',
+    '<span data-aut-id="itemTitle"> </span><span class="price-tag">₹ 600</span><div class="location">Pune</div>',
+]
+
+FIELD_SELECTORS = {
+    "title": ["[data-aut-id='itemTitle']", "span[class*='title']", "h2", ".title", "[class*='title']"],
+    "price": ["[data-aut-id='itemPrice']", "span[class*='price']", ".price", "[class*='price']"],
+    "location": ["[data-aut-id='item-location']", "span[class*='location']", ".location", "[class*='location']"],
+    "date_posted": ["[data-aut-id='itemCreationDate']", "span[class*='date']", ".date", "[class*='date']", "[class*='time']"],
+}
+
+def mixed_page():
+    cards = "".join(
+        f'<li data-aut-id="itemBox"><a href="/item/card-iid-{i}">{card}</a></li>' for i, card in enumerate(MIXED_CARDS)
+    )
+    return f"<html><body><ul>{cards}</ul></body></html>"
+
+def reference_parse(html, base_url):
+    """The original parse_html cascade: every listing tries the selectors of each field in order"""
+    results = []
+    for listing in BeautifulSoup(html, "html.parser").select("[data-aut-id='itemBox']"):
+        data = {}
+        for field, selectors in FIELD_SELECTORS.items():
+            value = None
+            for selector in selectors:
+                tag = listing.select_one(selector)
+                if tag:
+                    value = tag.get_text(strip=True)
+                    break
+            data[field] = value if value else "N/A"
+        link = listing.find("a")
+        data["url"] = f"{base_url}{link['href']}" if link else "N/A"
+        if data["title"] != "N/A" or data["price"] != "N/A":
+            results.append(data)
+    return results
+
+@pytest.mark.parametrize("backend", ["bs4", "lxml", "selectolax"])
+def test_mixed_cards_match_the_original_cascade(olx, backend):
+    try:
+        parser = olx.ListingParser("https://www.olx.in", backend)
+    except ImportError:
+        pytest.skip(f"{backend} is not installed")
+    html = mixed_page()
+    listings = parser.parse(html, 1)
+    
+    assert listings == reference_parse(html, "https://www.olx.in")
+    assert [listing["title"] for listing in listings] == [
+        "Featured A", "Real title B", "Span title C", "Div title D", "Title E", "N/A",
+    ]
@@ -0,0 +1,57 @@
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+NOW = datetime(2026, 10, 16, 12, 30)
+
+@pytest.mark.parametrize("text, expected", [
+    ("3 days ago", "2026-10-13T12:30:00"),
+    ("an hour ago", "2026-10-16T11:30:00"),
+    ("hace 3 días", "2026-10-13T12:30:00"),
+    ("hace un mes", "2026-09-16T12:30:00"),
+    ("há 2 horas", "2026-10-16T10:30:00"),
+    ("2 dias atrás", "2026-10-14T12:30:00"),
+    ("3 dni temu", "2026-10-13T12:30:00"),
+    ("godzinę temu", "2026-10-16T11:30:00"),
+    ("acum o zi", "2026-10-15T12:30:00"),
+    ("acum 20 de minute", "2026-10-16T12:10:00"),
+    ("преди 2 часа", "2026-10-16T10:30:00"),
+    ("3 дня назад", "2026-10-13T12:30:00"),
+    ("2 години тому", "2026-10-16T10:30:00"),
+    ("3 kun oldin", "2026-10-13T12:30:00"),
+    ("2 jam yang lalu", "2026-10-16T10:30:00"),
+    ("منذ 3 أيام", "2026-10-13T12:30:00"),
+    ("منذ يومين", "2026-10-14T12:30:00"),
+    ("Hoy", "2026-10-16T00:00:00"),
+    ("12 Mar", "2026-03-12T00:00:00"),
+])
+def test_relative_and_absolute_dates(olx, text, expected):
+    assert olx.parse_posted_date(text, NOW) == expected
+
+def test_unknown_relative_words_are_not_guessed(olx):
+    assert olx.parse_posted_date("hace un momento", NOW) is None
+
+@pytest.fixture
+def warsaw_time(monkeypatch):
+    if not hasattr(time, "tzset"):
+        pytest.skip("needs time.tzset")
+    monkeypatch.setenv("TZ", "Europe/Warsaw")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+def test_posted_at_is_always_naive_local_time(olx, warsaw_time):
+    assert olx.parse_posted_date("2026-10-01T10:00:00Z", NOW) == "2026-10-01T12:00:00"
+    assert olx.parse_posted_date("2026-10-01T10:00:00", NOW) == "2026-10-01T10:00:00"
+    aware_now = datetime(2026, 10, 16, 10, 30, tzinfo=timezone.utc)
+    assert olx.parse_posted_date("3 days ago", aware_now) == "2026-10-13T12:30:00"
+    
+    normalizer = olx.ListingNormalizer("pl", now=NOW)
+    posted = [listing["posted_at"] for listing in normalizer.normalize([
+        {"price": "100 zł", "date_posted": "2026-10-01T10:00:00Z"},
+        {"price": "100 zł", "date_posted": "3 dni temu"},
+    ])]
+    assert posted == ["2026-10-01T12:00:00", "2026-10-13T12:30:00"]
+    assert all(datetime.fromisoformat(value).tzinfo is None for value in posted)
@@ -0,0 +1,52 @@
+import json
+import logging
+
+from conftest import search_page
+
+def test_mapped_page_decodes_the_file(olx, tmp_path):
+    page = tmp_path / "page.html"
+    page.write_bytes("<p>Łódź 1 299 zł</p>".encode("utf-8") + b"\xff")
+    assert olx.MappedPage(str(page)).read() == "<p>Łódź 1 299 zł</p>�"
+    empty = tmp_path / "empty.html"
+    empty.write_bytes(b"")
+    assert olx.MappedPage(str(empty)).read() == ""
+
+def test_an_unreadable_page_does_not_stop_the_others(olx, tmp_path, caplog):
+    for page in (1, 2):
+        (tmp_path / f"page_{page}.html").write_text(search_page(page), encoding="utf-8")
+    archived = [
+        ("page_1.html", olx.MappedPage(str(tmp_path / "page_1.html"))),
+        ("gone.html", olx.MappedPage(str(tmp_path / "gone.html"))),
+        ("page_2.html", olx.MappedPage(str(tmp_path / "page_2.html"))),
+    ]
+    pipeline = olx.ParsePipeline(workers=1, backend="bs4")
+    try:
+        with caplog.at_level(logging.ERROR):
+            parsed = list(pipeline.run(iter(archived), "https://www.olx.in"))
+    finally:
+        pipeline.close()
+    assert [(name, len(listings)) for name, listings in parsed] == [("page_1.html", 5), ("gone.html", 0), ("page_2.html", 5)]
+    assert "Error reading page gone.html" in caplog.text
+
+def test_reparse_reads_one_querys_debug_directory(olx, workdir, monkeypatch):
+    monkeypatch.setattr(olx, "setup_logging", lambda: None)
+    for query, page in (("car cover", 1), ("seat cover", 2)):
+        directory = workdir / olx.debug_dir_for(query, "in")
+        directory.mkdir(parents=True)
+        (directory / "olx_requests_page_1.html").write_text(search_page(page), encoding="utf-8")
+    
+    olx.reparse_main(["--query", "Car Cover", "--workers", "1", "--parser", "bs4", "--output", "backfill"])
+    with open(workdir / "backfill.jsonl", encoding="utf-8") as f:
+        titles = [json.loads(line)["title"] for line in f]
+    # Only the car cover pages, not the other query's dumps next to them
+    assert titles == [f"Car cover 1-{i}" for i in range(5)]
+
+def test_workers_start_while_a_metrics_lock_is_held(olx):
+    # A forked worker inherits the lock as held; its initializer must not wait for it
+    with olx.metrics._lock:
+        pipeline = olx.ParsePipeline(workers=2, backend="bs4")
+    try:
+        parsed = list(pipeline.run(iter([(1, search_page(1))]), "https://www.olx.in"))
+    finally:
+        pipeline.close()
+    assert [(page, len(listings)) for page, listings in parsed] == [(1, 5)]
@@ -0,0 +1,77 @@
+import json
+
+from conftest import build
+
+def test_pages_left_after_an_early_stop_are_not_recorded(olx, workdir, mock_olx):
+    server = mock_olx(pages=4)
+    seen_index = olx.SeenIndex(str(workdir / "seen.db"))
+    try:
+        # Page 2 was scraped before, so the crawl stops there
+        earlier = build(olx, server, seen_index=seen_index)
+        earlier.scrape_with_requests([2])
+        earlier.close()
+        
+        planner = olx.StrategyPlanner(str(workdir / "strategy_stats.json"))
+        scraper = build(olx, server, max_pages=4, seen_index=seen_index, planner=planner)
+        scraper.scrape()
+        scraper.close()
+    finally:
+        seen_index.close()
+    assert scraper.stopped
+    # The probe (page 1) and page 2; pages 3 and 4 were never scraped
+    with open(workdir / "strategy_stats.json", encoding="utf-8") as f:
+        stats = json.load(f)["in"]["requests"]
+    assert (stats["attempts"], stats["successes"]) == (2, 2)
+
+def read_stats(path):
+    with open(path, encoding="utf-8") as f:
+        return {method: (stats["attempts"], stats["successes"]) for method, stats in json.load(f)["in"].items()}
+
+def test_planner_prefers_the_last_method_that_worked(olx, workdir):
+    path = str(workdir / "strategy_stats.json")
+    planner = olx.StrategyPlanner(path)
+    assert planner.order("in", ["requests", "api", "selenium"]) == ["requests", "api", "selenium"]
+    
+    planner.record("in", "requests", 4, 0, 2.0)
+    planner.record("in", "api", 4, 3, 1.0)
+    assert planner.order("in", ["requests", "api", "selenium"]) == ["api", "selenium", "requests"]
+    # Other countries are unaffected
+    assert planner.order("ae", ["requests", "api"]) == ["requests", "api"]
+    
+    # A new planner picks the stats up from the file
+    reloaded = olx.StrategyPlanner(path)
+    assert reloaded.order("in", ["requests", "api"]) == ["api", "requests"]
+    assert read_stats(path) == {"requests": (4, 0), "api": (4, 3)}
+
+def test_probe_commits_to_the_api_when_requests_are_refused(olx, workdir, mock_olx):
+    server = mock_olx(pages=3)
+    server.fail[("html", 1)] = 403
+    path = str(workdir / "strategy_stats.json")
+    scraper = build(olx, server, max_pages=3, planner=olx.StrategyPlanner(path))
+    try:
+        scraper.scrape()
+    finally:
+        scraper.close()
+    # requests only got the probe; the API took page 1 and then the whole crawl
+    assert server.requested("html") == [1]
+    assert sorted(server.requested("api")) == [0, 1, 2]
+    assert scraper.result_count == 15
+    assert read_stats(path) == {"requests": (1, 0), "api": (3, 3)}
+    
+    # The next run starts with the API
+    assert olx.StrategyPlanner(path).order("in", ["requests", "api"]) == ["api", "requests"]
+
+def test_failed_pages_fall_back_to_the_next_method(olx, workdir, mock_olx):
+    server = mock_olx(pages=3)
+    server.fail[("html", 2)] = 500
+    path = str(workdir / "strategy_stats.json")
+    scraper = build(olx, server, max_pages=3, planner=olx.StrategyPlanner(path))
+    try:
+        scraper.scrape()
+    finally:
+        scraper.close()
+    assert sorted(server.requested("html")) == [1, 2, 3]
+    # Only page 2 (API page 1) is retried with the API
+    assert server.requested("api") == [1]
+    assert sorted(listing["title"].split()[0] for listing in scraper.results) == ["API"] * 5 + ["Car"] * 10
+    assert read_stats(path) == {"requests": (3, 2), "api": (1, 1)}